@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks
+~~~~~~~~~~~~
+Microbenchmarks for transistor, run as modules from the repository root, like:
+
+    python -m benchmarks.bench_spider_overhead
+
+They stub out the network, so they measure transistor's own overhead and can be
+compared from one commit to the next.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_import
+~~~~~~~~~~~~
+Measure the import time of transistor and of its main modules, each the best of
+`--repeat` imports in a new process, and list the heavy dependencies which each
+import loads:
+
+    python -m benchmarks.bench_import --repeat 5
+
+With --check, exit with 1 if `import transistor` loads any of the heavy
+dependencies, which must only be loaded when a class which needs them is used.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+MODULES = ['transistor', 'transistor.workers', 'transistor.managers',
+           'transistor.scrapers', 'transistor.browsers',
+           'transistor.schedulers.books', 'transistor.schedulers.brokers',
+           'transistor.persistence.exporters.xlsx', 'transistor.monitoring.stats']
+
+HEAVY = ['pyexcel', 'openpyxl', 'bs4', 'mechanicalsoup', 'kombu', 'newt.db',
+         'requests', 'gevent']
+
+SCRIPT = '''
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed,
+                   'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def measure(module: str, repeat: int=5) -> dict:
+    """
+    Return the best import time of the module in `repeat` new processes, and
+    the heavy dependencies it loaded.
+    """
+    best = None
+    for _ in range(repeat):
+        output = subprocess.check_output(
+            [sys.executable, '-c', SCRIPT.format(module=module, heavy=HEAVY)])
+        result = json.loads(output.decode('utf-8').strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_import')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--check', action='store_true',
+                        help='exit with 1 if `import transistor` is not light')
+    args = parser.parse_args(argv)
+
+    results = {}
+    for module in MODULES:
+        results[module] = measure(module, args.repeat)
+        print(f'{module:<40} {results[module]["seconds"] * 1000:>8.1f} ms  '
+              f'{", ".join(results[module]["loaded"])}')
+    if args.check and results['transistor']['loaded']:
+        print(f'REGRESSION import transistor loads '
+              f'{", ".join(results["transistor"]["loaded"])}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
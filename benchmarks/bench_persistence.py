@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_persistence
+~~~~~~~~~~~~
+Microbenchmarks of the per-item persistence hot paths: Item creation,
+ItemLoader.write(), BaseItemExporter._get_serialized_fields() and the export of
+one item by each exporter, with synthetic SplashScraperItems loaded from fake
+Splash responses of three sizes:
+
+    - small: 5 kB of html.
+    - medium: 50 kB of html and a har of 20 entries.
+    - large: 250 kB of html, a har of 100 entries and a 100 kB png.
+
+For each benchmark it reports the ops/sec, the best of `--repeat` runs, and the
+memory allocated per item: the peak bytes traced by tracemalloc while one item
+is processed, and the memory blocks still allocated per item afterwards, which
+should stay 0.
+
+    python -m benchmarks.bench_persistence --out baseline.json
+
+Then, after a change or a dependency upgrade, fail if any benchmark is more
+than 20% slower, or allocates more than 20% more memory, than the baseline:
+
+    python -m benchmarks.bench_persistence --check baseline.json --tolerance 0.2
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import gc
+import io
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from transistor import SplashScraper, SplashScraperItems
+from transistor.persistence.loader import ItemLoader
+from transistor.persistence.exporters import (
+    BaseItemExporter, CsvItemExporter, JsonItemExporter, JsonLinesItemExporter,
+    MarshalItemExporter, PickleItemExporter, PythonItemExporter, XmlItemExporter)
+from benchmarks.fake_splash import FakeSplash
+
+SIZES = {
+    'small': {'html_size': 5000},
+    'medium': {'html_size': 50000, 'har_entries': 20},
+    'large': {'html_size': 250000, 'har_entries': 100, 'png_size': 100000},
+}
+
+# every field but the raw bytes and the request object, which only the pickle
+# exporter could write
+EXPORT_FIELDS = [name for name in SplashScraperItems.fields
+                 if name not in ('raw_content', 'current_request')]
+
+EXPORTERS = {
+    'csv': CsvItemExporter,
+    'jsonlines': JsonLinesItemExporter,
+    'json': JsonItemExporter,
+    'xml': XmlItemExporter,
+    'pickle': PickleItemExporter,
+    'marshal': MarshalItemExporter,
+}
+
+
+class SyntheticScraper(SplashScraper):
+    """
+    A scraper whose browser holds a fake Splash response, as after a scrape.
+    """
+
+    def __init__(self, content: bytes, **kwargs):
+        super().__init__(name='books.toscrape.com', **kwargs)
+        self.number = 1
+        self.searchurl = 'http://books.toscrape.com/search?q=soumission'
+        self.browser._set_raw_content(content)
+        self.browser._set_status(200)
+
+    def start_http_session(self, url=None, **kwargs):
+        pass
+
+
+def make_spider(size: str) -> SyntheticScraper:
+    splash = FakeSplash(latency=0, seed=1, **SIZES[size])
+    result = splash.render({'url': 'http://books.toscrape.com/search?q=soumission'})
+    return SyntheticScraper(json.dumps(result).encode('utf-8'))
+
+
+def load_item(spider) -> SplashScraperItems:
+    """
+    Load the spider into a SplashScraperItems, like BaseWorker.load_items().
+    """
+    loader = ItemLoader()
+    loader.items = SplashScraperItems()
+    loader.spider = spider
+    loader.write()
+    return loader.items
+
+
+def exporter_op(exporter_class, item):
+    """
+    Return a callable which exports the item once, to a buffer which is emptied
+    now and then.
+    """
+    buffer = io.BytesIO()
+    exporter = exporter_class(buffer, fields_to_export=EXPORT_FIELDS)
+    exporter.start_exporting()
+
+    def export():
+        exporter.export_item(item)
+        if buffer.tell() > 8 * 1024 * 1024:
+            buffer.seek(0)
+            buffer.truncate()
+    return export
+
+
+def benchmarks(size: str) -> dict:
+    """
+    Return {name: callable} of the benchmarks for the size, each processing
+    one item per call.
+    """
+    spider = make_spider(size)
+    item = load_item(spider)
+    values = dict(item)
+    base = BaseItemExporter(fields_to_export=EXPORT_FIELDS)
+    python = PythonItemExporter(fields_to_export=EXPORT_FIELDS)
+    ops = {
+        'item_create': lambda: SplashScraperItems(values),
+        'loader_write': lambda: load_item(spider),
+        'serialized_fields': lambda: list(base._get_serialized_fields(item)),
+        'export_python': lambda: python.export_item(item),
+    }
+    for name, exporter_class in EXPORTERS.items():
+        ops[f'export_{name}'] = exporter_op(exporter_class, item)
+    return ops
+
+
+def _time(op, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        op()
+    return time.perf_counter() - start
+
+
+def ops_per_sec(op, repeat: int=5, min_time: float=0.2) -> float:
+    """
+    Return the best ops/sec of `repeat` runs, each running op() for at least
+    `min_time` seconds.
+    """
+    number = 1
+    while True:
+        elapsed = _time(op, number)
+        if elapsed >= min_time:
+            break
+        # aim a little past min_time, growing at most tenfold at once
+        number = min(number * 10, max(number + 1, int(
+            number * 1.2 * min_time / max(elapsed, 1e-9))))
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _time(op, number))
+    return number / best
+
+
+def allocations(op, items: int=200) -> tuple:
+    """
+    Return the peak bytes allocated while processing one item, and the memory
+    blocks still allocated per item after processing `items` items.
+    """
+    op()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        op()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    for _ in range(items):
+        op()
+    gc.collect()
+    retained = (sys.getallocatedblocks() - blocks) / items
+    return peak, retained
+
+
+def run(sizes, repeat: int=5, min_time: float=0.2, select: str=None) -> dict:
+    results = {}
+    for size in sizes:
+        for name, op in benchmarks(size).items():
+            if select and select not in name:
+                continue
+            key = f'{name}[{size}]'
+            peak, retained = allocations(op)
+            results[key] = {'ops_per_sec': round(ops_per_sec(op, repeat, min_time), 1),
+                            'alloc_bytes_per_item': peak,
+                            'retained_blocks_per_item': round(retained, 2)}
+            row = results[key]
+            print(f'{key:<32} {row["ops_per_sec"]:>12.1f} ops/s '
+                  f'{row["alloc_bytes_per_item"]:>12} B/item '
+                  f'{row["retained_blocks_per_item"]:>8} blocks/item', file=sys.stderr)
+    return {'time': time.time(), 'python': platform.python_version(),
+            'platform': platform.platform(), 'results': results}
+
+
+def regressions(baseline: dict, current: dict, tolerance: float=0.2,
+                min_bytes: int=1024) -> list:
+    """
+    Return a message for each benchmark which got slower, or allocates more,
+    than the baseline by more than `tolerance`. Changes of allocated bytes
+    under `min_bytes` are ignored as noise.
+    """
+    messages = []
+    for key, old in baseline['results'].items():
+        new = current['results'].get(key)
+        if new is None:
+            continue
+        if new['ops_per_sec'] < old['ops_per_sec'] * (1 - tolerance):
+            messages.append(f'{key}: {new["ops_per_sec"]} ops/s, was '
+                            f'{old["ops_per_sec"]}')
+        grown = new['alloc_bytes_per_item'] - old['alloc_bytes_per_item']
+        if grown > min_bytes and \
+                new['alloc_bytes_per_item'] > old['alloc_bytes_per_item'] * (1 + tolerance):
+            messages.append(f'{key}: allocates {new["alloc_bytes_per_item"]} B/item, '
+                            f'was {old["alloc_bytes_per_item"]}')
+        if new['retained_blocks_per_item'] >= 1 > old['retained_blocks_per_item']:
+            messages.append(f'{key}: retains {new["retained_blocks_per_item"]} '
+                            f'blocks/item, was {old["retained_blocks_per_item"]}')
+    return messages
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_persistence')
+    parser.add_argument('--sizes', default='small,medium,large',
+                        help='comma separated: small, medium, large')
+    parser.add_argument('-k', dest='select',
+                        help='only run the benchmarks with this in their name')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help='the least seconds of each timed run')
+    parser.add_argument('--out', help='write the results as JSON to this file')
+    parser.add_argument('--check', metavar='BASELINE',
+                        help='exit with 1 if there is a regression from BASELINE')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    current = run(args.sizes.split(','), args.repeat, args.min_time, args.select)
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(current, f, indent=2)
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+        messages = regressions(baseline, current, args.tolerance)
+        for message in messages:
+            print(f'REGRESSION {message}')
+        if messages:
+            return 1
+        print(f'no regression from {args.check} at tolerance {args.tolerance:.0%}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
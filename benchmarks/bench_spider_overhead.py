@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_spider_overhead
+~~~~~~~~~~~~
+Measure the per-task overhead of a SplashScraper with the network stubbed out by
+the SplashBrowser fake page: constructing a new spider for every task, versus
+reusing one spider with reset(task), like a worker with the `spider_pool` kwarg.
+
+    python -m benchmarks.bench_spider_overhead [tasks]
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sys
+import time
+from transistor import SplashScraper
+
+
+class FakePageScraper(SplashScraper):
+
+    def __init__(self, keyword, **kwargs):
+        super().__init__(_test_true=True, _test_page_text='<html></html>',
+                         _test_status_code=200, **kwargs)
+        self.keyword = keyword
+
+    def reset(self, keyword, **kwargs):
+        super().reset(keyword, **kwargs)
+        self.keyword = keyword
+
+    def start_http_session(self, url=None, **kwargs):
+        return super().start_http_session(url=url, **kwargs)
+
+
+def per_task_construct(tasks: int) -> float:
+    start = time.perf_counter()
+    for n in range(tasks):
+        spider = FakePageScraper(f'title-{n}')
+        spider.start_http_session()
+    return (time.perf_counter() - start) / tasks
+
+
+def per_task_pooled(tasks: int) -> float:
+    spider = FakePageScraper('title-0')
+    start = time.perf_counter()
+    for n in range(tasks):
+        spider.reset(f'title-{n}')
+        spider.start_http_session()
+    return (time.perf_counter() - start) / tasks
+
+
+def main(tasks: int=2000):
+    # warm up the lazily loaded modules and cached resources
+    per_task_construct(10)
+    construct = per_task_construct(tasks)
+    pooled = per_task_pooled(tasks)
+    print(f'{tasks} tasks, network stubbed out')
+    print(f'new spider per task:   {construct * 1e6:10.1f} us/task')
+    print(f'pooled with reset():   {pooled * 1e6:10.1f} us/task')
+    print(f'speedup:               {construct / pooled:10.1f}x')
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.bench_throughput
+~~~~~~~~~~~~
+End to end throughput benchmark. Start a benchmarks.fake_splash server, then run
+benchmarks.throughput_case for each task source and worker count, each in a new
+process, and write tasks/sec, p50/p99 task latency and peak RSS as JSON:
+
+    python -m benchmarks.bench_throughput run --workers 1,4,16 --tasks 500 \
+        --latency 0.05 --html-size 50000 --out bench.json
+
+Compare two results, like from two commits, matched by source and workers:
+
+    python -m benchmarks.bench_throughput compare before.json after.json
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import os
+import sys
+import json
+import time
+import socket
+import platform
+import argparse
+import subprocess
+from benchmarks import fake_splash
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float=10.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.05)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.DEVNULL).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_server(port: int, server_args: list):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'benchmarks.fake_splash', '--port', str(port)]
+        + server_args, stdout=subprocess.DEVNULL)
+    try:
+        wait_for_port(port)
+    except OSError:
+        server.kill()
+        raise
+    return server
+
+
+def run_case(splash_url: str, source: str, workers: int, tasks: int,
+             spider_pool: bool=False) -> dict:
+    env = dict(os.environ, SPLASH_URL=splash_url)
+    command = [sys.executable, '-m', 'benchmarks.throughput_case',
+               '--source', source, '--workers', str(workers), '--tasks', str(tasks)]
+    if spider_pool:
+        command.append('--spider-pool')
+    output = subprocess.check_output(command, env=env, stderr=subprocess.DEVNULL)
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def run(args) -> dict:
+    server_args = ['--latency', str(args.latency), '--jitter', str(args.jitter),
+                   '--html-size', str(args.html_size),
+                   '--har-entries', str(args.har_entries),
+                   '--png-size', str(args.png_size),
+                   '--error-rate', str(args.error_rate)]
+    if args.seed is not None:
+        server_args += ['--seed', str(args.seed)]
+    port = free_port()
+    server = start_server(port, server_args)
+    results = []
+    try:
+        for source in args.sources.split(','):
+            for workers in (int(n) for n in args.workers.split(',')):
+                result = run_case(f'http://127.0.0.1:{port}', source, workers,
+                                  args.tasks, args.spider_pool)
+                print(f'{source:<7} {workers:>4} workers {result["tasks_per_sec"]:>9} '
+                      f'tasks/s  p99 {result["p99_latency"]:.3f}s  '
+                      f'peak rss {result["peak_rss_kb"]} KiB', file=sys.stderr)
+                results.append(result)
+    finally:
+        server.kill()
+        server.wait()
+    return {'commit': git_commit(), 'time': time.time(),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'server': fake_splash.options(args), 'results': results}
+
+
+def compare(before: dict, after: dict) -> list:
+    """
+    Return the change of each measurement of the cases in both results, as rows
+    of (source, workers, measurement, before, after, change in percent).
+    """
+    old = {(r['source'], r['workers']): r for r in before['results']}
+    rows = []
+    for result in after['results']:
+        previous = old.get((result['source'], result['workers']))
+        if previous is None:
+            continue
+        for key in ('tasks_per_sec', 'p99_latency', 'peak_rss_kb'):
+            a, b = previous.get(key), result.get(key)
+            change = (b - a) / a * 100.0 if a and b is not None else None
+            rows.append((result['source'], result['workers'], key, a, b, change))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.bench_throughput')
+    commands = parser.add_subparsers(dest='command')
+    run_parser = commands.add_parser('run', help='run the benchmark')
+    run_parser.add_argument('--sources', default='book,broker',
+                            help='comma separated: book, broker')
+    run_parser.add_argument('--workers', default='1,4,16',
+                            help='comma separated worker counts')
+    run_parser.add_argument('--tasks', type=int, default=500)
+    run_parser.add_argument('--spider-pool', action='store_true')
+    run_parser.add_argument('--out', help='write the JSON here, else to stdout')
+    fake_splash.add_arguments(run_parser)
+    compare_parser = commands.add_parser('compare', help='compare two results')
+    compare_parser.add_argument('before')
+    compare_parser.add_argument('after')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.before) as f:
+            before = json.load(f)
+        with open(args.after) as f:
+            after = json.load(f)
+        print(f'{before.get("commit")} -> {after.get("commit")}')
+        for source, workers, key, a, b, change in compare(before, after):
+            change = f'{change:+.1f}%' if change is not None else 'n/a'
+            print(f'{source:<7} {workers:>4} {key:<14} {a or 0:>12.4g} '
+                  f'{b or 0:>12.4g} {change:>8}')
+        return 0
+    if args.command != 'run':
+        parser.print_help()
+        return 2
+    report = json.dumps(run(args), indent=2)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
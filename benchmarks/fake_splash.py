@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.fake_splash
+~~~~~~~~~~~~
+A local stand-in for the Splash /execute endpoint, to benchmark transistor end
+to end without a Splash instance or network access. It answers each request
+like the lua scripts of transistor do, with the url, headers, cookies and html of
+the page, and optionally a har and png, after a configurable latency.
+
+    python -m benchmarks.fake_splash --port 8050 --latency 0.05 --html-size 50000
+
+The html of each page has the target url of the request in its <h1>, padded to
+`html_size` bytes. A fraction `error_rate` of the requests get a Splash error
+response, http 500 with no html, like a lua script which raised.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sys
+import json
+import base64
+import random
+import argparse
+import gevent
+from html import escape
+from gevent.pywsgi import WSGIServer
+
+FILLER = '<p class="filler">' + 'lorem ipsum dolor sit amet ' * 8 + '</p>\n'
+
+
+class FakeSplash:
+    """
+    A WSGI app which renders fake pages for the Splash /execute endpoint.
+    """
+
+    def __init__(self, latency: float=0.05, jitter: float=0.0,
+                 html_size: int=50000, har_entries: int=0, png_size: int=0,
+                 error_rate: float=0.0, seed: int=None):
+        """
+        :param latency: the mean seconds to render a page.
+        :param jitter: the latency is uniform in latency +/- jitter seconds.
+        :param html_size: the approximate size in bytes of the html of a page.
+        :param har_entries: the number of har entries returned, 0 for no har.
+        :param png_size: the size in bytes of the png returned, 0 for no png.
+        :param error_rate: the fraction of requests which get an error response.
+        :param seed: the seed of the random latency and errors, for repeatable runs.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        # the same padding, har and png in every response, built once
+        self.filler = FILLER * max(0, html_size // len(FILLER))
+        self.har = self._make_har(har_entries) if har_entries else None
+        self.png = (base64.b64encode(self.random.getrandbits(8 * png_size)
+                                     .to_bytes(png_size, 'little')).decode('ascii')
+                    if png_size else None)
+
+    @staticmethod
+    def _make_har(entries: int) -> dict:
+        return {'log': {'version': '1.2', 'entries': [
+            {'startedDateTime': '2018-01-01T00:00:00.000Z', 'time': 12,
+             'request': {'method': 'GET', 'url': f'http://fake.splash/asset/{n}.js',
+                         'headers': []},
+             'response': {'status': 200, 'headers': [],
+                          'content': {'size': 1024, 'mimeType': 'text/javascript'}}}
+            for n in range(entries)]}}
+
+    def delay(self) -> float:
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.random.uniform(self.latency - self.jitter,
+                                            self.latency + self.jitter))
+
+    def render(self, splash_args: dict) -> dict:
+        """
+        Return the lua script result for a request.
+        """
+        url = splash_args.get('url') or 'about:blank'
+        html = (f'<!DOCTYPE html>\n<html><head><title>fake splash</title></head>'
+                f'<body><h1>{escape(url)}</h1>\n{self.filler}</body></html>')
+        result = {'url': url,
+                  'http_status': 200,
+                  'headers': [{'name': 'Content-Type',
+                               'value': 'text/html; charset=utf-8'}],
+                  'cookies': [],
+                  'html': html}
+        if self.har is not None:
+            result['har'] = self.har
+        if self.png is not None:
+            result['png'] = self.png
+        return result
+
+    def __call__(self, environ, start_response):
+        if environ.get('PATH_INFO') != '/execute' or \
+                environ.get('REQUEST_METHOD') != 'POST':
+            start_response('404 Not Found', [('Content-Type', 'text/plain')])
+            return [b'Not Found']
+        self.requests += 1
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        try:
+            splash_args = json.loads(environ['wsgi.input'].read(length) or b'{}')
+        except ValueError:
+            splash_args = {}
+        gevent.sleep(self.delay())
+        if self.error_rate and self.random.random() < self.error_rate:
+            status = '500 Internal Server Error'
+            body = {'error': 500, 'type': 'ScriptError',
+                    'description': 'Error happened while executing Lua script',
+                    'info': {'type': 'LUA_ERROR', 'message': 'fake error'}}
+        else:
+            status = '200 OK'
+            body = self.render(splash_args)
+        data = json.dumps(body).encode('utf-8')
+        start_response(status, [('Content-Type', 'application/json'),
+                                ('Content-Length', str(len(data)))])
+        return [data]
+
+
+def add_arguments(parser):
+    """
+    Add the FakeSplash options to an argparse parser.
+    """
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--html-size', type=int, default=50000)
+    parser.add_argument('--har-entries', type=int, default=0)
+    parser.add_argument('--png-size', type=int, default=0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+
+
+def options(args) -> dict:
+    """
+    Return the FakeSplash kwargs from parsed arguments.
+    """
+    return {'latency': args.latency, 'jitter': args.jitter,
+            'html_size': args.html_size, 'har_entries': args.har_entries,
+            'png_size': args.png_size, 'error_rate': args.error_rate,
+            'seed': args.seed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.fake_splash')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    server = WSGIServer((args.host, args.port), FakeSplash(**options(args)),
+                        log=None)
+    print(f'fake splash on http://{args.host}:{args.port}/execute', flush=True)
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
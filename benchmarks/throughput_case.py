@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+benchmarks.throughput_case
+~~~~~~~~~~~~
+Run one case of the end to end throughput benchmark: a BaseWorkGroupManager
+scrapes `tasks` keywords from a StatefulBook or from an ExchangeQueue on the
+kombu in-memory broker, with a number of workers, against the Splash service at
+SPLASH_URL, normally a benchmarks.fake_splash server. The result is printed as
+one JSON object.
+
+    SPLASH_URL=http://127.0.0.1:8050 python -m benchmarks.throughput_case \
+        --source book --workers 8 --tasks 500
+
+This is run in a new process for each case by benchmarks.bench_throughput, so
+the peak RSS is the one of the case.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+# monkey patching for gevent must be done first
+from gevent import monkey
+monkey.patch_all()
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import argparse
+import pyexcel as pe
+from urllib.parse import quote
+from kombu import Connection
+from transistor import (BaseItemExporter, BaseWorkGroupManager, ExchangeQueue,
+                        Field, Item, SplashScraper, StatefulBook, WorkGroup)
+from transistor.monitoring.tracing import Tracer, summarize
+from transistor.persistence.loader import ItemLoader
+from transistor.schedulers.brokers import TaskProducer
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+TRACKER = 'fake.splash'
+
+
+class BenchScraper(SplashScraper):
+    """
+    Search the fake website for a keyword, with one Splash render per task.
+    """
+
+    def __init__(self, keyword, **kwargs):
+        super().__init__(**kwargs)
+        self.keyword = keyword
+        self.searchurl = f'http://{TRACKER}/search?q={quote(keyword)}'
+        self.title = None
+
+    def reset(self, keyword, **kwargs):
+        super().reset(keyword, **kwargs)
+        self.keyword = keyword
+        self.searchurl = f'http://{TRACKER}/search?q={quote(keyword)}'
+        self.title = None
+
+    def start_http_session(self, url=None, **kwargs):
+        response = super().start_http_session(url=self.searchurl, **kwargs)
+        page = self.browser.get_current_page()
+        if page is not None and page.h1 is not None:
+            self.title = page.h1.get_text()
+        return response
+
+
+class BenchItems(Item):
+    keyword = Field()
+    status = Field()
+    title = Field()
+
+
+class BenchLoader(ItemLoader):
+
+    def write(self):
+        self.items['keyword'] = self.spider.keyword
+        self.items['status'] = self.spider.browser.status
+        self.items['title'] = self.spider.title
+        return self.items
+
+
+class BenchExporter(BaseItemExporter):
+    """
+    Count the exported items and the errors, and keep the time of the last one.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.exported = 0
+        self.errors = 0
+        self.last = None
+
+    def export_item(self, item):
+        self.exported += 1
+        if str(item['status']) != '200':
+            self.errors += 1
+        self.last = time.monotonic()
+
+
+def peak_rss_kb():
+    """
+    Return the peak resident set size of this process in KiB, or None.
+    """
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB on linux
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def book_tasks(directory: str, titles: list):
+    path = os.path.join(directory, 'titles.xlsx')
+    pe.save_as(adict={'titles': titles}, dest_file_name=path)
+    return StatefulBook(path, [TRACKER], keywords='titles'), {}
+
+
+def broker_tasks(titles: list):
+    connection = Connection('memory://',
+                            transport_options={'polling_interval': 0.01})
+    tasks = ExchangeQueue([TRACKER], exchange_name='bench')
+    tasks.task_queues[0](connection).declare()
+    with TaskProducer(connection, tasks, batch_size=50) as producer:
+        producer.add_many(titles)
+    return tasks, {'connection': connection}
+
+
+def run_case(source: str, workers: int, tasks: int, spider_pool: bool=False) -> dict:
+    """
+    Scrape `tasks` keywords and return the measurements.
+    """
+    directory = tempfile.mkdtemp(prefix='transistor-bench')
+    titles = [f'title {n}' for n in range(tasks)]
+    try:
+        if source == 'book':
+            task_source, kwargs = book_tasks(directory, titles)
+        else:
+            task_source, kwargs = broker_tasks(titles)
+        exporter = BenchExporter()
+        groups = [WorkGroup(name=TRACKER, url=f'http://{TRACKER}/',
+                            spider=BenchScraper, items=BenchItems,
+                            loader=BenchLoader, exporters=[exporter],
+                            workers=workers,
+                            kwargs={'timeout': (3.0, 30.0), 'qtimeout': 2,
+                                    'spider_pool': spider_pool})]
+        trace_path = os.path.join(directory, 'trace.jsonl')
+        tracer = Tracer(trace_path)
+        manager = BaseWorkGroupManager('bench', task_source, groups,
+                                       pool=workers + 2, qtimeout=2,
+                                       tracer=tracer, **kwargs)
+        started = time.monotonic()
+        manager.main()
+        # the end of the last export, not of main(), which waits `qtimeout`
+        elapsed = (exporter.last or time.monotonic()) - started
+        latency = summarize(trace_path).get('total', {})
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {'source': source, 'workers': workers, 'tasks': tasks,
+            'spider_pool': spider_pool,
+            'exported': exporter.exported, 'errors': exporter.errors,
+            'seconds': round(elapsed, 4),
+            'tasks_per_sec': round(exporter.exported / elapsed, 2) if elapsed else None,
+            'p50_latency': latency.get('p50'), 'p99_latency': latency.get('p99'),
+            'peak_rss_kb': peak_rss_kb()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.throughput_case')
+    parser.add_argument('--source', choices=['book', 'broker'], default='book')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--spider-pool', action='store_true')
+    args = parser.parse_args(argv)
+    result = run_case(args.source, args.workers, args.tasks, args.spider_pool)
+    print(json.dumps(result))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.examples.books_to_scrape.crawler
+~~~~~~~~~~~~
+This module implements an example SharedCrawler. Where BooksToScrapeScraper
+crawls the website for the one book title it was given, BooksToScrapeCrawler
+walks the pages of books.toscrape.com once for every outstanding book title.
+Run it with a CrawlWorker:
+
+    >>> WorkGroup(name='books.toscrape.com', url='http://books.toscrape.com/',
+    >>>           spider=BooksToScrapeCrawler, worker=CrawlWorker, workers=1, ...)
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+from transistor import SplashScraper
+from transistor.crawlers import SharedCrawler
+from examples.books_to_scrape.scraper import BooksToScrapeScraper
+
+
+class BooksToScrapeCrawler(SharedCrawler, BooksToScrapeScraper):
+    """
+    Crawl books.toscrape.com once and collect the price and stock of each book
+    title in the worker's TaskIndex.
+    """
+
+    def __init__(self, index, script=None, **kwargs):
+        """
+        :param index: the CrawlWorker's TaskIndex of outstanding book titles.
+        """
+        super().__init__(book_title=None, script=script, **kwargs)
+        self.index = index
+
+    def start_http_session(self, url=None, timeout=(3.05, 10.05)):
+        """
+        Open the first page, without searching for a title.
+        """
+        return SplashScraper.start_http_session(self, url=url, timeout=timeout)
+
+    def candidates(self):
+        if self.page:
+            for title in self.page.select('article.product_pod h3 a'):
+                yield title['title'], title
+
+    def select(self, book_title, title):
+        self.book_title = book_title
+        self.price = None
+        self.stock = None
+        if title is not None:
+            self._find_price_and_stock(title)
+
+    def next_page(self):
+        if self.page and self.page.find('li', class_='next'):
+            self.open(url=self._next_page())
+            return True
+        return False
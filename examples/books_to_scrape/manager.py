@@ -42,11 +42,11 @@ class BooksWorkGroupManager(BaseWorkGroupManager):
         # the scrape.So there will be some wait period at this point for each
         # worker to actually run out of work and quit with a graceful shutdown.
         # Therefore, A GOOD SPOT TO HOOK SOME POST-SCRAPE LOGIC ON YOUR WORKERS
-        # RESULTS, IS RIGHT HERE. For example, I've simply set `events = []` as a
-        # class attribute on the BaseWorker <Worker> object and then appended
-        # `self` to `events` after each scrape returns, as completed by the Worker.
+        # RESULTS, IS RIGHT HERE. For example, the Worker appends an Item of each
+        # scrape to its `events`, a ring buffer of its most recent results, after
+        # each scrape returns, as completed by the Worker.
         for event in target.events:
-            # here, event represents returned scraper objects which the worker has
+            # here, event represents the scrape results which the worker has
             # completed. We can iterate through the event objects and, for example,
             # apply some data transformation, delete failed scrapes, or save data
             logger.info(f'THIS IS A MONITOR EVENT - > {event}')
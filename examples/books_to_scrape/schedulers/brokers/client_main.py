@@ -16,13 +16,17 @@ command prompt, to simulate a message sent to the broker queue, run:
 
 The result should be the worker will process the `keywords` tasks.
 
+send_as_task() publishes one message per call. For large jobs, use
+send_in_batches(), where TaskProducer packs many keywords into each compressed
+message.
+
 :copyright: Copyright (C) 2018 by BOM Quote Limited
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
 """
 from kombu import Connection
 from kombu.pools import producers
-from transistor.schedulers.brokers.queues import ExchangeQueue
+from transistor.schedulers.brokers import ExchangeQueue, TaskProducer
 from transistor.utility.logging import logger
 
 trackers = ['books.toscrape.com']
@@ -70,6 +74,16 @@ def send_as_task(connection, keywords, routing_key, exchange, kwargs={}):
                          )
 
 
+def send_in_batches(connection, keywords, routing_key, kwargs=None):
+    """
+    Publish the keywords as lz4 compressed batches of 500 keywords per message.
+    """
+    with TaskProducer(connection, tasks, batch_size=500, compression='lz4',
+                      kwargs=kwargs) as producer:
+        producer.add_many(keywords, tracker=routing_key)
+    return producer.published
+
+
 if __name__ == '__main__':
 
     from kombu import Connection
@@ -92,3 +106,6 @@ if __name__ == '__main__':
         send_as_task(conn, keywords=keywords, routing_key='books.toscrape.com',
                      exchange= tasks.task_exchange, kwargs={})
         logger.info(f'sent task {keywords}')
+        titles = ['Sharp Objects', 'The Requiem Red', 'Tipping the Velvet']
+        published = send_in_batches(conn, titles, routing_key='books.toscrape.com')
+        logger.info(f'sent {len(titles)} tasks in {published} messages')
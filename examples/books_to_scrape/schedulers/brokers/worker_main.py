@@ -48,6 +48,11 @@ one worker to crawl each page and collect multiple results per page as they are
 would have crawled a lot less pages in total, bringing some potential net benefit. Even
 if the benefit is just reducing the risk of irritating the target server webmaster.
 
+That alternative design is the shared crawl: use BooksToScrapeCrawler from
+examples/books_to_scrape/crawler.py as the WorkGroup spider, with worker=CrawlWorker
+and workers=1. It walks the 50 pages once and matches every outstanding title on
+each page.
+
 :copyright: Copyright (C) 2018 by BOM Quote Limited
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
@@ -112,7 +117,11 @@ groups = [
         loader=BookItemsLoader,
         exporters=exporters,
         workers=2,  # this creates x scrapers and assigns each a book as a task
-        kwargs={'timeout': (3.0, 20.0)})
+        kwargs={'timeout': (3.0, 20.0),
+                # at most one request per second to books.toscrape.com, over all workers
+                'rate_limit': 1.0,
+                # reuse each worker's scraper, see BooksToScrapeScraper.reset()
+                'spider_pool': True})
     ]
 
 # 4) Last, setup the Manager. You can constrain the number of workers actually
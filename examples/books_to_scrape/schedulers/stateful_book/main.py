@@ -52,6 +52,7 @@ from transistor.persistence.newt_db import get_job_results, delete_job
 from examples.books_to_scrape.persistence.newt_db import ndb
 # finally, the core of what we need to launch the scrape job
 from transistor import WorkGroup, StatefulBook
+from transistor.browsers import PageCache
 from transistor.persistence.exporters import CsvItemExporter
 from transistor.persistence.exporters.json import JsonLinesItemExporter
 from examples.books_to_scrape.workgroup import BooksWorker
@@ -110,7 +111,11 @@ groups = [
         loader=BookItemsLoader,
         exporters=exporters,
         workers=3,  # this creates 3 scrapers and assigns each a book as a task
-        kwargs={'timeout': (3.0, 20.0)})
+        kwargs={'timeout': (3.0, 20.0),
+                # at most one request per second to books.toscrape.com, over all workers
+                'rate_limit': 1.0,
+                # reuse each worker's scraper, see BooksToScrapeScraper.reset()
+                'spider_pool': True})
     ]
 
 # 5) Last, setup the Manager. You can constrain the number of workers actually
@@ -118,7 +123,9 @@ groups = [
 # when using a Crawlera 'C10' plan which limits concurrency to 10. To deploy all
 # the workers concurrently, set the pool +1 higher than the number of total
 # workers assigned in groups in step #3 above. The +1 is for pool manager.
-manager = BooksWorkGroupManager('books_scrape', tasks, workgroups=groups, pool=5)
+# The workers crawl the same pagination pages, so share the renders in a PageCache.
+manager = BooksWorkGroupManager('books_scrape', tasks, workgroups=groups, pool=5,
+                                page_cache=PageCache(ttl=600))
 
 
 if __name__ == "__main__":
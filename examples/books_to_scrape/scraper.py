@@ -10,7 +10,6 @@ to navigate the html tree. This example does not use Crawlera.
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
 """
-import gevent
 from transistor import SplashScraper
 
 
@@ -32,6 +31,16 @@ class BooksToScrapeScraper(SplashScraper):
         self.price = None
         self.stock = None
 
+    def reset(self, book_title, **kwargs):
+        """
+        Reuse this scraper for the next book title, see the `spider_pool`
+        WorkGroup kwarg.
+        """
+        super().reset(book_title, **kwargs)
+        self.book_title = book_title
+        self.price = None
+        self.stock = None
+
     def start_http_session(self, url=None, timeout=(3.05, 10.05)):
         """It is advised to just set this url parameter here to be filled later during
         startup, with a kwarg. This is useful, for example, if your scraper can handle
@@ -74,9 +83,9 @@ class BooksToScrapeScraper(SplashScraper):
         call find_title again.
         """
         if self._next_page():
+            # the manager's rate limiter paces the requests, see the `rate_limit`
+            # in the WorkGroup kwargs
             self.open(url=self._next_page())
-            # use gevent.sleep to add a time delay to avoid hammering the server
-            gevent.sleep(1)
             return self._find_title()
         return print(f'Crawled all pages. Title not found.')
 
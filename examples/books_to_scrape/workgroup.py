@@ -65,11 +65,12 @@ class BooksWorker(BaseWorker):
         """
         A hook point for customization after process_exports.
 
-        In this example, we append the returned scraper object to a
-        class attribute called `events`.
+        In this example, we append an Item with the scrape results to the
+        worker's `events` ring buffer. Not the scraper object itself, since with
+        `spider_pool` the worker resets the same scraper for its next task.
 
         """
-        self.events.append(spider)
+        self.events.append(self.load_items(spider))
         logger.info(f'{self.name} has {spider.stock} inventory status.')
         logger.info(f'pricing: {spider.price}')
         logger.info(f'Worker {self.name}-{self.number} finished task {task}')
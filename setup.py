@@ -58,7 +58,8 @@ test_requirements = [
     'pytest>=4.0.1,<7.0',
     'pytest-cov==2.6.0,<3.0',
     'coverage==4.5.2,<6.0',
-    'mock==2.0.0,<5.0'
+    'mock==2.0.0,<5.0',
+    'fakeredis[lua]>=1.0,<2.0'
 ]
 
 # What packages are optional?
@@ -102,8 +102,8 @@ def _BooksWorker():
             """
             A hook point for customization after process_exports.
 
-            In this example, we append the returned scraper object to a
-            class attribute called `events`.
+            In this example, we append the returned scraper object to the
+            worker's `events` ring buffer.
 
             """
             self.events.append(spider)
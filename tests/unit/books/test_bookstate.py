@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.books.test_bookstate
+~~~~~~~~~~~~
+This module implements unit tests for the StatefulBook priority column.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import pyexcel as pe
+from transistor.schedulers.books.bookstate import StatefulBook
+
+
+def make_book(tmpdir, **kwargs):
+    path = str(tmpdir.join('titles.xlsx'))
+    pe.save_as(adict={'item': ['bulk', 'urgent', 'blank'],
+                      'priority': [0, 10, '']}, dest_file_name=path)
+    return StatefulBook(path, ['books.toscrape.com'], **kwargs)
+
+
+def test_priority_column(tmpdir):
+    book = make_book(tmpdir, priority='priority')
+    assert book.priority_of('urgent') == 10
+    assert book.priority_of('bulk') == 0
+    assert book.priority_of('blank') == 0
+
+
+def test_without_priority_column(tmpdir):
+    book = make_book(tmpdir)
+    assert book.priorities == {}
+    assert book.priority_of('urgent') == 0
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.brokers.test_producer
+~~~~~~~~~~~~
+This module implements unit tests for the task envelope and TaskProducer, using
+the kombu in-memory transport.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import json
+from kombu import Connection, compression
+from pytest import raises
+from transistor.schedulers.brokers import (ExchangeQueue, TaskProducer, get_priority,
+                                          pack, unpack)
+
+
+def drain(connection, queue):
+    """
+    Return the raw messages waiting in `queue`.
+    """
+    messages = []
+    with connection.SimpleQueue(queue) as simple:
+        while simple.qsize():
+            message = simple.get(timeout=1)
+            message.ack()
+            messages.append(message)
+    return messages
+
+
+class TestEnvelope:
+
+    def test_round_trip(self):
+        assert unpack(pack(['Soumission'], {'china': True})) == (
+            ['Soumission'], {'china': True})
+        assert pack(['Soumission']) == {'v': 1, 'k': ['Soumission']}
+
+    def test_original_format(self):
+        body = {'keywords': '["Black Dust", "When We Collided"]', 'kwargs': {}}
+        assert unpack(body) == (['Black Dust', 'When We Collided'], {})
+
+    def test_unsupported_version(self):
+        with raises(ValueError):
+            unpack({'v': 99, 'k': []})
+
+    def test_priority(self):
+        assert get_priority(pack(['Soumission'], priority=10)) == 10
+        assert get_priority(pack(['Soumission'])) == 0
+        assert get_priority({'keywords': [], 'kwargs': {}, 'priority': '5'}) == 5
+        assert get_priority({'v': 1, 'k': [], 'p': 'urgent'}) == 0
+
+
+class TestTaskProducer:
+
+    def test_batches(self):
+        connection = Connection('memory://')
+        tasks = ExchangeQueue(['books.toscrape.com', 'mousekey.com'],
+                              exchange_name='test-producer-batches')
+        for queue in tasks.task_queues:
+            queue(connection).declare()
+        with TaskProducer(connection, tasks, batch_size=40) as producer:
+            producer.add_many((f'title-{n}' for n in range(100)))
+            producer.add('TPA2012', 'mousekey.com')
+        assert producer.published == 4
+
+        books = drain(connection, tasks.task_queues[0])
+        assert [len(unpack(m.payload)[0]) for m in books] == [40, 40, 20]
+        assert [k for m in books for k in unpack(m.payload)[0]] == [
+            f'title-{n}' for n in range(100)]
+        mousekey = drain(connection, tasks.task_queues[1])
+        assert unpack(mousekey[0].payload) == (['TPA2012'], {})
+        connection.release()
+
+    def test_compression(self):
+        connection = Connection('memory://')
+        tasks = ExchangeQueue(['books.toscrape.com'],
+                              exchange_name='test-compression')
+        tasks.task_queues[0](connection).declare()
+        for method, content_type in (('zlib', 'application/x-gzip'),
+                                     ('lz4', 'application/x-lz4')):
+            with TaskProducer(connection, tasks, compression=method) as producer:
+                producer.add_many(f'part number {n}' for n in range(500))
+            message, = drain(connection, tasks.task_queues[0])
+            assert message.headers['compression'] == content_type
+            assert len(unpack(message.payload)[0]) == 500
+            raw = json.dumps(message.payload).encode()
+            assert len(compression.compress(raw, method)[0]) < len(raw) / 2
+        connection.release()
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.browsers.test_cache
+~~~~~~~~~~~~
+This module implements unit tests for PageCache and its use by SplashBrowser,
+with a fake Splash session so no Splash service is needed.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import json
+import gevent
+from requests import Response
+from transistor import SplashBrowser
+from transistor.browsers.cache import PageCache, request_fingerprint
+
+ENDPOINT = 'http://localhost:8050/execute'
+
+
+def fake_response(url, status_code=200, size=None):
+    html = f'<html><body>{url}</body></html>'
+    response = Response()
+    response.status_code = status_code
+    response.url = ENDPOINT
+    response._content = json.dumps({'url': url, 'html': html}).encode('utf-8')
+    if size is not None:
+        response._content = response._content.ljust(size)
+    return response
+
+
+class FakeSplash:
+    """
+    Stands in for SplashBrowser.session.post and counts the renders.
+    """
+
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.renders = []
+
+    def post(self, endpoint, json=None, **kwargs):
+        self.renders.append(json['url'])
+        gevent.sleep(0.01)
+        return fake_response(json['url'], self.status_code)
+
+
+def splash_args(url, **kwargs):
+    return dict({'lua_source': 'return splash:html()', 'url': url,
+                 'session_id': 'create', 'cookies': {}}, **kwargs)
+
+
+class TestPageCache:
+
+    def test_fingerprint(self):
+        key = request_fingerprint(ENDPOINT, splash_args('http://a/'))
+        assert key == request_fingerprint(
+            ENDPOINT, splash_args('http://a/', session_id='1234', cookies={'a': 1}))
+        assert key != request_fingerprint(ENDPOINT, splash_args('http://b/'))
+        assert key != request_fingerprint(
+            ENDPOINT, splash_args('http://a/', lua_source='return 1'))
+
+    def test_lru_size_bound(self):
+        cache = PageCache(max_bytes=250)
+        for key in 'abc':
+            cache.set(key, fake_response(key, size=100))
+        assert cache.get('a') is None
+        assert cache.get('b').content == fake_response('b', size=100).content
+        cache.set('d', fake_response('d', size=100))
+        # b was used more recently than c
+        assert cache.get('c') is None
+        assert cache.get('b') is not None
+        assert cache.size == 200
+
+    def test_ttl(self):
+        cache = PageCache(ttl=0.01)
+        cache.set('a', fake_response('a'))
+        assert cache.get('a') is not None
+        gevent.sleep(0.02)
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_single_flight(self):
+        cache = PageCache()
+        splash = FakeSplash()
+
+        def fetch():
+            return cache.fetch('a', lambda: splash.post(ENDPOINT, splash_args('a')))
+
+        results = [g.get() for g in gevent.joinall([gevent.spawn(fetch)
+                                                    for _ in range(5)])]
+        assert splash.renders == ['a']
+        assert [rendered for _, rendered in results].count(True) == 1
+        assert cache.coalesced == 4
+        fetch()
+        assert cache.hits == 5
+
+    def test_does_not_cache_bans(self):
+        cache = PageCache()
+        splash = FakeSplash(status_code=503)
+        greenlets = [gevent.spawn(cache.fetch, 'a',
+                                  lambda: splash.post(ENDPOINT, splash_args('a')))
+                     for _ in range(3)]
+        gevent.joinall(greenlets)
+        # the waiters send their own request after a failed render
+        assert len(splash.renders) == 3
+        assert len(cache) == 0
+
+
+class TestSplashBrowserCache:
+
+    def test_browsers_share_renders(self):
+        splash = FakeSplash()
+        cache = PageCache()
+        browsers = [SplashBrowser(soup_config={'features': 'lxml'}) for _ in range(4)]
+        for browser in browsers:
+            browser.session.post = splash.post
+            browser.page_cache = cache
+
+        def open_pages(browser):
+            for url in ('http://books.toscrape.com/', 'http://books.toscrape.com/2'):
+                browser.post(ENDPOINT, json=splash_args(url))
+            return browser.get_current_page().body.text
+
+        pages = [g.get() for g in gevent.joinall([gevent.spawn(open_pages, browser)
+                                                  for browser in browsers])]
+        assert pages == ['http://books.toscrape.com/2'] * 4
+        assert splash.renders == ['http://books.toscrape.com/',
+                                  'http://books.toscrape.com/2']
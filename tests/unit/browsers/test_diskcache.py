@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.browsers.test_diskcache
+~~~~~~~~~~~~
+This module implements unit tests for DiskCache.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import os
+import json
+import time
+import multiprocessing
+import pytest
+from transistor import SplashBrowser
+from transistor.browsers import DiskCache
+from transistor.exceptions import CacheMiss
+from tests.unit.browsers.test_cache import (ENDPOINT, FakeSplash, fake_response,
+                                            splash_args)
+
+
+def write_keys(path):
+    cache = DiskCache(path)
+    for n in range(20):
+        cache.set(f'key{n:02}', fake_response(f'http://books.toscrape.com/{n}',
+                                              size=5000))
+
+
+class TestDiskCache:
+
+    def test_round_trip_compressed(self, tmp_path):
+        cache = DiskCache(str(tmp_path))
+        response = fake_response('http://books.toscrape.com/', size=20000)
+        cache.set('abcdef', response)
+        cached = DiskCache(str(tmp_path)).get('abcdef')
+        assert cached.content == response.content
+        assert cached.status_code == 200
+        assert os.path.getsize(tmp_path / 'ab' / 'abcdef') < 1000
+        assert len(cache) == 1
+        cache.clear()
+        assert cache.get('abcdef') is None
+
+    def test_ttl_policy(self, tmp_path):
+        cache = DiskCache(str(tmp_path), policy='ttl', ttl=0.05)
+        cache.set('abcdef', fake_response('http://books.toscrape.com/'))
+        assert cache.get('abcdef') is not None
+        time.sleep(0.06)
+        assert cache.get('abcdef') is None
+        with pytest.raises(ValueError):
+            DiskCache(str(tmp_path), policy='ttl')
+
+    def test_offline_policy(self, tmp_path):
+        splash = FakeSplash()
+        browser = SplashBrowser(soup_config={'features': 'lxml'})
+        browser.session.post = splash.post
+        browser.page_cache = DiskCache(str(tmp_path))
+        browser.post(ENDPOINT, json=splash_args('http://books.toscrape.com/'))
+
+        browser.page_cache = DiskCache(str(tmp_path), policy='offline')
+        browser.post(ENDPOINT, json=splash_args('http://books.toscrape.com/',
+                                                session_id='1234'))
+        assert browser.get_current_page().body.text == 'http://books.toscrape.com/'
+        with pytest.raises(CacheMiss):
+            browser.post(ENDPOINT, json=splash_args('http://books.toscrape.com/2'))
+        assert splash.renders == ['http://books.toscrape.com/']
+
+    def test_refresh_cached_page(self, tmp_path):
+        """
+        A page restored from the disk has the request to render it again.
+        """
+        args = splash_args('http://books.toscrape.com/')
+        browser = SplashBrowser(soup_config={'features': 'lxml'})
+        browser.session.post = FakeSplash().post
+        browser.page_cache = DiskCache(str(tmp_path))
+        browser.post(ENDPOINT, json=dict(args))
+
+        sent = []
+
+        def send(request):
+            sent.append(request)
+            return fake_response('http://books.toscrape.com/?refreshed')
+
+        browser = SplashBrowser(soup_config={'features': 'lxml'})
+        browser.session.send = send
+        browser.page_cache = DiskCache(str(tmp_path))
+        browser.post(ENDPOINT, json=dict(args))
+        assert browser.page_cache.hits == 1
+        browser.refresh()
+        assert sent[0].method == 'POST' and sent[0].url == ENDPOINT
+        assert json.loads(sent[0].body) == args
+        assert browser.get_current_page().body.text == \
+            'http://books.toscrape.com/?refreshed'
+
+    def test_concurrent_processes(self, tmp_path):
+        processes = [multiprocessing.Process(target=write_keys, args=(str(tmp_path),))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        reader = DiskCache(str(tmp_path))
+        while any(process.is_alive() for process in processes):
+            for n in range(20):
+                cached = reader.get(f'key{n:02}')
+                assert cached is None or len(cached.content) == 5000
+        for process in processes:
+            process.join()
+            assert process.exitcode == 0
+        assert len(reader) == 20
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.crawlers.test_shared
+~~~~~~~~~~~~
+This module implements unit tests for TaskIndex and a shared crawl with a
+CrawlWorker.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import gevent
+from transistor import BaseWorkGroupManager, WorkGroup
+from transistor.crawlers import SharedCrawler, TaskIndex
+from transistor.monitoring import MemoryWatchdog
+from transistor.persistence.containers import Field, Item
+from transistor.persistence.loader import ItemLoader
+from transistor.schedulers.sources import IterTaskSource
+from transistor.schedulers.task import Task
+from transistor.workers import CrawlWorker
+from tests.unit.managers.test_base_manager import ListExporter
+
+# 5 pages of 4 titles each
+SITE = [[f'Title {page}-{n}' for n in range(4)] for page in range(5)]
+
+
+class StubCrawler(SharedCrawler):
+    """
+    Crawls SITE without making any network request.
+    """
+    rendered = []
+
+    def __init__(self, index, name=None, number=None, **kwargs):
+        self.index = index
+        self.name = name
+        self.page = 0
+        self.keyword = None
+        self.found = None
+
+    def start_http_session(self, **kwargs):
+        self.rendered.append(self.page)
+
+    def candidates(self):
+        for title in SITE[self.page]:
+            yield title, self.page
+
+    def select(self, keyword, match):
+        self.keyword = keyword
+        self.found = match
+
+    def next_page(self):
+        gevent.sleep(0)
+        if self.page + 1 == len(SITE):
+            return False
+        self.page += 1
+        self.rendered.append(self.page)
+        return True
+
+
+class CrawlItems(Item):
+    keyword = Field()
+    found = Field()
+
+
+class CrawlLoader(ItemLoader):
+
+    def write(self):
+        self.items['keyword'] = self.spider.keyword
+        self.items['found'] = self.spider.found
+        return self.items
+
+
+class FailingCrawler(StubCrawler):
+    """
+    Raises in select() for the tasks named 'fail', one of which is on page 1.
+    """
+
+    def candidates(self):
+        for title, page in super().candidates():
+            yield ('fail ' + title if title == 'Title 1-2' else title), page
+
+    def select(self, keyword, match):
+        if keyword.startswith('fail'):
+            raise ValueError(f'cannot select {keyword}')
+        super().select(keyword, match)
+
+
+def run(titles, buffer=100, spider=StubCrawler, **kwargs):
+    StubCrawler.rendered = []
+    exporter = ListExporter()
+    groups = [WorkGroup(name='books.toscrape.com', url='http://books.toscrape.com/',
+                        spider=spider, worker=CrawlWorker, items=CrawlItems,
+                        loader=CrawlLoader, exporters=[exporter], workers=1)]
+    tasks = IterTaskSource(iter(titles), ['books.toscrape.com'], buffer=buffer)
+    with gevent.Timeout(30):
+        BaseWorkGroupManager('job', tasks, groups, pool=5, qtimeout=2,
+                             **kwargs).main()
+    return {i['keyword']: i['found'] for i in exporter.exported}, StubCrawler.rendered
+
+
+class TestTaskIndex:
+
+    def test_pop_and_discard(self):
+        task = Task('Soumission')
+        index = TaskIndex(['soumission ', task, 'Black Dust'])
+        assert len(index) == 3
+        assert 'SOUMISSION' in index
+        assert index.pop('Soumission') == ['soumission ', task]
+        assert not index.discard(task)
+        assert index.pop('Soumission') == []
+        assert index.clear() == ['Black Dust']
+        assert not index
+
+    def test_search(self):
+        index = TaskIndex(['BAV99', 'BAV99W', 'LM317'])
+        assert index.search('bav99w, LM317T and BAV99') == ['bav99w', 'bav99']
+        index.pop('BAV99')
+        assert index.search('bav99w, LM317T and BAV99') == ['bav99w']
+
+
+class TestCrawlWorker:
+
+    def test_crawls_once_for_all_tasks(self):
+        titles = ['Title 4-1', 'Title 0-2', 'Title 2-3', 'Missing']
+        results, rendered = run(titles)
+        assert results == {'Title 4-1': 4, 'Title 0-2': 0, 'Title 2-3': 2,
+                           'Missing': None}
+        assert rendered == [0, 1, 2, 3, 4]
+
+    def test_stops_when_all_tasks_matched(self):
+        results, rendered = run(['Title 0-0', 'Title 1-3'])
+        assert results == {'Title 0-0': 0, 'Title 1-3': 1}
+        assert rendered == [0, 1]
+
+    def test_late_tasks(self):
+        """
+        Tasks which arrive during a crawl are still found on the earlier pages.
+        """
+        titles = [title for page in SITE for title in page]
+        results, rendered = run(titles, buffer=1)
+        assert results == {title: int(title[6]) for title in titles}
+        assert len(rendered) < len(SITE) * len(titles)
+
+    def test_waits_while_paused(self):
+        """
+        A CrawlWorker waits for its next task while the MemoryWatchdog holds
+        back dispatching, instead of quitting after its qtimeout.
+        """
+        # always over budget, so dispatching pauses for longer than qtimeout
+        memory = MemoryWatchdog(budget_mb=1, interval=0.1, trace=False,
+                                max_pause=2.5)
+        results, _ = run(['Title 0-1', 'Title 1-2', 'Missing'], buffer=1,
+                         memory=memory)
+        assert results == {'Title 0-1': 0, 'Title 1-2': 1, 'Missing': None}
+        assert memory.pauses >= 1
+
+    def test_failed_select(self):
+        """
+        A task whose select() raises, after it was taken out of the index, fails
+        on its own, and the crawl carries on with the others.
+        """
+        outcomes = {}
+        tasks = [Task(title) for title in
+                 ['Title 0-1', 'fail Title 1-2', 'Title 3-0', 'fail missing']]
+        for task in tasks:
+            task.on_done(lambda task, failed: outcomes.update({task.keyword: failed}))
+        # one failing task is matched on a page, the other one is not found
+        results, _ = run(tasks, spider=FailingCrawler)
+        assert results == {'Title 0-1': 0, 'Title 3-0': 3}
+        assert outcomes == {'Title 0-1': False, 'fail Title 1-2': True,
+                            'Title 3-0': False, 'fail missing': True}
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.leases.test_redis_backend
+~~~~~~~~~~~~
+This module implements unit tests for the RedisLeaseBackend, against an
+in-process Redis from fakeredis, which runs the Lua scripts with lupa.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import time
+import pytest
+from transistor.schedulers.leases import RedisLeaseBackend
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')
+
+
+@pytest.fixture
+def nodes():
+    server = fakeredis.FakeServer()
+    return (RedisLeaseBackend(fakeredis.FakeStrictRedis(server=server)),
+            RedisLeaseBackend(fakeredis.FakeStrictRedis(server=server)))
+
+
+class TestRedisLeaseBackend:
+
+    def test_lease_is_exclusive(self, nodes):
+        node_a, node_b = nodes
+        assert node_a.acquire('job:books:Soumission', 'a', ttl=30, payload='x')
+        assert not node_b.acquire('job:books:Soumission', 'b', ttl=30)
+        assert node_a.acquire('job:books:Soumission', 'a', ttl=30)
+        assert not node_b.release('job:books:Soumission', 'b')
+        assert node_a.release('job:books:Soumission', 'a')
+        assert node_b.acquire('job:books:Soumission', 'b', ttl=30)
+
+    def test_renew(self, nodes):
+        node_a, node_b = nodes
+        node_a.acquire('job:books:Soumission', 'a', ttl=0.05)
+        node_a.acquire('job:books:Black Dust', 'a', ttl=0.05)
+        node_b.acquire('job:books:Sharp Objects', 'b', ttl=0.05)
+        assert node_a.renew('a', ttl=30) == 2
+        time.sleep(0.1)
+        # renewed leases are still held, the other one expired
+        assert not node_b.acquire('job:books:Soumission', 'b', ttl=30)
+        assert node_a.acquire('job:books:Sharp Objects', 'a', ttl=30)
+
+    def test_reclaim_expired(self, nodes):
+        node_a, node_b = nodes
+        node_a.acquire('job:books:Soumission', 'a', ttl=0.05, payload='one')
+        node_a.acquire('job:books:Black Dust', 'a', ttl=0.05, payload='two')
+        node_b.acquire('job:books:Sharp Objects', 'b', ttl=0.05)
+        assert node_b.renew('b', ttl=30) == 1
+        assert node_b.reclaim('b', ttl=30) == []
+        time.sleep(0.1)
+        assert sorted(node_b.reclaim('b', ttl=30)) == [
+            ('job:books:Black Dust', 'two'), ('job:books:Soumission', 'one')]
+        # reclaimed leases are renewed by their new owner, not the old one
+        assert node_a.renew('a', ttl=30) == 0
+        assert not node_a.release('job:books:Soumission', 'a')
+        assert node_b.reclaim('b', ttl=30) == []
+        assert node_b.release('job:books:Soumission', 'b')
+        assert node_a.acquire('job:books:Soumission', 'a', ttl=30)
+
+    def test_reclaim_limit(self, nodes):
+        node_a, node_b = nodes
+        for n in range(3):
+            node_a.acquire(f'job:books:{n}', 'a', ttl=0)
+        assert len(node_b.reclaim('b', ttl=30, limit=2)) == 2
+        assert len(node_b.reclaim('b', ttl=30, limit=2)) == 1
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.leases.test_sqlite_backend
+~~~~~~~~~~~~
+This module implements unit tests for the SqliteLeaseBackend.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sqlite3
+import time
+import gevent
+import pytest
+from transistor.schedulers.leases import SqliteLeaseBackend
+
+
+class TestSqliteLeaseBackend:
+
+    def test_lease_is_exclusive(self, tmpdir):
+        path = str(tmpdir.join('leases.sqlite'))
+        node_a, node_b = SqliteLeaseBackend(path), SqliteLeaseBackend(path)
+        assert node_a.acquire('job:books:Soumission', 'a', ttl=30, payload='x')
+        assert not node_b.acquire('job:books:Soumission', 'b', ttl=30)
+        assert node_a.acquire('job:books:Soumission', 'a', ttl=30)
+        assert not node_b.release('job:books:Soumission', 'b')
+        assert node_a.release('job:books:Soumission', 'a')
+        assert node_b.acquire('job:books:Soumission', 'b', ttl=30)
+        node_a.close()
+        node_b.close()
+
+    def test_reclaim_expired(self, tmpdir):
+        path = str(tmpdir.join('leases.sqlite'))
+        node_a, node_b = SqliteLeaseBackend(path), SqliteLeaseBackend(path)
+        node_a.acquire('job:books:Soumission', 'a', ttl=0.05, payload='one')
+        node_a.acquire('job:books:Black Dust', 'a', ttl=0.05, payload='two')
+        node_b.acquire('job:books:Sharp Objects', 'b', ttl=0.05)
+        assert node_b.renew('b', ttl=30) == 1
+        assert node_b.reclaim('b', ttl=30) == []
+        time.sleep(0.1)
+        assert sorted(node_b.reclaim('b', ttl=30)) == [
+            ('job:books:Black Dust', 'two'), ('job:books:Soumission', 'one')]
+        # reclaimed leases are renewed by their new owner, not the old one
+        assert node_a.renew('a', ttl=30) == 0
+        assert not node_a.release('job:books:Soumission', 'a')
+        assert node_b.reclaim('b', ttl=30) == []
+        node_a.close()
+        node_b.close()
+
+    def test_waits_without_blocking_the_hub(self, tmpdir):
+        path = str(tmpdir.join('leases.sqlite'))
+        node_a, node_b = SqliteLeaseBackend(path), SqliteLeaseBackend(path)
+        # node_a holds the lock on the database
+        node_a.conn.execute('BEGIN IMMEDIATE')
+        acquire = gevent.spawn(node_b.acquire, 'job:books:Soumission', 'b', ttl=30)
+        ticks = []
+        for _ in range(5):
+            gevent.sleep(0.01)
+            ticks.append(acquire.ready())
+        assert ticks == [False] * 5
+        node_a.conn.execute('COMMIT')
+        assert acquire.get(timeout=1)
+        node_a.close()
+        node_b.close()
+
+    def test_greenlets_share_the_connection(self, tmpdir):
+        """
+        While a greenlet waits for the lock on the database to commit, the
+        other greenlets of the node wait their turn, instead of beginning their
+        transactions inside its transaction.
+        """
+        path = str(tmpdir.join('leases.sqlite'))
+        node_a, node_b = SqliteLeaseBackend(path), SqliteLeaseBackend(path)
+        # node_a reads, so node_b can begin, but waits to commit
+        node_a.conn.execute('BEGIN')
+        node_a.conn.execute(f'SELECT * FROM {node_a.table}').fetchall()
+        acquires = [gevent.spawn(node_b.acquire, f'job:books:{n}', 'b', ttl=30)
+                    for n in range(3)]
+        acquires.append(gevent.spawn(node_b.acquire, 'job:books:0', 'c', ttl=30))
+        gevent.sleep(0.05)
+        node_a.conn.execute('COMMIT')
+        assert [g.get(timeout=1) for g in acquires] == [True, True, True, False]
+        assert node_b.renew('b', ttl=30) == 3
+        node_a.close()
+        node_b.close()
+
+    def test_lock_timeout(self, tmpdir):
+        path = str(tmpdir.join('leases.sqlite'))
+        node_a = SqliteLeaseBackend(path)
+        node_b = SqliteLeaseBackend(path, timeout=0.05)
+        node_a.conn.execute('BEGIN IMMEDIATE')
+        with pytest.raises(sqlite3.OperationalError):
+            node_b.acquire('job:books:Soumission', 'b', ttl=30)
+        node_a.conn.execute('ROLLBACK')
+        node_a.close()
+        node_b.close()
@@ -0,0 +1,435 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.managers.test_base_manager
+~~~~~~~~~~~~
+This module implements unit tests for BaseWorkGroupManager, using a stub spider
+so that no Splash service or network access is needed.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import gevent
+import gevent.event
+import pytest
+import pyexcel as pe
+from unittest import mock
+from kombu import Connection
+from transistor import BaseWorkGroupManager, WorkGroup, Item, Field
+from transistor.persistence.exporters.base import BaseItemExporter
+from transistor.persistence.loader import ItemLoader
+from transistor.schedulers.books.bookstate import StatefulBook
+from transistor.schedulers.brokers.queues import ExchangeQueue
+from transistor.schedulers.leases import SqliteLeaseBackend
+from transistor.schedulers.sources import IterTaskSource
+
+
+class StubSpider:
+    """
+    Stands in for a SplashScraper without making any network request.
+    """
+
+    def __init__(self, keyword, name=None, number=None, **kwargs):
+        self.keyword = keyword
+        self.name = name
+        self.number = number
+
+    def start_http_session(self, **kwargs):
+        gevent.sleep(0)
+
+
+class FailingSpider(StubSpider):
+    """
+    A stub spider which raises for the keyword 'fail'.
+    """
+
+    def start_http_session(self, **kwargs):
+        gevent.sleep(0)
+        if self.keyword == 'fail':
+            raise ValueError('the scrape failed')
+
+
+class StubItems(Item):
+    keyword = Field()
+    name = Field()
+
+
+class StubLoader(ItemLoader):
+
+    def write(self):
+        self.items['keyword'] = str(self.spider.keyword)
+        self.items['name'] = self.spider.name
+        return self.items
+
+
+class ListExporter(BaseItemExporter):
+    """
+    Collect the exported items in a list.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.exported = []
+
+    def export_item(self, item):
+        self.exported.append(dict(item))
+
+
+def stub_groups(exporter, names=('books.toscrape.com',), workers=2,
+                spider=StubSpider, **kwargs):
+    """
+    Return a list of WorkGroups using the stub spider, loader and exporter.
+    """
+    return [WorkGroup(name=name, url='http://books.toscrape.com/',
+                      spider=spider, items=StubItems, loader=StubLoader,
+                      exporters=[exporter], workers=workers, kwargs=dict(kwargs))
+            for name in names]
+
+
+class TestFailedTasks:
+    """
+    A task which raises fails on its own, the worker carries on with the others.
+    """
+    titles = [f'title-{n}' for n in range(4)] + ['fail'] + \
+        [f'title-{n}' for n in range(4, 9)]
+
+    def test_stateful_book(self, tmpdir):
+        path = str(tmpdir.join('titles.xlsx'))
+        pe.save_as(adict={'item': self.titles}, dest_file_name=path)
+        exporter = ListExporter()
+        book = StatefulBook(path, ['books.toscrape.com'])
+        manager = BaseWorkGroupManager(
+            'job', book, stub_groups(exporter, spider=FailingSpider),
+            pool=5, qtimeout=2)
+        with gevent.Timeout(30):
+            manager.main()
+        assert len(exporter.exported) == 9
+
+    def test_task_source(self):
+        exporter = ListExporter()
+        tasks = IterTaskSource(iter(self.titles), ['books.toscrape.com'])
+        manager = BaseWorkGroupManager(
+            'job', tasks, stub_groups(exporter, spider=FailingSpider),
+            pool=5, qtimeout=2)
+        with gevent.Timeout(30):
+            manager.main()
+        assert sorted(i['keyword'] for i in exporter.exported) == sorted(
+            t for t in self.titles if t != 'fail')
+
+    def test_skips_workers_which_quit(self):
+        """
+        Tasks for a workgroup whose workers all quit fail, instead of blocking
+        the manager for ever.
+        """
+        exporter = ListExporter()
+        tasks = IterTaskSource(iter(self.titles), ['books.toscrape.com'])
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=5, qtimeout=2)
+        manager.monitor = lambda target: None
+        with gevent.Timeout(30):
+            manager.main()
+        assert exporter.exported == []
+
+
+class TestTaskSourceManager:
+    """
+    Unit test a manager fed by a TaskSource.
+    """
+
+    def test_streams_all_tasks(self):
+        exporter = ListExporter()
+        titles = [f'title-{n}' for n in range(25)]
+        tasks = IterTaskSource(iter(titles), ['books.toscrape.com'], buffer=2)
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=5, qtimeout=2)
+        manager.main()
+        assert sorted(i['keyword'] for i in exporter.exported) == sorted(titles)
+
+    def test_slow_source_overlaps_scraping(self):
+        """
+        The first results are exported before the source is exhausted.
+        """
+        exporter = ListExporter()
+        exported_while_feeding = []
+
+        def titles():
+            for n in range(5):
+                exported_while_feeding.append(len(exporter.exported))
+                gevent.sleep(0.05)
+                yield f'title-{n}'
+
+        tasks = IterTaskSource(titles(), ['books.toscrape.com'], buffer=1)
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=5, qtimeout=2)
+        manager.main()
+        assert len(exporter.exported) == 5
+        assert exported_while_feeding[-1] > 0
+
+    def test_slow_tracker(self):
+        """
+        A tracker whose workers are stuck holds the feed for the others only once
+        its backlog is full too.
+        """
+        exporter = ListExporter()
+        release = gevent.event.Event()
+
+        class StuckSpider(StubSpider):
+            def start_http_session(self, **kwargs):
+                if self.name == 'slow.com':
+                    release.wait()
+
+        titles = [f'title-{n}' for n in range(20)]
+        tasks = IterTaskSource(iter(titles), ['slow.com', 'books.toscrape.com'],
+                               buffer=3)
+        manager = BaseWorkGroupManager(
+            'job', tasks, stub_groups(exporter, names=tasks.trackers, workers=1,
+                                      spider=StuckSpider),
+            pool=5, qtimeout=2)
+        with gevent.Timeout(30):
+            runner = gevent.spawn(manager.main)
+            gevent.sleep(0.5)
+            fast = [i for i in exporter.exported if i['name'] == 'books.toscrape.com']
+            # the slow tracker's worker, worker queue, dispatcher and tracker
+            # queue hold 6 tasks, which would stop the feed without its backlog
+            assert len(fast) > 6
+            release.set()
+            runner.get()
+        assert len(exporter.exported) == 40
+
+    def test_tracker_without_workgroup(self):
+        """
+        The tasks of a tracker without a WorkGroup are left alone, instead of
+        the manager waiting for them to be dispatched.
+        """
+        exporter = ListExporter()
+        tasks = IterTaskSource(iter(['a', 'b', 'c']),
+                               ['books.toscrape.com', 'unmatched.com'], buffer=1)
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=5, qtimeout=2)
+        with gevent.Timeout(30):
+            manager.main()
+        assert sorted(i['keyword'] for i in exporter.exported) == ['a', 'b', 'c']
+
+    @staticmethod
+    def broken_titles():
+        for n in range(5):
+            yield f'title-{n}'
+        raise IOError('lost the connection to the task database')
+
+    def test_source_error_raised_by_main(self):
+        """
+        The tasks read before the source failed are scraped, then main() raises.
+        """
+        exporter = ListExporter()
+        tasks = IterTaskSource(self.broken_titles(), ['books.toscrape.com'])
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=5, qtimeout=2)
+        with gevent.Timeout(30), pytest.raises(IOError):
+            manager.main()
+        assert len(exporter.exported) == 5
+
+    def test_source_error_raised_by_iter_results(self):
+        exporter = ListExporter()
+        tasks = IterTaskSource(self.broken_titles(), ['books.toscrape.com'])
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=5, qtimeout=2)
+        keywords = []
+        with gevent.Timeout(30), pytest.raises(IOError):
+            for item in manager.iter_results():
+                keywords.append(item['keyword'])
+        assert len(keywords) == 5
+
+    def test_iter_results(self):
+        """
+        Items are yielded while the job runs, and a full results queue holds the
+        workers back.
+        """
+        exporter = ListExporter()
+        titles = [f'title-{n}' for n in range(10)]
+        tasks = IterTaskSource(iter(titles), ['books.toscrape.com'])
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=5, qtimeout=2)
+        keywords = []
+        with gevent.Timeout(30):
+            for item in manager.iter_results(maxsize=1):
+                if not keywords:
+                    gevent.sleep(0.1)
+                    # one item waits in the queue, each worker holds one more
+                    assert len(exporter.exported) <= 4
+                keywords.append(item['keyword'])
+        assert sorted(keywords) == sorted(titles)
+        assert len(exporter.exported) == 10
+
+    def test_iter_results_stopped_early(self):
+        exporter = ListExporter()
+        titles = [f'title-{n}' for n in range(10)]
+        tasks = IterTaskSource(iter(titles), ['books.toscrape.com'])
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=5, qtimeout=2)
+        with gevent.Timeout(30):
+            for _ in manager.iter_results(maxsize=1):
+                break
+            # the caller is not held up until the end of the job
+            assert len(exporter.exported) < 10
+            # which runs to the end without it
+            while len(exporter.exported) < 10:
+                gevent.sleep(0.05)
+
+
+class TestBrokerManager:
+    """
+    Unit test a manager consuming tasks from a broker, using the kombu
+    in-memory transport.
+    """
+
+    def publish(self, connection, tasks, batches, routing_key='books.toscrape.com'):
+        with connection.Producer() as producer:
+            for keywords in batches:
+                producer.publish({'keywords': keywords, 'kwargs': {}},
+                                 exchange=tasks.task_exchange,
+                                 routing_key=routing_key,
+                                 declare=tasks.task_queues,
+                                 serializer='json')
+
+    def run(self, manager):
+        # the memory transport polls with time.sleep, like a broker socket
+        # without monkey patching it would block the other greenlets
+        with mock.patch('kombu.transport.virtual.base.sleep', gevent.sleep):
+            manager.main()
+
+    def test_ack_after_export(self):
+        exporter = ListExporter()
+        connection = Connection('memory://',
+                                transport_options={'polling_interval': 0.01})
+        tasks = ExchangeQueue(['books.toscrape.com'],
+                              exchange_name='test-ack-after-export')
+        batches = [[f'title-{n}-{m}' for m in range(3)] for n in range(6)]
+        self.publish(connection, tasks, batches)
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=10, connection=connection,
+                                       qtimeout=2)
+        assert manager._get_prefetch_count('books.toscrape.com') == 2
+        acked = []
+        exported_when_acked = []
+
+        def process_task(body, message, **kwargs):
+            ack = message.ack
+
+            def counting_ack(*args, **kwargs):
+                acked.append(body['keywords'])
+                exported_when_acked.append(len(exporter.exported))
+                assert manager._outstanding <= 2
+                return ack(*args, **kwargs)
+            message.ack = counting_ack
+            return BaseWorkGroupManager.process_task(manager, body, message,
+                                                     **kwargs)
+
+        manager.process_task = process_task
+        self.run(manager)
+
+        assert len(exporter.exported) == 18
+        assert sorted(map(tuple, acked)) == sorted(map(tuple, batches))
+        for keywords, exported in zip(acked, exported_when_acked):
+            assert exported >= len(keywords)
+        with connection.SimpleQueue(tasks.task_queues[0]) as queue:
+            assert queue.qsize() == 0
+        connection.release()
+
+    def test_tasks_put_while_dispatch_quits(self):
+        """
+        A message consumed after the dispatcher ran out of tasks, but before
+        manage() returned, does not wake the manager, so manage() dispatches it.
+        """
+        exporter = ListExporter()
+        connection = Connection('memory://',
+                                transport_options={'polling_interval': 0.01})
+        tasks = ExchangeQueue(['books.toscrape.com'],
+                              exchange_name='test-dispatch-quits')
+        manager = BaseWorkGroupManager('job', tasks,
+                                       stub_groups(exporter, workers=1),
+                                       pool=5, connection=connection,
+                                       qtimeout=2, qsize=1)
+        dispatch = manager.dispatch
+        message = mock.Mock()
+
+        def racing_dispatch(name, workgroup, q):
+            if message.delivery_tag is not None:
+                message.delivery_tag = None
+                # runs right after this dispatcher quits
+                gevent.spawn(manager.process_task,
+                             {'keywords': ['title-0', 'title-1', 'title-2'],
+                              'kwargs': {}}, message, tracker=name)
+                return
+            return dispatch(name, workgroup, q)
+
+        manager.dispatch = racing_dispatch
+        with gevent.Timeout(10):
+            self.run(manager)
+        assert sorted(i['keyword'] for i in exporter.exported) == [
+            'title-0', 'title-1', 'title-2']
+        message.ack.assert_called_once_with()
+        connection.release()
+
+    def test_routes_to_tracker(self):
+        exporter = ListExporter()
+        connection = Connection('memory://',
+                                transport_options={'polling_interval': 0.01})
+        trackers = ['books.toscrape.com', 'mousekey.com']
+        tasks = ExchangeQueue(trackers, exchange_name='test-routes-to-tracker')
+        self.publish(connection, tasks, [['title-0', 'title-1']],
+                     routing_key='mousekey.com')
+        manager = BaseWorkGroupManager('job', tasks,
+                                       stub_groups(exporter, names=trackers),
+                                       pool=10, connection=connection,
+                                       qtimeout=2)
+        self.run(manager)
+        assert sorted((i['name'], i['keyword']) for i in exporter.exported) == [
+            ('mousekey.com', 'title-0'), ('mousekey.com', 'title-1')]
+        connection.release()
+
+    def test_fanout(self):
+        exporter = ListExporter()
+        connection = Connection('memory://',
+                                transport_options={'polling_interval': 0.01})
+        trackers = ['books.toscrape.com', 'mousekey.com']
+        tasks = ExchangeQueue(trackers, exchange_name='test-fanout',
+                              exchange_type='fanout')
+        self.publish(connection, tasks, [['title-0']], routing_key='')
+        manager = BaseWorkGroupManager('job', tasks,
+                                       stub_groups(exporter, names=trackers),
+                                       pool=10, connection=connection,
+                                       qtimeout=2)
+        self.run(manager)
+        assert sorted((i['name'], i['keyword']) for i in exporter.exported) == [
+            ('books.toscrape.com', 'title-0'), ('mousekey.com', 'title-0')]
+        connection.release()
+
+    def test_leases(self, tmpdir):
+        """
+        A task leased by another live node is skipped and the task of a dead
+        node, whose lease expired, is re-queued.
+        """
+        exporter = ListExporter()
+        connection = Connection('memory://',
+                                transport_options={'polling_interval': 0.01})
+        tasks = ExchangeQueue(['books.toscrape.com'], exchange_name='test-leases')
+        leases = SqliteLeaseBackend(str(tmpdir.join('leases.sqlite')))
+        leases.acquire('job:books.toscrape.com:title-1', 'live-node', ttl=60)
+        leases.acquire('job:books.toscrape.com:title-2', 'dead-node', ttl=0,
+                       payload='{"t": "books.toscrape.com", "k": "title-2", "a": {}}')
+        self.publish(connection, tasks, [['title-0', 'title-1']])
+        manager = BaseWorkGroupManager('job', tasks, stub_groups(exporter),
+                                       pool=10, connection=connection,
+                                       qtimeout=2, leases=leases, lease_ttl=0.6,
+                                       node_id='this-node')
+        self.run(manager)
+        assert sorted(i['keyword'] for i in exporter.exported) == [
+            'title-0', 'title-2']
+        # finished leases are released, the live node's lease is untouched
+        assert leases.acquire('job:books.toscrape.com:title-0', 'x', ttl=1)
+        assert leases.acquire('job:books.toscrape.com:title-2', 'x', ttl=1)
+        assert not leases.acquire('job:books.toscrape.com:title-1', 'x', ttl=1)
+        with connection.SimpleQueue(tasks.task_queues[0]) as queue:
+            assert queue.qsize() == 0
+        leases.close()
+        connection.release()
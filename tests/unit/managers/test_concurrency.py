@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.managers.test_concurrency
+~~~~~~~~~~~~
+This module implements unit tests for the AIMDController.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import gevent
+import gevent.event
+from gevent.queue import Queue
+from transistor import BaseWorkGroupManager
+from transistor.managers.concurrency import AIMDController
+from transistor.schedulers.sources import IterTaskSource
+from transistor.workers import BaseWorker
+from tests.unit.managers.test_base_manager import (ListExporter, StubItems,
+                                                   StubLoader, StubSpider,
+                                                   stub_groups)
+
+
+class TestAIMDController:
+
+    def test_additive_increase_multiplicative_decrease(self):
+        controller = AIMDController(max_workers=8, start=4)
+        for _ in range(10):
+            controller.record(1.0, status=200)
+        assert controller.adjust() == 5
+        for status in [200] * 5 + [503] * 5:
+            controller.record(1.0, status=status)
+        assert controller.adjust() == 2
+        controller.record(1.0, timeout=True)
+        assert controller.adjust() == 1
+        # no requests, no change
+        assert controller.adjust() == 1
+
+    def test_latency_target(self):
+        controller = AIMDController(max_workers=8, start=8, latency_target=5.0)
+        controller.record(10.0, status=200)
+        assert controller.adjust() == 4
+
+    def test_limits_active_workers(self):
+        controller = AIMDController(max_workers=6, start=2)
+        peak = []
+
+        def work():
+            controller.acquire()
+            peak.append(controller.active)
+            gevent.sleep(0.01)
+            controller.release()
+
+        greenlets = [gevent.spawn(work) for _ in range(6)]
+        gevent.sleep(0.005)
+        assert max(peak) == 2
+        # raising the limit lets the waiting workers start
+        controller.record(0.01, status=200)
+        controller.adjust()
+        gevent.joinall(greenlets)
+        assert max(peak) == 3
+
+    def test_manager_workgroup(self):
+        exporter = ListExporter()
+        titles = [f'title-{n}' for n in range(10)]
+        tasks = IterTaskSource(iter(titles), ['books.toscrape.com'])
+        groups = stub_groups(exporter, workers=4, aimd={'start': 1})
+        manager = BaseWorkGroupManager('job', tasks, groups, pool=10, qtimeout=2)
+        controller = manager.controllers['books.toscrape.com']
+        assert controller.max_workers == 4
+        assert manager.workgroups['books.toscrape.com'][0].concurrency is controller
+        manager.main()
+        assert len(exporter.exported) == 10
+        assert controller.requests == 10
+        assert controller.active == 0
+
+    def test_throttled_worker_leaves_tasks(self):
+        """
+        A worker waiting for a slot has not taken a task from the shared queue,
+        so the next worker with a slot runs it.
+        """
+        controller = AIMDController(max_workers=2, start=1)
+        release = gevent.event.Event()
+
+        class SlowSpider(StubSpider):
+            def start_http_session(self, **kwargs):
+                release.wait()
+
+        exporter = ListExporter()
+        tasks = Queue()
+        workers = [BaseWorker('job', SlowSpider, name='books.toscrape.com',
+                              items=StubItems, loader=StubLoader,
+                              exporters=[exporter], concurrency=controller,
+                              task_queue=tasks, qtimeout=0.1)
+                   for _ in range(2)]
+        tasks.put('Soumission')
+        greenlets = [gevent.spawn(worker.spawn_spider) for worker in workers]
+        gevent.sleep(0.01)
+        tasks.put('Black Dust')
+        gevent.sleep(0.01)
+        assert controller.active == 1
+        assert tasks.qsize() == 1
+        release.set()
+        gevent.joinall(greenlets, timeout=5)
+        assert sorted(i['keyword'] for i in exporter.exported) == [
+            'Black Dust', 'Soumission']
+        assert controller.active == 0
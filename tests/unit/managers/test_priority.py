@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.managers.test_priority
+~~~~~~~~~~~~
+This module implements unit tests for PriorityTaskQueue and the priority order
+of the tasks the manager dispatches.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import gevent
+from transistor import BaseWorkGroupManager
+from transistor.schedulers.priority import PriorityTaskQueue
+from transistor.schedulers.sources import IterTaskSource
+from transistor.schedulers.task import Task, get_keyword
+from tests.unit.managers.test_base_manager import ListExporter, stub_groups
+
+
+def drain(queue):
+    return [get_keyword(queue.get()) for _ in range(queue.qsize())]
+
+
+class TestPriorityTaskQueue:
+
+    def test_priority_then_fifo(self):
+        queue = PriorityTaskQueue(items=['bulk-0', 'bulk-1'], aging=None)
+        queue.put(Task('urgent', priority=10))
+        queue.put('bulk-2')
+        queue.put(Task('low', priority=-1))
+        assert queue.peek() == queue.peek()
+        assert drain(queue) == ['urgent', 'bulk-0', 'bulk-1', 'bulk-2', 'low']
+
+    def test_aging(self):
+        queue = PriorityTaskQueue(aging=0.01)
+        queue.put('bulk')
+        gevent.sleep(0.2)
+        # waited about 20 levels, more than the priority of the new task
+        queue.put(Task('urgent', priority=10))
+        queue.put(Task('urgent-2', priority=10))
+        assert drain(queue) == ['bulk', 'urgent', 'urgent-2']
+
+    def test_custom_priority(self):
+        priorities = {'b': 2, 'c': 1}
+        queue = PriorityTaskQueue(items=['a', 'b', 'c'], aging=None,
+                                  priority=lambda task: priorities.get(task, 0))
+        assert drain(queue) == ['b', 'c', 'a']
+
+    def test_bounded(self):
+        queue = PriorityTaskQueue(maxsize=1)
+        queue.put('a')
+        assert queue.full()
+
+
+def test_manager_dispatches_by_priority():
+    exporter = ListExporter()
+    tasks = [Task(f'bulk-{n}') for n in range(6)] + [Task('urgent', priority=10)]
+    source = IterTaskSource(iter(tasks), ['books.toscrape.com'])
+    manager = BaseWorkGroupManager('job', source, stub_groups(exporter, workers=1),
+                                   pool=5, qtimeout=2, priority_aging=None)
+    with gevent.Timeout(30):
+        manager.main()
+    keywords = [item['keyword'] for item in exporter.exported]
+    assert len(keywords) == 7
+    # a bulk task may already be with the worker when the urgent one arrives
+    assert keywords.index('urgent') <= 2
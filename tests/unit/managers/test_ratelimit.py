@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.managers.test_ratelimit
+~~~~~~~~~~~~
+This module implements unit tests for the TokenBucket and RateLimiter.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import time
+import gevent
+from transistor import BaseWorkGroupManager, SplashBrowser
+from transistor.managers.ratelimit import TokenBucket, RateLimiter
+from transistor.schedulers.sources import IterTaskSource
+from tests.unit.managers.test_base_manager import ListExporter, stub_groups
+
+
+class TestTokenBucket:
+
+    def test_rate_across_greenlets(self):
+        bucket = TokenBucket(rate=50, burst=1)
+        start = time.monotonic()
+        gevent.joinall([gevent.spawn(bucket.acquire) for _ in range(11)])
+        # the first token is in the bucket, the other ten take 1/50 sec each
+        assert time.monotonic() - start >= 0.18
+
+    def test_try_acquire(self):
+        bucket = TokenBucket(rate=1, burst=2)
+        assert bucket.try_acquire()
+        assert bucket.try_acquire()
+        assert not bucket.try_acquire()
+
+
+class TestRateLimiter:
+
+    def test_group_keys(self):
+        limiter = RateLimiter()
+        assert limiter.configure_group('mousekey.com', None) is None
+        assert limiter.configure_group('mousekey.com', 2.0) == 'mousekey.com'
+        shared = {'rate': 2.0, 'key': 'mousekey'}
+        assert limiter.configure_group('mousekey.cn', shared) == 'mousekey'
+        assert limiter.configure_group('mousekey.de', shared) == 'mousekey'
+        assert set(limiter.buckets) == {'mousekey.com', 'mousekey'}
+
+    def test_domain_buckets(self):
+        limiter = RateLimiter(default_rate=100)
+        limiter.acquire(url='http://books.toscrape.com/catalogue/page-2.html')
+        assert set(limiter.buckets) == {'books.toscrape.com'}
+        assert RateLimiter().acquire(url='http://books.toscrape.com/') == 0.0
+
+    def test_manager_shares_limiter_with_browsers(self):
+        exporter = ListExporter()
+        groups = stub_groups(exporter, names=['books.toscrape.com', 'mousekey.com'],
+                             rate_limit={'rate': 5, 'key': 'shared'})
+        tasks = IterTaskSource(iter([]), ['books.toscrape.com', 'mousekey.com'])
+        manager = BaseWorkGroupManager('job', tasks, groups, pool=5, qtimeout=1)
+        assert set(manager.rate_limiter.buckets) == {'shared'}
+        worker = manager.workgroups['mousekey.com'][0]
+        spider = type('Spider', (), {'browser': SplashBrowser()})()
+        worker.prepare_spider(spider)
+        assert spider.browser.rate_limiter is manager.rate_limiter
+        assert spider.browser.rate_limit_key == 'shared'
+
+    def test_browser_bucket_by_target_domain(self):
+        browser = SplashBrowser()
+        browser.rate_limiter = RateLimiter(default_rate=100)
+        browser._wait_for_token(b'{"url": "http://books.toscrape.com/"}')
+        assert set(browser.rate_limiter.buckets) == {'books.toscrape.com'}
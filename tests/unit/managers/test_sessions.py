@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.managers.test_sessions
+~~~~~~~~~~~~
+This module implements unit tests for the CrawleraSessionPool.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import time
+import gevent
+from unittest import mock
+from transistor import SplashBrowser
+from transistor.managers.sessions import CrawleraSessionPool
+
+
+class TestCrawleraSessionPool:
+
+    def test_affinity(self):
+        pool = CrawleraSessionPool(size=2, spacing=0.02)
+        session = pool.checkout('worker-1')
+        assert session.header == 'create'
+        pool.checkin(session, session_id='1234')
+        # while the session cools down, worker-1 gets a new one, not a wait
+        other = pool.checkout('worker-1')
+        assert other is not session
+        pool.checkin(other, session_id='5678')
+        gevent.sleep(0.03)
+        assert pool.checkout('worker-1') is other
+        assert [s.id for s in pool.sessions] == ['1234', '5678']
+
+    def test_spacing_when_full(self):
+        pool = CrawleraSessionPool(size=1, spacing=0.05, max_size=1)
+        pool.checkin(pool.checkout(), session_id='1234')
+        start = time.monotonic()
+        session = pool.checkout()
+        assert time.monotonic() - start >= 0.04
+        assert session.id == '1234'
+        assert session.uses == 2
+
+    def test_retire_banned(self):
+        pool = CrawleraSessionPool(size=2, spacing=0)
+        session = pool.checkout()
+        pool.checkin(session, session_id='1234', banned=True)
+        assert session.retired and pool.sessions == [] and pool.retired == 1
+        assert pool.checkout() is not session
+
+    def test_prefill(self):
+        ids = iter(['a', 'b', 'c', 'd'])
+        pool = CrawleraSessionPool(size=3, spacing=0, create=lambda: next(ids))
+        pool.fill()
+        assert [s.id for s in pool.sessions] == ['a', 'b', 'c']
+        assert pool.checkout().header in ('a', 'b', 'c')
+
+    def test_browser_sends_pool_session(self):
+        pool = CrawleraSessionPool(size=1, spacing=0, create=lambda: '1234')
+        pool.fill()
+        browser = SplashBrowser()
+        browser.crawlera_pool = pool
+        splash_args = {'session_id': 'create'}
+        session = browser._checkout_crawlera_session(splash_args)
+        assert splash_args['session_id'] == '1234' and session.in_use
+
+
+class TestBans:
+    """
+    Only a Crawlera ban retires a session, and a Splash 503 backs off.
+    """
+
+    def checkin(self, raw_content, status):
+        pool = CrawleraSessionPool(size=1, spacing=0, create=lambda: '1234')
+        pool.fill()
+        browser = SplashBrowser()
+        browser.crawlera_pool = pool
+        session = browser._checkout_crawlera_session({})
+        browser._set_raw_content(raw_content)
+        browser._set_status(status)
+        browser._checkin_crawlera_session(session)
+        return session
+
+    def test_splash_overload_is_not_a_ban(self):
+        assert not self.checkin(b'Service Unavailable', 503).retired
+
+    def test_crawlera_bans(self):
+        assert self.checkin(b'{"error": 400, "info": {"error": "http503"}}',
+                            400).retired
+        content = (b'{"html": "", "headers": [{"name": "X-Crawlera-Error", '
+                   b'"value": "banned"}]}')
+        assert self.checkin(content, 503).retired
+
+    def test_retry_backs_off_unless_banned(self):
+        browser = SplashBrowser()
+        browser.crawlera_pool = CrawleraSessionPool(size=1, spacing=0)
+        browser._last_post = (('http://localhost:8050/execute',), {'json': {}})
+        browser.post = mock.Mock()
+        with mock.patch('transistor.browsers.splash_browser.gevent.sleep') as sleep:
+            browser._set_raw_content(b'Service Unavailable')
+            browser._set_status(503)
+            browser._retry()
+            assert sleep.call_count == 1
+            browser._set_raw_content(b'{"info": {"error": "http503"}}')
+            browser._retry()
+            assert sleep.call_count == 1
+        assert browser.post.call_count == 2
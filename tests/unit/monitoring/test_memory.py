@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""
+tests.unit.monitoring.test_memory
+~~~~~~~~~~~~
+Unit tests for transistor.monitoring.memory.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import json
+import gevent
+from transistor import BaseWorkGroupManager, WorkGroup
+from transistor.monitoring.memory import MemoryWatchdog, rss_kb
+from transistor.schedulers.sources import IterTaskSource
+from transistor.utility.trackref import count_live_refs, format_live_refs
+from tests.unit.managers.test_base_manager import (ListExporter, StubItems,
+                                                   StubLoader, StubSpider)
+
+
+class LeakyItems(StubItems):
+    pass
+
+
+def test_rss():
+    assert rss_kb() > 0
+
+
+def test_live_refs():
+    items = [LeakyItems() for _ in range(3)]
+    assert count_live_refs()['LeakyItems'][0] == 3
+    assert 'LeakyItems' in format_live_refs()
+    del items
+
+
+def test_leak_report(tmpdir):
+    path = str(tmpdir.join('leaks.json'))
+    memory = MemoryWatchdog(report=path, interval=60, trace=True)
+    greenlets = memory.start()
+    leaked = [LeakyItems(keyword=str(n)) for n in range(50)]
+    for greenlet in greenlets:
+        greenlet.kill()
+    report = memory.stop('job')
+    assert report['live_refs']['LeakyItems']['grown'] == 50
+    assert report['allocations'] and report['top_allocations']
+    assert all('top_allocations' not in snap for snap in report['snapshots'])
+    with open(path) as f:
+        assert json.load(f)['job_id'] == 'job'
+    del leaked
+
+
+def test_pauses_over_budget():
+    memory = MemoryWatchdog(budget_mb=1, trace=False, max_pause=0.2)
+    memory.snapshot()
+    assert memory.paused and memory.pauses == 1
+    assert not memory.holding
+    waiter = gevent.spawn(memory.wait)
+    gevent.sleep(0)
+    assert memory.holding
+    memory._paused_at -= 0.2
+    memory.snapshot()
+    assert not memory.paused
+    assert waiter.get(timeout=1) and not memory.holding
+
+
+def test_resumes_under_budget():
+    memory = MemoryWatchdog(budget_mb=1, trace=False)
+    memory.snapshot()
+    memory.budget_kb = rss_kb() * 10
+    memory.snapshot()
+    assert not memory.paused
+
+
+def test_workers_wait_while_paused():
+    # always over budget, so dispatching pauses for longer than the worker's
+    # qtimeout, between short windows
+    memory = MemoryWatchdog(budget_mb=1, interval=0.1, trace=False, max_pause=2.5)
+    exporter = ListExporter()
+    groups = [WorkGroup(name='books.toscrape.com', url='http://books.toscrape.com/',
+                        spider=StubSpider, items=StubItems, loader=StubLoader,
+                        exporters=[exporter], workers=1, kwargs={'max_events': 2})]
+    tasks = IterTaskSource(iter(['a', 'b', 'c']), ['books.toscrape.com'])
+    manager = BaseWorkGroupManager('job', tasks, groups, pool=5, qtimeout=2,
+                                   memory=memory)
+    with gevent.Timeout(30):
+        manager.main()
+    assert sorted(item['keyword'] for item in exporter.exported) == ['a', 'b', 'c']
+    assert memory.pauses >= 1
+    worker, = manager.workgroups['books.toscrape.com']
+    assert worker.events.maxlen == 2
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+tests.unit.monitoring.test_profiler
+~~~~~~~~~~~~
+Unit tests for transistor.monitoring.profiler.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sys
+import time
+import gevent
+from transistor.monitoring.profiler import GreenletProfiler, collapse_stack
+
+
+def busy(seconds):
+    # never yields to the hub
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+def test_collapse_stack():
+    stack = collapse_stack(sys._getframe())
+    assert stack.endswith(f'{__name__}.test_collapse_stack')
+    assert collapse_stack(sys._getframe(), limit=1) == \
+        f'{__name__}.test_collapse_stack'
+
+
+def test_blocking_is_charged_to_the_code_path(tmpdir):
+    path = str(tmpdir.join('profile.folded'))
+    profiler = GreenletProfiler(path, interval=0.005, max_blocking_time=0.05)
+    profiler.start()
+    try:
+        gevent.spawn(busy, 0.4).join()
+        # let the monitor thread report the block
+        gevent.sleep(0.2)
+    finally:
+        profiler.stop()
+    assert profiler.blocks >= 1
+    stack, seconds = profiler.top_blocking(1)[0]
+    assert f'{__name__}.busy' in stack
+    assert any(f'{__name__}.busy' in stack for stack in profiler.samples)
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert lines
+    assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+    assert any(line.startswith('hub-blocked;') for line in lines)
+    # stopped, so nothing more is recorded
+    blocks = profiler.blocks
+    gevent.spawn(busy, 0.2).join()
+    assert profiler.blocks == blocks
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.monitoring.test_stats
+~~~~~~~~~~~~
+This module implements unit tests for the StatsCollector.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import json
+from gevent import socket
+from transistor import BaseWorkGroupManager, SplashBrowser
+from transistor.monitoring import Histogram, StatsCollector
+from transistor.schedulers.sources import IterTaskSource
+from tests.unit.browsers.test_cache import ENDPOINT, FakeSplash, splash_args
+from tests.unit.managers.test_base_manager import ListExporter, stub_groups
+
+
+class TestStatsCollector:
+
+    def test_histogram(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+        assert list(histogram.cumulative()) == [(0.1, 2), (1.0, 3), ('+Inf', 4)]
+        assert histogram.sum == 3.65
+
+    def test_prometheus(self):
+        stats = StatsCollector(buckets=(1.0,))
+        stats.inc('tasks_completed', 'books.toscrape.com', 2)
+        stats.observe('render', 0.5, 'books.toscrape.com')
+        assert stats.prometheus().splitlines() == [
+            '# TYPE transistor_tasks_completed_total counter',
+            'transistor_tasks_completed_total{tracker="books.toscrape.com"} 2',
+            '# TYPE transistor_render_seconds histogram',
+            'transistor_render_seconds_bucket{tracker="books.toscrape.com",le="1.0"} 1',
+            'transistor_render_seconds_bucket{tracker="books.toscrape.com",le="+Inf"} 1',
+            'transistor_render_seconds_sum{tracker="books.toscrape.com"} 0.5',
+            'transistor_render_seconds_count{tracker="books.toscrape.com"} 1']
+
+    def test_serves_metrics(self):
+        stats = StatsCollector(port=0, host='127.0.0.1')
+        stats.inc('requests')
+        stats.start()
+        try:
+            client = socket.create_connection(('127.0.0.1', stats._server.server_port))
+            client.sendall(b'GET /metrics HTTP/1.0\r\n\r\n')
+            response = b''
+            while True:
+                data = client.recv(4096)
+                if not data:
+                    break
+                response += data
+            client.close()
+        finally:
+            stats.stop()
+        assert response.startswith(b'HTTP/1.1 200 OK')
+        assert response.endswith(b'transistor_requests_total 1\n')
+
+    def test_manager_job(self, tmp_path):
+        path = str(tmp_path / 'stats.json')
+        stats = StatsCollector(snapshot=path)
+        exporter = ListExporter()
+        tasks = IterTaskSource(iter(['a', 'b', 'c']), ['books.toscrape.com'])
+        BaseWorkGroupManager('job', tasks, stub_groups(exporter), pool=5, qtimeout=2,
+                             stats=stats).main()
+        with open(path) as f:
+            snapshot = json.load(f)
+        assert snapshot['counters']['tasks_dispatched'] == {'books.toscrape.com': 3}
+        assert snapshot['counters']['tasks_completed'] == {'books.toscrape.com': 3}
+        assert snapshot['histograms']['queue_wait']['books.toscrape.com']['count'] == 3
+        assert snapshot['histograms']['export']['books.toscrape.com']['count'] == 3
+
+    def test_browser(self):
+        stats = StatsCollector()
+        browser = SplashBrowser(soup_config={'features': 'lxml'}, stats=stats,
+                                stats_key='books.toscrape.com')
+        browser.session.post = FakeSplash().post
+        response = browser.post(ENDPOINT, json=splash_args('http://books.toscrape.com/'))
+        assert stats.get('requests', 'books.toscrape.com') == 1
+        assert stats.get('bytes_received', 'books.toscrape.com') == len(response.content)
+        assert stats.histograms[('render', 'books.toscrape.com')].count == 1
+        assert stats.histograms[('parse', 'books.toscrape.com')].count == 1
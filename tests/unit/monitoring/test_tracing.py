@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.monitoring.test_tracing
+~~~~~~~~~~~~
+This module implements unit tests for the Tracer and the trace summary.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import json
+from transistor import BaseWorkGroupManager, SplashBrowser
+from transistor.monitoring import Trace, Tracer
+from transistor.monitoring.tracing import main, percentile, summarize
+from transistor.schedulers.sources import IterTaskSource
+from tests.unit.browsers.test_cache import ENDPOINT, FakeSplash, splash_args
+from tests.unit.managers.test_base_manager import ListExporter, stub_groups
+
+
+def run(tracer, titles):
+    tasks = IterTaskSource(iter(titles), ['books.toscrape.com'])
+    BaseWorkGroupManager('job', tasks, stub_groups(ListExporter()), pool=5,
+                         qtimeout=2, tracer=tracer).main()
+
+
+class TestTracer:
+
+    def test_traces_each_phase(self, tmp_path, capsys):
+        path = str(tmp_path / 'trace.jsonl')
+        run(Tracer(path), ['a', 'b', 'c'])
+        with open(path) as f:
+            traces = [json.loads(line) for line in f]
+        assert sorted(trace['task'] for trace in traces) == ['a', 'b', 'c']
+        for trace in traces:
+            assert set(trace['phases']) == {'dispatch', 'queue', 'spider', 'scrape',
+                                            'load', 'export'}
+            assert trace['total'] >= sum(trace['phases'].values()) - 1e-6
+        summary = summarize(path)
+        assert summary['total']['count'] == 3
+        assert main([path]) == 0
+        assert 'export' in capsys.readouterr().out
+
+    def test_sample_rate(self, tmp_path):
+        tracer = Tracer(str(tmp_path / 'trace.jsonl'), sample_rate=0.0)
+        run(tracer, ['a', 'b'])
+        assert tracer.written == 0
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([3.0], 95) == 3.0
+
+    def test_browser_spans(self):
+        browser = SplashBrowser(soup_config={'features': 'lxml'})
+        browser.session.post = FakeSplash().post
+        browser.trace = Trace('a')
+        browser.post(ENDPOINT, json=splash_args('http://books.toscrape.com/'))
+        assert [phase for phase, _, _ in browser.trace.spans] == ['render', 'parse']
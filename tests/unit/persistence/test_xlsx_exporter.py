@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.persistence.test_xlsx_exporter
+~~~~~~~~~~~~
+This module implements unit tests for the XlsxMatrixItemExporter.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+from pathlib import Path
+from os.path import dirname as d
+from os.path import abspath
+from openpyxl import load_workbook
+from transistor import Item, Field, StatefulBook
+from transistor.persistence.exporters import XlsxMatrixItemExporter
+
+root_dir = d(d(d(d(abspath(__file__)))))
+
+
+class PartItem(Item):
+    keyword = Field()
+    name = Field()
+    price = Field(serializer=lambda value: f'USD {value}')
+    stock = Field()
+    status = Field()
+
+
+def read_rows(path):
+    workbook = load_workbook(str(path))
+    return [list(row) for row in workbook['results'].values]
+
+
+class TestXlsxMatrixItemExporter:
+
+    def test_matrix(self, tmpdir):
+        path = tmpdir.join('results.xlsx')
+        exporter = XlsxMatrixItemExporter(str(path), ['mousekey.com', 'digidog.com'],
+                                          keyword_heading='part_number')
+        exporter.export_item(PartItem(keyword='TPA2012', name='digidog.com',
+                                      price=2, stock='10', status=200))
+        exporter.export_item(PartItem(keyword='NE555', name='mousekey.com',
+                                      price=0.1, stock='5', status=200))
+        exporter.export_item(PartItem(keyword='TPA2012', name='mousekey.com',
+                                      price=1, stock='20', status=200))
+        # TPA2012 is complete and has been streamed out, only NE555 is held
+        assert list(exporter._pending) == ['NE555']
+        exporter.finish_exporting()
+
+        assert read_rows(path) == [
+            ['part_number', 'mousekey.com price', 'mousekey.com stock',
+             'mousekey.com status', 'digidog.com price', 'digidog.com stock',
+             'digidog.com status'],
+            ['TPA2012', 'USD 1', '20', 200, 'USD 2', '10', 200],
+            ['NE555', 'USD 0.1', '5', 200, None, None, None],
+        ]
+
+    def test_pending_rows_stay_bounded(self, tmpdir):
+        exporter = XlsxMatrixItemExporter(str(tmpdir.join('results.xlsx')),
+                                          ['mousekey.com'], fields=['price'])
+        for n in range(1000):
+            exporter.export_item({'keyword': f'part-{n}', 'name': 'mousekey.com',
+                                  'price': n})
+            assert not exporter._pending
+        exporter.finish_exporting()
+
+    def test_from_book(self):
+        file = Path(root_dir) / 'tests' / 'books_toscrape' / 'book_titles.xlsx'
+        book = StatefulBook(str(file), ['books.toscrape.com'], keywords='titles')
+        exporter = book.results_exporter(keyword_field='book_title')
+        assert exporter.file.endswith('book_titles_results.xlsx')
+        assert exporter.keyword_heading == 'titles'
+        assert exporter.trackers == ['books.toscrape.com']
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.scrapers.test_splash_scraper
+~~~~~~~~~~~~
+This module implements unit tests for the SplashScraper session export and
+adoption, using the SplashBrowser fake page so no Splash service is needed.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+from transistor import SplashScraper
+
+
+class FakePageScraper(SplashScraper):
+
+    def __init__(self, keyword, **kwargs):
+        super().__init__(_test_true=True, _test_page_text='<html></html>',
+                         _test_status_code=200, **kwargs)
+        self.keyword = keyword
+
+    def start_http_session(self, url=None, **kwargs):
+        return super().start_http_session(url=url, **kwargs)
+
+
+class TestSessionHandOff:
+
+    def test_adopt_session(self):
+        first = FakePageScraper('Soumission')
+        first.start_http_session()
+        first.browser.session.headers['X-Test'] = 'landed'
+        state = first.export_session()
+        state['crawlera_session'] = '1234'
+
+        second = FakePageScraper('Black Dust')
+        second.adopt_session(state)
+        assert second.session_adopted
+        assert second.crawlera_session_id == '1234'
+        assert second.browser.session.headers['X-Test'] == 'landed'
+
+    def test_posts_adopted_crawlera_session(self):
+        spider = FakePageScraper('Black Dust')
+        spider.adopt_session({'cookies': {'session': 'abc'},
+                              'crawlera_session': '1234'})
+        posted = []
+        spider.browser.stateful_post = \
+            lambda url, *args, **kwargs: posted.append(kwargs['json'])
+        spider._stateful_post('http://books.toscrape.com/')
+        assert posted[0]['session_id'] == '1234'
+        assert posted[0]['cookies'] == {'session': 'abc'}
+        assert spider.http_session_valid
+
+        spider.reset('Soumission')
+        spider._stateful_post('http://books.toscrape.com/')
+        assert posted[1]['session_id'] == 'create'
+
+
+class TestReset:
+
+    def test_reset_clears_task_state(self):
+        spider = FakePageScraper('Soumission', splash_args={'wait': 1.0})
+        browser = spider.browser
+        spider.start_http_session()
+        spider.browser.session.cookies.set('session', 'abc')
+        spider.splash_args = {'wait': 5.0}
+        spider.crawlera_session_id = '1234'
+        spider.reset('Black Dust')
+        assert spider.browser is browser
+        assert not spider.browser.status
+        assert spider.cookies == {}
+        assert spider.splash_args == {'wait': 1.0}
+        assert not spider.http_session_valid
+        assert spider.crawlera_session_id is None
+
+
+class TestSplashUrl:
+
+    def posted_to(self, spider):
+        urls = []
+        spider.browser.stateful_post = lambda url, *args, **kwargs: urls.append(url)
+        spider._stateful_post('http://books.toscrape.com/')
+        return urls[0]
+
+    def test_default(self, monkeypatch):
+        monkeypatch.delenv('SPLASH_URL', raising=False)
+        spider = FakePageScraper('Soumission')
+        assert self.posted_to(spider) == 'http://localhost:8050/execute'
+
+    def test_environment_and_kwarg(self, monkeypatch):
+        monkeypatch.setenv('SPLASH_URL', 'http://splash.internal:8050/')
+        spider = FakePageScraper('Soumission')
+        assert self.posted_to(spider) == 'http://splash.internal:8050/execute'
+        spider = FakePageScraper('Soumission', splash_url='http://127.0.0.1:9000')
+        assert self.posted_to(spider) == 'http://127.0.0.1:9000/execute'
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.sources.test_tasksource
+~~~~~~~~~~~~
+This module implements unit tests for the TaskSource classes.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import io
+import sqlite3
+import threading
+import gevent
+from pytest import raises
+from transistor.exceptions import KeywordError
+from transistor.schedulers.sources import (CsvTaskSource, JsonLinesTaskSource,
+                                           StdinTaskSource, IterTaskSource,
+                                           SqlTaskSource)
+
+TRACKERS = ['books.toscrape.com']
+
+
+class TestTaskSources:
+    """
+    Unit test each TaskSource streams the expected tasks.
+    """
+
+    def test_csv(self, tmpdir):
+        path = tmpdir.join('titles.csv')
+        path.write_text('titles,price\nSoumission,1\n,2\nBlack Dust,3\n',
+                        encoding='utf-8')
+        source = CsvTaskSource(str(path), TRACKERS, keywords='titles')
+        assert list(source) == ['Soumission', 'Black Dust']
+        source.close()
+
+    def test_csv_missing_cells(self):
+        stream = io.StringIO('price,titles\n1,Soumission\n2\n3,Black Dust\n4,\n')
+        assert list(CsvTaskSource(stream, TRACKERS, keywords='titles')) == [
+            'Soumission', 'Black Dust']
+
+    def test_csv_bad_keyword(self):
+        source = CsvTaskSource(io.StringIO('titles\nSoumission\n'), TRACKERS)
+        with raises(KeywordError):
+            list(source)
+
+    def test_json_lines(self):
+        stream = io.StringIO('{"item": "Soumission"}\n\n{"item": null}\nnull\n'
+                             '"Black Dust"\n')
+        assert list(JsonLinesTaskSource(stream, TRACKERS)) == [
+            'Soumission', 'Black Dust']
+
+    def test_stdin(self):
+        stream = io.StringIO('Soumission\n  \nBlack Dust\n')
+        assert list(StdinTaskSource(TRACKERS, stream=stream)) == [
+            'Soumission', 'Black Dust']
+
+    def test_iterator_is_lazy(self):
+        seen = []
+
+        def titles():
+            for title in ['Soumission', 'Black Dust']:
+                seen.append(title)
+                yield title
+
+        source = iter(IterTaskSource(titles(), TRACKERS))
+        assert next(source) == 'Soumission'
+        assert seen == ['Soumission']
+
+    def test_sql(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute('create table books (title text)')
+        conn.executemany('insert into books values (?)',
+                         [(f'title-{n}',) for n in range(7)])
+        source = SqlTaskSource(conn.cursor(), TRACKERS,
+                               query='select title from books', arraysize=3)
+        assert list(source) == [f'title-{n}' for n in range(7)]
+        source.close()
+
+    def test_sql_skips_null(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute('create table books (title text)')
+        conn.executemany('insert into books values (?)',
+                         [('Soumission',), (None,), ('',), ('Black Dust',)])
+        source = SqlTaskSource(conn.cursor(), TRACKERS,
+                               query='select title from books')
+        assert list(source) == ['Soumission', 'Black Dust']
+
+    def test_sql_yields_between_rows(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute('create table books (title text)')
+        conn.executemany('insert into books values (?)',
+                         [(f'title-{n}',) for n in range(3)])
+        source = SqlTaskSource(conn.cursor(), TRACKERS,
+                               query='select title from books')
+        ticks = []
+
+        def tick():
+            while True:
+                ticks.append(None)
+                gevent.sleep(0)
+
+        ticker = gevent.spawn(tick)
+        # the other greenlets run between two rows of the same fetch
+        seen = [len(ticks) for _ in source]
+        ticker.kill()
+        assert seen[0] < seen[1] < seen[2]
+
+    def test_sql_threadpool(self):
+        threads = []
+
+        class Cursor(sqlite3.Cursor):
+            def fetchmany(self, size):
+                threads.append(threading.get_ident())
+                return super().fetchmany(size)
+
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        conn.execute('create table books (title text)')
+        conn.executemany('insert into books values (?)',
+                         [(f'title-{n}',) for n in range(7)])
+        source = SqlTaskSource(conn.cursor(Cursor), TRACKERS,
+                               query='select title from books', arraysize=3,
+                               threadpool=True)
+        assert list(source) == [f'title-{n}' for n in range(7)]
+        assert threading.get_ident() not in threads
+        source.close()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.utility.test_lazy
+~~~~~~~~~~~~
+This module tests the lazy exports of the transistor packages, and that
+importing transistor has no side effects.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import os
+import sys
+import types
+import unittest
+import subprocess
+from transistor.utility.lazy import lazy_exports
+
+
+def run_python(code: str, **env) -> str:
+    environ = {k: v for k, v in os.environ.items() if k != 'CRAWLERA_REGIONS'}
+    environ.update(env)
+    return subprocess.check_output([sys.executable, '-c', code],
+                                   env=environ).decode('utf-8').strip()
+
+
+class LazyExportsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.module = types.ModuleType('transistor.fake')
+        lazy_exports(self.module.__dict__, {'OrderedDict': 'collections'})
+
+    def test_export_is_imported_and_kept(self):
+        from collections import OrderedDict
+        self.assertIs(self.module.OrderedDict, OrderedDict)
+        self.assertIs(self.module.__dict__['OrderedDict'], OrderedDict)
+
+    def test_unknown_name(self):
+        with self.assertRaises(AttributeError):
+            self.module.Counter
+
+    def test_dir(self):
+        self.assertIn('OrderedDict', dir(self.module))
+
+
+@unittest.skipIf(sys.version_info < (3, 7), 'python 3.6 imports eagerly')
+class ImportTestCase(unittest.TestCase):
+
+    def test_import_transistor_is_light(self):
+        loaded = run_python(
+            'import sys, transistor; print(sorted(m for m in ("pyexcel", '
+            '"openpyxl", "bs4", "mechanicalsoup", "kombu") if m in sys.modules))')
+        self.assertEqual(loaded, '[]')
+
+    def test_public_api(self):
+        names = run_python(
+            'from transistor import *; import transistor; '
+            'print(all(name in globals() for name in transistor.__all__))')
+        self.assertEqual(names, 'True')
+
+    def test_crawlera_import_without_env(self):
+        out = run_python(
+            'import gevent.monkey, transistor.utility.crawlera as c; '
+            'print(c.CRAWLERA_REGIONS, gevent.monkey.is_module_patched("socket"))')
+        self.assertEqual(out, '[] False')
+
+    def test_crawlera_regions(self):
+        out = run_python(
+            'from transistor.utility.crawlera import crawlera_regions; '
+            'print(crawlera_regions())',
+            CRAWLERA_REGIONS='CRAWLERA_ALL, CRAWLERA_USA')
+        self.assertEqual(out, "['CRAWLERA_ALL', 'CRAWLERA_USA']")
+
+
+class CrawleraRegionsTestCase(unittest.TestCase):
+
+    def test_from_import(self):
+        out = run_python(
+            'from transistor.utility.crawlera import CRAWLERA_REGIONS; '
+            'print(CRAWLERA_REGIONS)', CRAWLERA_REGIONS='CRAWLERA_ALL')
+        self.assertEqual(out, "['CRAWLERA_ALL']")
+
+    def test_python36_reads_on_import(self):
+        # python 3.6 has no module __getattr__, so it must be a module attribute
+        out = run_python(
+            'import sys, collections; '
+            'sys.version_info = collections.namedtuple("version_info", '
+            '"major minor micro releaselevel serial")(3, 6, 15, "final", 0); '
+            'import transistor.utility.crawlera as c; '
+            'print(vars(c)["CRAWLERA_REGIONS"])', CRAWLERA_REGIONS='CRAWLERA_ALL')
+        self.assertEqual(out, "['CRAWLERA_ALL']")
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.utility.test_logging
+~~~~~~~~~~~~
+This module tests the lazy log arguments, the SamplingFilter, the
+JsonLinesHandler and configure_logging().
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import io
+import os
+import json
+import shutil
+import logging
+import tempfile
+import unittest
+from transistor.utility.logging import (JsonLinesHandler, SamplingFilter,
+                                        category_logger, configure_logging,
+                                        lazy)
+
+
+def make_record(name, level=logging.DEBUG, msg='message', args=()):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+class LazyTestCase(unittest.TestCase):
+
+    def test_not_computed_unless_formatted(self):
+        calls = []
+        value = lazy(lambda: calls.append(1) or 'content')
+        log = category_logger('test.lazy')
+        log.setLevel(logging.INFO)
+        log.debug('content %s', value)
+        self.assertEqual(calls, [])
+        self.assertEqual(make_record('x', msg='%s', args=(value,)).getMessage(),
+                         'content')
+        self.assertEqual(calls, [1])
+
+
+class SamplingFilterTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.filter = SamplingFilter({'transistor.browser': 0.0,
+                                      'transistor.browser.cache': 1.0}, seed=1)
+
+    def test_longest_prefix(self):
+        self.assertEqual(self.filter.rate('transistor.browser'), 0.0)
+        self.assertEqual(self.filter.rate('transistor.browser.cache'), 1.0)
+        self.assertEqual(self.filter.rate('transistor.browsers'), 1.0)
+        self.assertEqual(self.filter.rate('transistor.worker'), 1.0)
+
+    def test_drops_records_below_warning(self):
+        self.assertFalse(self.filter.filter(make_record('transistor.browser')))
+        self.assertTrue(self.filter.filter(
+            make_record('transistor.browser', logging.WARNING)))
+        self.assertTrue(self.filter.filter(make_record('transistor.worker')))
+
+    def test_fraction(self):
+        sampling = SamplingFilter({'transistor.browser': 0.25}, seed=1)
+        kept = sum(sampling.filter(make_record('transistor.browser'))
+                   for _ in range(4000))
+        self.assertTrue(800 < kept < 1200, kept)
+
+
+class JsonLinesHandlerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'log.jsonl')
+        self.handler = JsonLinesHandler(self.path, flush_interval=60, capacity=3)
+
+    def tearDown(self):
+        self.handler.close()
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        with open(self.path) as f:
+            return [json.loads(line) for line in f]
+
+    def test_writes_queued_records_on_flush(self):
+        record = make_record('transistor.worker', logging.INFO, 'got %s', ('task',))
+        record.task_id = 7
+        self.handler.handle(record)
+        self.assertEqual(self.read(), [])
+        self.handler.flush()
+        line, = self.read()
+        self.assertEqual(line['message'], 'got task')
+        self.assertEqual(line['level'], 'INFO')
+        self.assertEqual(line['logger'], 'transistor.worker')
+        self.assertEqual(line['task_id'], 7)
+
+    def test_drops_the_oldest_when_full(self):
+        for n in range(5):
+            self.handler.handle(make_record('transistor.worker', msg=str(n)))
+        self.handler.close()
+        self.assertEqual([line['message'] for line in self.read()], ['2', '3', '4'])
+        self.assertEqual(self.handler.dropped, 2)
+
+
+
+class ConfigureLoggingTestCase(unittest.TestCase):
+
+    def test_called_twice(self):
+        first, second = io.StringIO(), io.StringIO()
+        configure_logging(stream=first)
+        root = configure_logging(stream=second)
+        self.addCleanup(configure_logging)
+        category_logger('worker').info('Soumission')
+        self.assertEqual(first.getvalue(), '')
+        self.assertEqual(second.getvalue().count('Soumission'), 1)
+        self.assertEqual(sum(isinstance(handler, logging.StreamHandler)
+                             for handler in root.handlers), 1)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.tests.unit.workers.test_baseworker
+~~~~~~~~~~~~
+This module implements unit tests for BaseWorker.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+from types import SimpleNamespace
+from transistor import BaseWorkGroupManager, WorkGroup, SplashScraper
+from transistor.workers import BaseWorker
+from transistor.persistence.loader import ItemLoader
+from transistor.schedulers.sources import IterTaskSource
+from tests.unit.managers.test_base_manager import (ListExporter, StubItems,
+                                                   StubLoader, StubSpider)
+
+
+class SessionSpider(StubSpider):
+    """
+    A stub spider which counts its landing page renders, which it skips with
+    an adopted session.
+    """
+    landings = []
+
+    def __init__(self, keyword, **kwargs):
+        super().__init__(keyword, **kwargs)
+        self.http_session_valid = False
+        self.session_adopted = False
+        self.browser = SimpleNamespace(status=503 if keyword == 'bad' else 200,
+                                       timeout_exception=False)
+
+    def start_http_session(self, **kwargs):
+        if not self.session_adopted:
+            self.landings.append(self.keyword)
+        self.http_session_valid = True
+
+    def export_session(self):
+        return {'cookies': [{'name': 'session', 'value': self.keyword}]}
+
+    def adopt_session(self, state):
+        self.session_adopted = True
+
+
+def run(titles, **kwargs):
+    SessionSpider.landings = []
+    exporter = ListExporter()
+    groups = [WorkGroup(name='books.toscrape.com', url='http://books.toscrape.com/',
+                        spider=SessionSpider, items=StubItems, loader=StubLoader,
+                        exporters=[exporter], workers=1, kwargs=kwargs)]
+    tasks = IterTaskSource(iter(titles), ['books.toscrape.com'])
+    BaseWorkGroupManager('job', tasks, groups, pool=5, qtimeout=2).main()
+    assert len(exporter.exported) == len(titles)
+    return SessionSpider.landings
+
+
+class TestSessionReuse:
+
+    def test_lands_once(self):
+        assert run(['a', 'b', 'c', 'd'], session_ttl=60) == ['a']
+
+    def test_without_session_ttl(self):
+        assert run(['a', 'b', 'c']) == ['a', 'b', 'c']
+
+    def test_expired(self):
+        assert run(['a', 'b', 'c'], session_ttl=0) == ['a', 'b', 'c']
+
+    def test_lands_again_after_bad_status(self):
+        assert run(['a', 'b', 'bad', 'c', 'd'], session_ttl=60) == ['a', 'c']
+
+    def test_scrapes_with_adopted_session(self):
+        """
+        A SplashScraper with an adopted session still scrapes its own page.
+        """
+        exporter = ListExporter()
+        groups = [WorkGroup(name='books.toscrape.com', url='http://books.toscrape.com/',
+                            spider=TitleScraper, items=StubItems, loader=TitleLoader,
+                            exporters=[exporter], workers=1,
+                            kwargs={'session_ttl': 60})]
+        tasks = IterTaskSource(iter(['a', 'b', 'c', 'd']), ['books.toscrape.com'])
+        BaseWorkGroupManager('job', tasks, groups, pool=5, qtimeout=2).main()
+        assert [(i['keyword'], i['name']) for i in exporter.exported] == [
+            ('a', 'landed'), ('b', 'adopted'), ('c', 'adopted'), ('d', 'adopted')]
+
+
+class TitleScraper(SplashScraper):
+    """
+    A SplashScraper which scrapes the title of a fake page for its task.
+    """
+
+    def __init__(self, keyword, **kwargs):
+        super().__init__(_test_true=True, _test_status_code=200,
+                         _test_page_text=f'<html><h1>{keyword}</h1></html>',
+                         **kwargs)
+        self.title = None
+
+    def start_http_session(self, url=None, **kwargs):
+        super().start_http_session(url=url, **kwargs)
+        self.title = self.page.find('h1').text
+
+
+class TitleLoader(ItemLoader):
+
+    def write(self):
+        self.items['keyword'] = self.spider.title
+        self.items['name'] = 'adopted' if self.spider.session_adopted else 'landed'
+        return self.items
+
+
+class PooledSpider(StubSpider):
+    """
+    A stub spider which counts its constructions and resets.
+    """
+    created = []
+
+    def __init__(self, keyword, **kwargs):
+        super().__init__(keyword, **kwargs)
+        self.created.append(keyword)
+
+    def reset(self, keyword, **kwargs):
+        self.keyword = keyword
+
+
+class TestSpiderPool:
+
+    def run(self, **kwargs):
+        PooledSpider.created = []
+        exporter = ListExporter()
+        groups = [WorkGroup(name='books.toscrape.com', url='http://books.toscrape.com/',
+                            spider=PooledSpider, items=StubItems, loader=StubLoader,
+                            exporters=[exporter], workers=1, kwargs=kwargs)]
+        tasks = IterTaskSource(iter(['a', 'b', 'c']), ['books.toscrape.com'])
+        BaseWorkGroupManager('job', tasks, groups, pool=5, qtimeout=2).main()
+        assert [i['keyword'] for i in exporter.exported] == ['a', 'b', 'c']
+        return PooledSpider.created
+
+    def test_reuses_spider(self):
+        assert self.run(spider_pool=True) == ['a']
+
+    def test_without_spider_pool(self):
+        assert self.run() == ['a', 'b', 'c']
+
+
+class ListingSpider(StubSpider):
+    """
+    A stub spider which yields one item per product of a listing page.
+    """
+
+    def yield_items(self):
+        for n in range(3):
+            yield {'product': f'{self.keyword}-{n}'}
+        item = StubItems()
+        item['keyword'] = 'as-is'
+        yield item
+
+
+class ListingLoader(ItemLoader):
+
+    def write(self):
+        self.items['keyword'] = self.data['product']
+        self.items['name'] = self.spider.name
+        return self.items
+
+
+class TestYieldItems:
+
+    def test_exports_each_item(self):
+        exporter = ListExporter()
+        groups = [WorkGroup(name='books.toscrape.com', url='http://books.toscrape.com/',
+                            spider=ListingSpider, items=StubItems, loader=ListingLoader,
+                            exporters=[exporter], workers=2)]
+        tasks = IterTaskSource(iter(['a', 'b']), ['books.toscrape.com'])
+        BaseWorkGroupManager('job', tasks, groups, pool=5, qtimeout=2).main()
+        assert sorted(i['keyword'] for i in exporter.exported) == [
+            'a-0', 'a-1', 'a-2', 'as-is', 'as-is', 'b-0', 'b-1', 'b-2']
+
+
+class TestTaskQueue:
+
+    def test_plain_task(self):
+        """
+        A task put in worker.tasks directly, instead of with assign(), is still
+        scraped.
+        """
+        exporter = ListExporter()
+        worker = BaseWorker('job', StubSpider, name='books.toscrape.com',
+                            items=StubItems, loader=StubLoader,
+                            exporters=[exporter], qtimeout=0.1)
+        worker.tasks.put('Soumission')
+        worker.spawn_spider()
+        assert [i['keyword'] for i in exporter.exported] == ['Soumission']
+        dispatched, assigned, taken = worker._waits
+        assert dispatched == assigned == taken
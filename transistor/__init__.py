@@ -9,18 +9,30 @@ Web data collection and storage for intelligent use cases.
 ~~~~~~~~~~~~
 """
 
-from transistor.schedulers.books import StatefulBook
-from transistor.schedulers.brokers import ExchangeQueue
-from transistor.browsers import SplashBrowser
-from transistor.managers import BaseWorkGroupManager
-from transistor.scrapers import SplashScraper
-from transistor.workers import BaseWorker, BaseGroup, WorkGroup
-from transistor.persistence import (delete_job, Field, get_job_results, Item,
-                                    SplashScraperItems, BaseItemExporter)
+from transistor.utility.lazy import lazy_exports
 
 name = "transistor"
 
 __all__ = ['BaseGroup', 'BaseWorker', 'BaseWorkGroupManager', 'delete_job',
            'ExchangeQueue', 'Field', 'get_job_results', 'Item', 'SplashBrowser',
            'SplashScraper', 'SplashScraperItems', 'StatefulBook', 'BaseItemExporter',
-           'WorkGroup']
\ No newline at end of file
+           'TaskSource', 'WorkGroup']
+
+# the public API is imported on first use, so `import transistor` stays cheap
+lazy_exports(globals(), {
+    'StatefulBook': 'transistor.schedulers.books.bookstate',
+    'ExchangeQueue': 'transistor.schedulers.brokers.queues',
+    'TaskSource': 'transistor.schedulers.sources.tasksource',
+    'SplashBrowser': 'transistor.browsers.splash_browser',
+    'BaseWorkGroupManager': 'transistor.managers.base_manager',
+    'SplashScraper': 'transistor.scrapers.splash_scraper_abc',
+    'BaseWorker': 'transistor.workers.baseworker',
+    'BaseGroup': 'transistor.workers.basegroup',
+    'WorkGroup': 'transistor.workers.workgroup',
+    'delete_job': 'transistor.persistence.newt_db.newt_crud',
+    'get_job_results': 'transistor.persistence.newt_db.newt_crud',
+    'Field': 'transistor.persistence.item',
+    'Item': 'transistor.persistence.item',
+    'SplashScraperItems': 'transistor.persistence.containers',
+    'BaseItemExporter': 'transistor.persistence.exporters.base',
+})
@@ -10,4 +10,12 @@ spiders to work with the Splash javascript rendering service.
 ~~~~~~~~~~~~
 """
 
-from .splash_browser import SplashBrowser
\ No newline at end of file
+from transistor.utility.lazy import lazy_exports
+
+__all__ = ['DiskCache', 'PageCache', 'SplashBrowser']
+
+lazy_exports(globals(), {
+    'SplashBrowser': '.splash_browser',
+    'PageCache': '.cache',
+    'DiskCache': '.diskcache',
+})
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.browsers.cache
+~~~~~~~~~~~~
+This module implements PageCache, an in-memory cache of Splash responses shared
+by all the workers of a BaseWorkGroupManager, and request_fingerprint().
+
+A SplashBrowser with a page_cache looks up each request by its fingerprint, a
+hash of the Splash endpoint, the target url, the lua source and the other splash
+args which change the rendered page. Per-request args like the cookies and the
+Crawlera session are not part of it. A fresh cached response is used instead of
+a render, and a request identical to one in flight waits for that render
+instead of sending a duplicate (single-flight).
+
+    >>> manager = BaseWorkGroupManager('job', tasks, groups,
+    >>>                                page_cache=PageCache(ttl=600))
+
+Only successful renders are cached, see PageCache.cacheable().
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from gevent.event import AsyncResult
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+
+__all__ = ['PageCache', 'request_fingerprint']
+
+# splash args which do not change the rendered page
+IGNORED_ARGS = frozenset(['cookies', 'session_id', 'crawlera_user', 'timeout',
+                          'cache_args'])
+
+
+def request_fingerprint(endpoint: str, splash_args: dict,
+                        ignore=IGNORED_ARGS) -> str:
+    """
+    Return a hash of a Splash request, from the endpoint and the splash args
+    except those in `ignore`. The lua source is hashed on its own first, so a
+    change to the lua script makes a new fingerprint.
+    """
+    args = {}
+    for key, value in splash_args.items():
+        if key in ignore:
+            continue
+        if key == 'lua_source' and value is not None:
+            value = hashlib.sha1(value.encode('utf-8')).hexdigest()
+        args[key] = value
+    data = json.dumps([endpoint, args], sort_keys=True, default=str)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+class _Entry:
+    __slots__ = ('status_code', 'content', 'url', 'headers', 'encoding',
+                 'request', 'expires')
+
+    def __init__(self, response: Response, expires: float):
+        self.status_code = response.status_code
+        self.content = response.content
+        self.url = response.url
+        self.headers = dict(response.headers)
+        self.encoding = response.encoding
+        self.request = response.request
+        self.expires = expires
+
+    def response(self) -> Response:
+        """
+        Return a new Response with the cached content.
+        """
+        response = Response()
+        response.status_code = self.status_code
+        response._content = self.content
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response.encoding = self.encoding
+        response.request = self.request
+        return response
+
+
+class PageCache:
+    """
+    A least recently used cache of Splash responses, bounded by the total size
+    of their content, with a time to live, and single-flight coalescing of
+    identical requests.
+    """
+
+    def __init__(self, max_bytes: int=64 * 1024 * 1024, ttl: float=300.0,
+                 ignore=IGNORED_ARGS):
+        """
+        :param max_bytes: the most bytes of response content kept. The least
+        recently used responses are evicted first.
+        :param ttl: seconds a response is fresh. None means until evicted.
+        :param ignore: the splash args which are not part of the fingerprint.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.ignore = frozenset(ignore)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = OrderedDict()
+        self._inflight = {}
+
+    def __repr__(self):
+        return (f'<PageCache(entries={len(self._entries)}, size={self.size}, '
+                f'hits={self.hits}, misses={self.misses})>')
+
+    def __len__(self):
+        return len(self._entries)
+
+    def fingerprint(self, endpoint: str, splash_args: dict) -> str:
+        return request_fingerprint(endpoint, splash_args, self.ignore)
+
+    def get(self, key: str):
+        """
+        Return a copy of the fresh cached response for `key`, or None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires is not None and time.monotonic() >= entry.expires:
+            self._discard(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.response()
+
+    def set(self, key: str, response: Response):
+        """
+        Cache the response for `key`, then evict the least recently used
+        responses until the cache fits in max_bytes.
+        """
+        self._discard(key)
+        if len(response.content) > self.max_bytes:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self._entries[key] = _Entry(response, expires)
+        self.size += len(response.content)
+        while self.size > self.max_bytes:
+            self._discard(next(iter(self._entries)))
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry.content)
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    @staticmethod
+    def cacheable(response: Response) -> bool:
+        """
+        Only cache a successful render, not a timeout, nor a 503 ban or 504
+        which the lua script reports in the content.
+        """
+        content = response.content or b''
+        return (response.status_code == 200 and b'http503' not in content
+                and b'http504' not in content)
+
+    def fetch(self, key: str, render):
+        """
+        Return the cached response for `key`, or else call render() once, even if
+        several greenlets ask for the same key at the same time.
+
+        :param render: a callable which sends the request and returns a Response.
+        :returns a tuple of the response and True if it came from render() in
+        this call, else False.
+        """
+        while True:
+            response = self.get(key)
+            if response is not None:
+                self.hits += 1
+                return response, False
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.coalesced += 1
+            if not inflight.get():
+                # the render failed or is not cacheable, so render it here
+                self.misses += 1
+                return render(), True
+        self.misses += 1
+        inflight = self._inflight[key] = AsyncResult()
+        cached = False
+        try:
+            response = render()
+            if self.cacheable(response):
+                self.set(key, response)
+                cached = True
+            return response, True
+        finally:
+            del self._inflight[key]
+            inflight.set(cached)
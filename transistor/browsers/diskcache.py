@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.browsers.diskcache
+~~~~~~~~~~~~
+This module implements DiskCache, a persistent cache of Splash responses on
+disk, mainly for development: iterate on the parsing logic of a scraper and run
+it again over the cached pages, instead of rendering every page through Splash
+again.
+
+It plugs into SplashBrowser.post() like a PageCache, keyed by the same request
+fingerprint, and stores the raw Splash json zlib compressed, one file per
+response. Files are written to a temporary file and then renamed, so several
+processes can read and write the same cache directory at the same time.
+
+    >>> manager = BaseWorkGroupManager('job', tasks, groups,
+    >>>                                page_cache=DiskCache('.splash_cache'))
+
+The policy decides when a cached response is used:
+
+    - 'always': use any cached response, render only what is not cached.
+    - 'ttl': use cached responses younger than `ttl` seconds.
+    - 'offline': only use cached responses, never send a request. A request
+      which is not cached raises CacheMiss.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import os
+import json
+import time
+import zlib
+import tempfile
+from requests import Response
+from requests.structures import CaseInsensitiveDict
+from transistor.browsers.cache import IGNORED_ARGS, PageCache
+from transistor.exceptions import CacheMiss
+
+__all__ = ['DiskCache']
+
+POLICIES = ('always', 'ttl', 'offline')
+
+
+class DiskCache(PageCache):
+    """
+    A PageCache which keeps its responses on disk, under `path`, in a
+    subdirectory per first two characters of the fingerprint.
+    """
+
+    def __init__(self, path: str, policy: str='always', ttl: float=None,
+                 level: int=6, ignore=IGNORED_ARGS):
+        """
+        :param path: the cache directory, created if it does not exist.
+        :param policy: 'always', 'ttl' or 'offline', see the module docstring.
+        :param ttl: seconds a response is fresh with the 'ttl' policy.
+        :param level: the zlib compression level.
+        :param ignore: the splash args which are not part of the fingerprint.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f'policy must be one of {POLICIES}, got {policy!r}')
+        if policy == 'ttl' and ttl is None:
+            raise ValueError("the 'ttl' policy needs a ttl")
+        super().__init__(max_bytes=None, ttl=ttl if policy == 'ttl' else None,
+                         ignore=ignore)
+        self.path = path
+        self.policy = policy
+        self.level = level
+        os.makedirs(path, exist_ok=True)
+
+    def __repr__(self):
+        return (f'<DiskCache(path={self.path!r}, policy={self.policy!r}, '
+                f'hits={self.hits}, misses={self.misses})>')
+
+    def __len__(self):
+        return sum(1 for _ in self._files())
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    def _files(self):
+        for directory, _, names in os.walk(self.path):
+            for name in names:
+                if not name.startswith('.'):
+                    yield os.path.join(directory, name)
+
+    def get(self, key: str):
+        """
+        Return the cached response for `key`, or None if it is not cached or,
+        with the 'ttl' policy, it is too old.
+        """
+        try:
+            with open(self._file(key), 'rb') as f:
+                meta, content = f.read().split(b'\n', 1)
+        except (OSError, ValueError):
+            return None
+        meta = json.loads(meta.decode('utf-8'))
+        if self.ttl is not None and time.time() - meta['time'] >= self.ttl:
+            return None
+        response = Response()
+        response.status_code = meta['status_code']
+        response.url = meta['url']
+        response.headers = CaseInsensitiveDict(meta['headers'])
+        response.encoding = meta['encoding']
+        response._content = zlib.decompress(content)
+        return response
+
+    def set(self, key: str, response: Response):
+        """
+        Write the response for `key` to a temporary file and rename it, so a
+        reader never sees a partly written file.
+        """
+        meta = json.dumps({'status_code': response.status_code,
+                           'url': response.url,
+                           'headers': dict(response.headers),
+                           'encoding': response.encoding,
+                           'time': time.time()})
+        filename = self._file(key)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.', dir=os.path.dirname(filename))
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(meta.encode('utf-8') + b'\n')
+                f.write(zlib.compress(response.content, self.level))
+            os.replace(tmp, filename)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _discard(self, key):
+        try:
+            os.unlink(self._file(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        for filename in list(self._files()):
+            os.unlink(filename)
+
+    def fetch(self, key: str, render):
+        """
+        Like PageCache.fetch(), except with the 'offline' policy, which raises
+        CacheMiss instead of calling render() when `key` is not cached.
+        """
+        if self.policy == 'offline':
+            response = self.get(key)
+            if response is None:
+                self.misses += 1
+                raise CacheMiss(f'No cached response for request {key}.')
+            self.hits += 1
+            return response, False
+        return super().fetch(key, render)
@@ -42,16 +42,23 @@ Except, it is not mandatory to return the har, cookies, or png.
 """
 
 import bs4
+import json
 import sys
 import random
+import time
 import gevent
-from requests import Response
+import logging
+from requests import Request, Response
 from requests.exceptions import Timeout
 from mechanicalsoup.stateful_browser import _BrowserState, StatefulBrowser
 from mechanicalsoup.utils import LinkNotFoundError
 from mechanicalsoup.form import Form
 from transistor.utility.utils import obsolete_setter
 from transistor.browsers.mixin import SplashBrowserMixin
+from transistor.monitoring.tracing import span
+from transistor.utility.logging import category_logger, lazy
+
+log = category_logger('browser')
 
 
 class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
@@ -72,6 +79,7 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
         self._test_true = False
         self.timeout_exception = False
         self.flags = kwargs.pop('flags', None)
+        # the priority of the current task, set by the worker
         self.priority = kwargs.pop('priority', 0)
         if kwargs.pop('meta', None):
             self._meta = dict(kwargs.pop('meta'))
@@ -79,8 +87,38 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
             self._meta = None
         self.callback = None
         self.errback = None
+        # set by the worker, see transistor.managers.ratelimit
+        self.rate_limiter = kwargs.pop('rate_limiter', None)
+        self.rate_limit_key = kwargs.pop('rate_limit_key', None)
+        # set by the worker, see transistor.managers.sessions
+        self.crawlera_pool = kwargs.pop('crawlera_pool', None)
+        self.crawlera_affinity = kwargs.pop('crawlera_affinity', None)
+        self._last_post = None
+        # set by the worker, see transistor.browsers.cache
+        self.page_cache = kwargs.pop('page_cache', None)
+        # set by the worker, see transistor.monitoring.stats
+        self.stats = kwargs.pop('stats', None)
+        self.stats_key = kwargs.pop('stats_key', None)
+        # set by the worker, see transistor.monitoring.tracing
+        self.trace = kwargs.pop('trace', None)
         super().__init__(*args, **kwargs)
 
+    def reset(self):
+        """
+        Clear the page, response and callbacks of the last request, and the
+        session cookies, so the browser can be reused for a new task. The
+        requests session, with its headers and connection pool, is kept.
+        """
+        self._set_raw_content(content=b'')
+        self._set_status(status='')
+        self.__state = _BrowserState()
+        self.timeout_exception = False
+        self.retry = 0
+        self.callback = None
+        self.errback = None
+        self._last_post = None
+        self.session.cookies.clear()
+
     @property
     def meta(self):
         if self._meta is None:
@@ -136,7 +174,12 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
 
         self._set_raw_content(response.content)
         self._set_status(response.status_code)
+        started = time.monotonic()
         self._add_soup(response, self.soup_config)
+        if self.stats is not None:
+            self.stats.observe('parse', time.monotonic() - started, self.stats_key)
+        if self.trace is not None:
+            self.trace.add('parse', started)
         self.__state = _BrowserState(page=response.soup,
                                      url=response.url,
                                      request=response.request)
@@ -189,6 +232,7 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
                              'page is opened or low-level browser methods '
                              'were used to do so.')
 
+        self._wait_for_token(old_request.body)
         resp = self.session.send(old_request)
 
         self._update_state(resp)
@@ -223,7 +267,7 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
                                                          limit=nr + 1)
             if len(found_forms) != nr + 1:
                 if self.__debug:
-                    print('select_form failed for', selector)
+                    log.warning('select_form failed for %s', selector)
                     self.launch_browser()
                 raise LinkNotFoundError()
             self.__state.form = Form(found_forms[-1])
@@ -283,7 +327,10 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
     def __looks_like_html(blob):
         """Guesses entity type when Content-Type header is missing.
         Since Content-Type is not strictly required, some servers leave it out.
+        A Splash error response has no html at all.
         """
+        if not blob:
+            return False
         text = blob.lstrip().lower()
         return text.startswith('<html') or text.startswith('<!doctype')
 
@@ -308,17 +355,149 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
             object with a *soup*-attribute added by :func:`_add_soup`.
         """
 
+        self._last_post = (args, kwargs)
+        splash_args = kwargs.get('json')
+        if self.page_cache is not None and isinstance(splash_args, dict):
+            endpoint = args[0] if args else kwargs.get('url')
+            key = self.page_cache.fingerprint(endpoint, splash_args)
+            response, rendered = self.page_cache.fetch(
+                key, lambda: self._send(*args, **kwargs))
+            if not rendered:
+                if response.request is None:
+                    # a DiskCache response has no request, which refresh()
+                    # sends again
+                    response.request = self._prepare_post(endpoint, **kwargs)
+                self._update_state(response)
+            return response
+        return self._send(*args, **kwargs)
+
+    def _prepare_post(self, url, **kwargs):
+        """
+        Return the PreparedRequest which session.post(url, **kwargs) sends.
+        """
+        kwargs = {name: value for name, value in kwargs.items()
+                  if name in ('headers', 'data', 'json', 'params', 'auth',
+                              'cookies')}
+        return self.session.prepare_request(Request('POST', url, **kwargs))
+
+    def _send(self, *args, **kwargs):
+        """
+        Send the post request to Splash, after waiting for the rate limiter and
+        checking out a Crawlera session, if any.
+        """
+        self._wait_for_token(kwargs.get('json'))
+        crawlera_session = self._checkout_crawlera_session(kwargs.get('json'))
+        started = time.monotonic()
         try:
             response = self.session.post(*args, **kwargs)
+            self._record_request(response, started)
             self._update_state(response)
             return response
         except Timeout:
             self.timeout_exception = True
-            print(f'Timeout exception.')
+            log.warning('Timeout waiting for Splash.')
             resp = Response()
             resp.status_code = 408
+            self._record_request(resp, started)
             self._update_state(resp)
             return resp
+        finally:
+            self._checkin_crawlera_session(crawlera_session)
+
+    def _record_request(self, response, started):
+        """
+        Record the request, its render time and response size in the stats.
+        """
+        if self.trace is not None:
+            self.trace.add('render', started)
+        if self.stats is None:
+            return
+        self.stats.inc('requests', self.stats_key)
+        self.stats.observe('render', time.monotonic() - started, self.stats_key)
+        self.stats.inc('bytes_received', self.stats_key,
+                       len(response.content or b''))
+
+    def _checkout_crawlera_session(self, splash_args):
+        """
+        Take a session from the Crawlera session pool, if any, and send it in the
+        splash args `session_id`.
+        """
+        if self.crawlera_pool is None or not isinstance(splash_args, dict):
+            return None
+        crawlera_session = self.crawlera_pool.checkout(self.crawlera_affinity)
+        splash_args['session_id'] = crawlera_session.header
+        return crawlera_session
+
+    def _checkin_crawlera_session(self, crawlera_session):
+        """
+        Return the session to the pool, with the session id from the response
+        headers, and retire it if Crawlera banned it.
+        """
+        if crawlera_session is None:
+            return
+        try:
+            session_id = self.crawlera_session
+        except (ValueError, AttributeError):
+            # the response content is not the json from the lua script
+            session_id = None
+        self.crawlera_pool.checkin(crawlera_session, session_id=session_id,
+                                   banned=self._crawlera_banned())
+
+    def _crawlera_banned(self) -> bool:
+        """
+        Return True if Crawlera answered the last request with a ban, which the
+        lua script reports as a http503 render error, or with an
+        X-Crawlera-Error header like 'banned'. A 503 status from Splash itself
+        only means Splash is overloaded, so the session is fine.
+        """
+        if b'http503' in (self.raw_content or b''):
+            return True
+        try:
+            headers = self.resp_headers or []
+        except (ValueError, AttributeError):
+            # the response content is not the json from the lua script
+            return False
+        return any(header.get('name', '').lower() == 'x-crawlera-error' and
+                   'ban' in str(header.get('value', '')).lower()
+                   for header in headers)
+
+    def _retry(self):
+        """
+        Send the last request again. With a Crawlera session pool, the retry
+        after a ban goes out right away on another session, since the pool
+        retired the banned session and spaces the requests per session. After a
+        503 or 504 from Splash itself, or without a pool, wait 12 to 20 seconds
+        first, so an overloaded Splash is not hammered with retries.
+        """
+        if self.stats is not None:
+            self.stats.inc('requests_retried', self.stats_key)
+        with span(self.trace, 'retry'):
+            if self.crawlera_pool is not None and self._last_post is not None:
+                if not self._crawlera_banned():
+                    gevent.sleep(random.randint(12, 20))
+                args, kwargs = self._last_post
+                return self.post(*args, **kwargs)
+            gevent.sleep(random.randint(12, 20))
+            return self.refresh()
+
+    def _wait_for_token(self, splash_args):
+        """
+        Wait for a token from the rate limiter, if any, before sending a request.
+        Without a rate_limit_key, the bucket is chosen by the domain of the target
+        url in the splash args.
+        """
+        if self.rate_limiter is None:
+            return
+        url = None
+        if self.rate_limit_key is None:
+            if isinstance(splash_args, bytes):
+                try:
+                    splash_args = json.loads(splash_args.decode('utf-8'))
+                except ValueError:
+                    splash_args = None
+            if isinstance(splash_args, dict):
+                url = splash_args.get('url', None)
+        self.rate_limiter.acquire(self.rate_limit_key, url=url)
 
     def stateful_post(self, url, *args, **kwargs):
         """Post to the URL and store the Browser's state, as received from
@@ -373,9 +552,11 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
             """Recursively call"""
             return self._response_callback(response)
 
-        print(f'self.ucontent[0:1000] -> {self.ucontent[0:1000]}')
-        # print(f'info -> {self.resp_content["info"]}')
-        # print(f'error -> {self.resp_content["error"]}')
+        if log.isEnabledFor(logging.DEBUG):
+            # decode only the logged part of the content, and only if emitted
+            log.debug('Splash response %s: %s', resp.status_code, lazy(
+                lambda: (self.raw_content or b'')[:1000].decode(
+                    self.encoding, 'replace')))
         if resp.status_code == 200:
             return resp
 
@@ -389,21 +570,16 @@ class SplashBrowser(StatefulBrowser, SplashBrowserMixin):
             # check for http503 in content: slavebanned, serverbusy, or noslaves
             if b'http503' in self.raw_content or '503' in str(self.status):
                 self.retry += 1
-                print(f'resp_code -> 503')
-                print(f'Retying attempt {self.retry}.')
-                gevent.sleep(random.randint(12, 20))
-                response = self.refresh()
+                log.info('Splash returned 503, retry attempt %d.', self.retry)
+                response = self._retry()
                 return recurse(response)
 
             # check for http504 in content which means some sort of timeout
             if b'http504' in self.raw_content or '504' in str(self.status):
                 self.retry += 1
-                print(f'resp_code -> 504')
-                print(self.resp_headers)
-                print(f'Retying attempt {self.retry}.')
-                gevent.sleep(random.randint(12, 20))
-                response = self.refresh()
+                log.info('Splash returned 504, retry attempt %d.', self.retry)
+                response = self._retry()
                 return recurse(response)
 
-        print(f'Retried {self.retry} times and all were unsuccessful.')
+        log.warning('Got status %s after %d retries.', resp.status_code, self.retry)
         return resp
\ No newline at end of file
@@ -2,11 +2,16 @@
 """
 transistor.crawlers
 ~~~~~~~~~~~~
-This module is a placeholder work-in-progress but will eventually implement a more
+This module is a work-in-progress which will eventually implement a more
 optimized design for a crawling spider class which can be scaled with gevent
 based asynchronous I/O, similar to SplashScraper.
 
+It implements SharedCrawler and TaskIndex, for a shared crawl where one crawler
+walks the pages of a website once for all of the outstanding tasks, run by a
+CrawlWorker from transistor.workers.
+
 :copyright: Copyright (C) 2018 by BOM Quote Limited
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
-"""
\ No newline at end of file
+"""
+from .shared import normalize_keyword, SharedCrawler, TaskIndex
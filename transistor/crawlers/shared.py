@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.crawlers.shared
+~~~~~~~~~~~~
+This module implements TaskIndex and SharedCrawler, for a shared crawl: one
+crawler walks the pages of a website once and checks each page against an
+index of every outstanding task, instead of each worker crawling the website to
+find the one keyword it was assigned.
+
+A SharedCrawler is run by a CrawlWorker (transistor.workers.crawlworker), which
+matches the items on each page against its TaskIndex, exports a result for each
+matched task and removes it from the index. So the number of pages rendered
+scales with the size of the website, not the size of the website x the number
+of tasks.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import re
+from abc import ABC, abstractmethod
+from transistor.schedulers.task import get_keyword
+
+__all__ = ['normalize_keyword', 'SharedCrawler', 'TaskIndex']
+
+
+def normalize_keyword(keyword) -> str:
+    """
+    The default TaskIndex key: the keyword with collapsed whitespace, casefolded.
+    """
+    return ' '.join(str(keyword).split()).casefold()
+
+
+class TaskIndex:
+    """
+    The outstanding tasks of a shared crawl, in a dict by normalized keyword, so
+    a page is matched with one lookup per item on the page, however many tasks
+    there are. search() matches the keywords in free text with a compiled regex.
+
+    >>> index = TaskIndex(['Soumission', 'Black Dust'])
+    >>> index.pop('soumission')
+    ['Soumission']
+    >>> index.search('In stock: Black  Dust, Sharp Objects')
+    ['black dust']
+    """
+
+    def __init__(self, tasks=(), normalize=None):
+        """
+        :param tasks: the initial tasks, either keywords or Task instances.
+        :param normalize: a callable which returns the index key of a keyword.
+        Defaults to normalize_keyword().
+        """
+        self.normalize = normalize or normalize_keyword
+        self._tasks = {}
+        self._pattern = None
+        for task in tasks:
+            self.add(task)
+
+    def __repr__(self):
+        return f'<TaskIndex(tasks={len(self)})>'
+
+    def __len__(self):
+        return sum(len(tasks) for tasks in self._tasks.values())
+
+    def __bool__(self):
+        return bool(self._tasks)
+
+    def __iter__(self):
+        for tasks in list(self._tasks.values()):
+            yield from tasks
+
+    def __contains__(self, keyword):
+        return self.normalize(keyword) in self._tasks
+
+    def add(self, task):
+        """
+        Add a task, a keyword or a Task instance. Tasks with the same key are all
+        matched together.
+        """
+        key = self.normalize(get_keyword(task))
+        if key not in self._tasks:
+            self._tasks[key] = []
+            self._pattern = None
+        self._tasks[key].append(task)
+
+    def pop(self, keyword) -> list:
+        """
+        Remove and return the tasks matching `keyword`, or an empty list.
+        """
+        tasks = self._tasks.pop(self.normalize(keyword), [])
+        if tasks:
+            self._pattern = None
+        return tasks
+
+    def discard(self, task) -> bool:
+        """
+        Remove one task. Return False if it is not in the index anymore.
+        """
+        key = self.normalize(get_keyword(task))
+        tasks = self._tasks.get(key, [])
+        for n, other in enumerate(tasks):
+            if other is task:
+                del tasks[n]
+                if not tasks:
+                    del self._tasks[key]
+                    self._pattern = None
+                return True
+        return False
+
+    def clear(self) -> list:
+        """
+        Remove and return all of the tasks.
+        """
+        tasks = list(self)
+        self._tasks.clear()
+        self._pattern = None
+        return tasks
+
+    def search(self, text: str) -> list:
+        """
+        Return the keys of the outstanding tasks which appear in `text` as whole
+        words, in order of appearance. The regex is compiled once and only built
+        again after the index changed.
+        """
+        if not self._tasks:
+            return []
+        if self._pattern is None:
+            # the longest keys first, so a key never shadows a longer one
+            keys = sorted(self._tasks, key=len, reverse=True)
+            self._pattern = re.compile(
+                r'(?<!\w)(?:' + '|'.join(map(re.escape, keys)) + r')(?!\w)')
+        found = self._pattern.findall(self.normalize(text))
+        return list(dict.fromkeys(found))
+
+
+class SharedCrawler(ABC):
+    """
+    Mixin for a spider which crawls pages for a CrawlWorker. Subclass it together
+    with SplashScraper:
+
+    >>> class BooksCrawler(SharedCrawler, SplashScraper):
+    >>>     def __init__(self, index, **kwargs): ...
+
+    The worker creates the spider with its TaskIndex in place of the keyword
+    task, calls start_http_session() to open the first page and then, for each
+    page, matches candidates() against the index and calls select() for each
+    matched task, until next_page() returns False or no task is outstanding.
+    """
+
+    @abstractmethod
+    def candidates(self):
+        """
+        Yield a (key, match) tuple for each item on the current page, where key is
+        compared with the task keywords, like a book title, and match is passed to
+        select(), like the html element of the book.
+        """
+
+    @abstractmethod
+    def select(self, keyword, match):
+        """
+        Set the spider attributes read by the ItemLoader for the task `keyword`
+        from `match`. The match is None for a task which was not found on any
+        page of the crawl.
+        """
+
+    @abstractmethod
+    def next_page(self) -> bool:
+        """
+        Open the next page of the crawl. Return False if there are no more pages.
+        """
@@ -39,8 +39,8 @@ class SplashCrawler(ABC):
     __attrs__ = [
         'auth', 'baseurl', 'browser', 'cookies', 'crawlera_user',
         'http_session_timeout', 'http_session_valid', 'LUA_SOURCE', 'max_retries',
-        'name', 'number', 'referrer', 'searchurl', 'splash_args', 'splash_wait'
-        'user_agent',
+        'name', 'number', 'referrer', 'searchurl', 'splash_args', 'splash_url',
+        'splash_wait', 'user_agent',
     ]
 
     # class attrs used for concurrency
@@ -93,6 +93,10 @@ class SplashCrawler(ABC):
         :param kwargs: splash_wait:float() controls the time in seconds Splash will
         wait after opening a web page, before taking actions. Default 3.0 sec.
 
+        :param kwargs: splash_url:str() the address of the Splash service, like
+        'http://splash.internal:8050'. Default is the SPLASH_URL environment
+        variable, else 'http://localhost:8050'.
+
         :param kwargs: splash_args:dict(): a python dict which will be sent in a post
         request to the Splash service. This dict will serve to set the splash.args
         attributes so they are available for use in the LUA script simply by
@@ -142,6 +146,8 @@ class SplashCrawler(ABC):
         self.splash_args = kwargs.pop('splash_args', None)
         self.splash_wait = kwargs.pop('splash_wait', 3.0)
         self.js_source = kwargs.pop('js_source', None)
+        self.splash_url = kwargs.pop(
+            'splash_url', os.environ.get('SPLASH_URL', 'http://localhost:8050'))
 
         # ----- kwargs only used for testing setup ----- #
         self._test_true = kwargs.get('_test_true', False)
@@ -305,8 +311,8 @@ class SplashCrawler(ABC):
         else:
             self.splash_args = splash_args
         response = self.browser.stateful_post(
-            # 'http://localhost:8050/render.json'if self.js_source else
-            'http://localhost:8050/execute',
+            # f'{self.splash_url}/render.json' if self.js_source else
+            f'{self.splash_url.rstrip("/")}/execute',
             json=self.splash_args,
             timeout=timeout,
             verify=self._crawlera_ca,
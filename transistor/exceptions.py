@@ -34,6 +34,13 @@ class IncompatibleTasks(Exception):
     pass
 
 
+class CacheMiss(Exception):
+    """
+    Raise when a DiskCache in offline mode has no response for a request.
+    """
+    pass
+
+
 class KeywordError(Exception):
     """
     Raise when a StatefulBook keyword does not match the spreadsheet column
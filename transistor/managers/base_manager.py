@@ -11,7 +11,10 @@ It's `tasks` parameter can accept a StatefulBook instance, which transforms
 a spreadsheet column into keyword tasks search terms. The `tasks` parameter
 can also accept an ExchangeQueue instance, which creates an AMQP compatable
 exchange and queue, while BaseWorkGroupManager acts as a consumer/worker,
-processing tasks from a broker like RabbitMQ or Redis.
+processing tasks from a broker like RabbitMQ or Redis. Last, the `tasks`
+parameter can accept a TaskSource instance, which streams tasks from a csv
+file, json lines file, stdin, python iterator or SQL cursor into bounded
+task queues while the workers are already scraping.
 
 Although this class is fully functional as-is. The monitor() method provides an
 excellent hook point for post-scrape Worker manipulation. A more robust implementation
@@ -25,18 +28,58 @@ will subclass BaseManager and override the monitor method for customization.
 
 import gevent
 import json
+import time
+from collections import deque
+from functools import partial
 from typing import List, Type, Union
-from gevent.queue import Queue, Empty
+from gevent.queue import Queue, Empty, Full
 from gevent.pool import Pool
 from gevent.exceptions import LoopExit
 from kombu import Connection
 from kombu.mixins import ConsumerMixin
+from transistor.managers.concurrency import AIMDController
+from transistor.managers.ratelimit import RateLimiter
 from transistor.schedulers.books.bookstate import StatefulBook
+from transistor.schedulers.brokers.envelope import get_priority, unpack
 from transistor.schedulers.brokers.queues import ExchangeQueue
+from transistor.schedulers.leases.base import LeaseBackend, make_node_id
+from transistor.schedulers.priority import PriorityTaskQueue
+from transistor.schedulers.sources.tasksource import TaskSource
+from transistor.schedulers.task import Task
 from transistor.workers.workgroup import WorkGroup
 from transistor.exceptions import IncompatibleTasks
-from transistor.utility.logging import logger
-from kombu.utils.functional import reprcall
+from transistor.utility.logging import category_logger, logger
+
+# the per-task messages, with lazy %-style formatting
+log = category_logger('manager')
+
+# put in the results queue of iter_results() when the job is done
+_DONE = object()
+
+
+class _Delivery:
+    """
+    Count the tasks of one broker message which are not yet exported, so the
+    message is only acknowledged after the last one is done.
+    """
+    __slots__ = ('message', 'pending', 'failed', '_ready')
+
+    def __init__(self, message, pending: int, ready: deque):
+        """
+        :param message: the kombu Message.
+        :param pending: the number of tasks created from the message.
+        :param ready: the deque to append this delivery to when it is finished.
+        """
+        self.message = message
+        self.pending = pending
+        self.failed = False
+        self._ready = ready
+
+    def task_done(self, task, failed):
+        self.pending -= 1
+        self.failed = self.failed or failed
+        if self.pending == 0:
+            self._ready.append(self)
 
 
 class BaseWorkGroupManager(ConsumerMixin):
@@ -49,7 +92,8 @@ class BaseWorkGroupManager(ConsumerMixin):
     ]
 
     def __init__(self, job_id, tasks: Type[Union[Type[StatefulBook],
-                                                 Type[ExchangeQueue]]],
+                                                 Type[ExchangeQueue],
+                                                 Type[TaskSource]]],
                  workgroups: List[WorkGroup], pool: int=20,
                  connection: Connection = None, should_stop=True, **kwargs):
         """
@@ -58,17 +102,65 @@ class BaseWorkGroupManager(ConsumerMixin):
 
         :param job_id: will save the result of the workers Scrapes to `job_id` list.
         If this job_id is "NONE" then it will pass on the save.
-        :param tasks:  a StatefulBook or ExchangeQueue instance.
+        :param tasks:  a StatefulBook, ExchangeQueue, or TaskSource instance.
         :param workgroups: a list of class: `WorkGroup()` objects.
         :param pool: size of the greenlets pool. If you want to utilize all the
         workers concurrently, it should be at least the total number
         of all workers + 1 for the manager and +1 for the broker runner in
         self.run() method. Otherwise, the pool is also useful to constrain
-        concurrency to help stay within Crawlera subscription limits.
+        concurrency to help stay within Crawlera subscription limits. Instead of
+        sizing this by hand, WorkGroups with the `aimd` kwarg find their
+        sustainable number of active workers at runtime.
         :param connection: a kombu Connection object, should include the URI to
         connect to either RabbitMQ or Redis.
         :param should_stop: whether to run indefinitely or to stop after the
         manager queue runs empty.
+        :param kwargs: prefetch_count: the maximum number of unacknowledged broker
+        messages for each tracker queue. Defaults to the number of workers in the
+        tracker's WorkGroup, so the broker never sends more messages than there
+        are free workers to start on them.
+        :param kwargs: qsize: the maximum number of tasks held in each tracker
+        queue when consuming from a broker. When a queue is full, consuming pauses
+        until the workers catch up. Defaults to the total number of workers.
+        :param kwargs: ack_interval: the longest time in seconds, which finished
+        messages wait to be acknowledged together in a batch. Default is 1.
+        :param kwargs: requeue_failed: whether a broker message, where a task
+        raised an exception, is requeued (True) or rejected (False, default).
+        :param kwargs: leases: a LeaseBackend shared by several manager nodes
+        consuming from the same ExchangeQueue. Each task is leased before it is
+        scraped, a task leased by another live node is skipped, and the tasks of
+        a node which stopped renewing its leases are re-queued by the others.
+        :param kwargs: lease_ttl: seconds until a lease expires, unless renewed by
+        the heartbeat every lease_ttl/3 seconds. Default is 30.
+        :param kwargs: node_id: the lease owner name for this node. Defaults to
+        a unique name from the host name and process id.
+        :param kwargs: rate_limiter: a RateLimiter shared by all the workers, see
+        transistor.managers.ratelimit. Each WorkGroup can set its own limit with
+        a `rate_limit` key in its kwargs.
+
+        A WorkGroup can also adapt its number of active workers at runtime, with
+        an `aimd` key in its kwargs, see transistor.managers.concurrency.
+        :param kwargs: crawlera_pool: a CrawleraSessionPool shared by all the
+        workers, see transistor.managers.sessions.
+        :param kwargs: page_cache: a PageCache shared by all the workers, so
+        identical Splash requests are rendered once, see transistor.browsers.cache,
+        or a DiskCache, see transistor.browsers.diskcache.
+        :param kwargs: stats: a StatsCollector shared by the manager, the workers
+        and their browsers, see transistor.monitoring.stats.
+        :param kwargs: tracer: a Tracer which traces a sample of the tasks from
+        dispatch to export, see transistor.monitoring.tracing.
+        :param kwargs: profiler: a GreenletProfiler which reports the code paths
+        blocking the gevent hub and samples greenlet stacks while main() runs,
+        see transistor.monitoring.profiler.
+        :param kwargs: memory: a MemoryWatchdog which snapshots the memory of the
+        job, pauses dispatching while the RSS is over its budget, and reports the
+        tracked objects which grew at the end, see transistor.monitoring.memory.
+        :param kwargs: priority_aging: the tracker queues hand out the tasks with
+        the highest priority first, from the `p` field of a broker message, or
+        the StatefulBook `priority` column. A waiting task gains one priority
+        level every priority_aging seconds, so low priority tasks never starve.
+        Default is 30, None for strict priority order, see
+        transistor.schedulers.priority.
         Example:
             >>> groups = [
             >>> WorkGroup(class_=MouseKeyGroup, workers=5, kwargs={"china":True}),
@@ -82,12 +174,40 @@ class BaseWorkGroupManager(ConsumerMixin):
         self.pool = Pool(pool)
         self.qitems = {}
         self.workgroups = {}
+        # the task queue shared by the workers of each workgroup, and the
+        # greenlet of each worker, to skip the workers which quit
+        self.worker_queues = {}
+        self.worker_greenlets = {}
         self.qtimeout = kwargs.get('qtimeout', 5)
         self.mgr_qtimeout = self.qtimeout//2 if self.qtimeout else None
         self.connection = connection
         self.kombu = False
         self.mgr_should_stop = should_stop
         self.mgr_no_work = False
+        self.mgr_done = False
+        self.feeder = None
+        # the exception the TaskSource raised, re-raised by main() at the end
+        self.feed_error = None
+        staff = sum(group.workers for group in self.groups) or 1
+        self.prefetch_count = kwargs.get('prefetch_count', None)
+        self.qsize = kwargs.get('qsize', staff)
+        self.ack_interval = kwargs.get('ack_interval', 1)
+        self.requeue_failed = kwargs.get('requeue_failed', False)
+        self._consumers = []
+        self._outstanding = 0
+        self._ack_ready = deque()
+        self.leases: LeaseBackend = kwargs.get('leases', None)
+        self.lease_ttl = kwargs.get('lease_ttl', 30)
+        self.node_id = kwargs.get('node_id', None) or make_node_id()
+        self.rate_limiter = kwargs.get('rate_limiter', None) or RateLimiter()
+        self.controllers = {}
+        self.crawlera_pool = kwargs.get('crawlera_pool', None)
+        self.page_cache = kwargs.get('page_cache', None)
+        self.stats = kwargs.get('stats', None)
+        self.tracer = kwargs.get('tracer', None)
+        self.profiler = kwargs.get('profiler', None)
+        self.memory = kwargs.get('memory', None)
+        self.priority_aging = kwargs.get('priority_aging', 30.0)
         # call this last
         self._init_tasks(kwargs)
 
@@ -108,16 +228,25 @@ class BaseWorkGroupManager(ConsumerMixin):
         if isinstance(self.tasks, StatefulBook):
             for tracker in self.tasks.to_do():
                 # set the name of qitems key to tracker.name
-                self.qitems[tracker.name] = Queue(items=tracker.to_do())
+                self.qitems[tracker.name] = PriorityTaskQueue(
+                    items=tracker.to_do(), aging=self.priority_aging,
+                    priority=self.tasks.priority_of)
 
         elif isinstance(self.tasks, ExchangeQueue):
             for tracker in self.tasks.trackers:
-               self.qitems[tracker] = Queue()
+                self.qitems[tracker] = PriorityTaskQueue(
+                    maxsize=self.qsize, aging=self.priority_aging)
             self.kombu = True
 
+        elif isinstance(self.tasks, TaskSource):
+            # bounded queues, so a fast source can't run away from the workers
+            for tracker in self.tasks.trackers:
+                self.qitems[tracker] = PriorityTaskQueue(
+                    maxsize=self.tasks.buffer, aging=self.priority_aging)
+
         else:
             raise IncompatibleTasks('`task` parameter must be an instance of '
-                                    'StatefulBook or ExchangeQueue')
+                                    'StatefulBook, ExchangeQueue or TaskSource')
 
         # if not a stateful book. The class should have some attribute which
         # presents a list-like object, where this list-like object is a
@@ -154,6 +283,17 @@ class BaseWorkGroupManager(ConsumerMixin):
                     group.kwargs['exporters'] = group.exporters
                     if not group.kwargs.get('qtimeout', None):
                         group.kwargs['qtimeout'] = self.qtimeout
+                    # one limiter for every worker, with a bucket per group/domain
+                    group.kwargs['rate_limiter'] = self.rate_limiter
+                    group.kwargs['rate_limit_key'] = self.rate_limiter.configure_group(
+                        name, group.kwargs.get('rate_limit', None))
+                    group.kwargs['concurrency'] = self._get_controller(name, group)
+                    group.kwargs['crawlera_pool'] = self.crawlera_pool
+                    group.kwargs['page_cache'] = self.page_cache
+                    group.kwargs['stats'] = self.stats
+                    group.kwargs['tracer'] = self.tracer
+                    group.kwargs['memory'] = self.memory
+                    group.kwargs['task_queue'] = self._get_worker_queue(name, group)
                     basegroup = group.group(
                         staff=group.workers, job_id=self.job_id, **group.kwargs)
                     # now that attrs assigned, init the workers in the basegroup class
@@ -162,40 +302,333 @@ class BaseWorkGroupManager(ConsumerMixin):
                     # instance to the workgroups dict with key = `name`
                     self.workgroups[name] = basegroup
 
+    def _get_worker_queue(self, name, group):
+        """
+        Return the task queue shared by the workers of the group, which holds
+        `queue_size` tasks for each worker, from the worker class.
+        """
+        size = getattr(group.worker, 'queue_size', 1)
+        self.worker_queues[name] = Queue(maxsize=size * group.workers if size else None)
+        return self.worker_queues[name]
+
+    def _get_controller(self, name, group):
+        """
+        Return an AIMDController for the group, if its kwargs have an `aimd` key,
+        else None.
+        """
+        aimd = group.kwargs.get('aimd', None)
+        if not aimd:
+            return None
+        params = dict(aimd) if isinstance(aimd, dict) else {}
+        params.setdefault('max_workers', group.workers)
+        params.setdefault('name', name)
+        self.controllers[name] = AIMDController(**params)
+        return self.controllers[name]
+
     def get_consumers(self, Consumer, channel):
         """
         Must be implemented for Kombu ConsumerMixin
+
+        There is one consumer for each tracker queue, so a message is only put
+        in the task queue of the tracker it was routed to. To send the same
+        keywords to every tracker, create the ExchangeQueue with
+        exchange_type='fanout', then the broker delivers a copy of each message
+        to every tracker queue.
         """
-        return [Consumer(queues=self.tasks.task_queues,
+        return [Consumer(queues=[queue],
                          accept=['json'],
-                         callbacks=[self.process_task])]
+                         prefetch_count=self._get_prefetch_count(queue.name),
+                         callbacks=[partial(self.process_task, tracker=queue.name)])
+                for queue in self.tasks.task_queues]
 
-    def process_task(self, body, message):
+    def _get_prefetch_count(self, tracker):
+        """
+        Return the prefetch_count kwarg, or else the number of workers in the
+        WorkGroup for `tracker`.
+        """
+        if self.prefetch_count is not None:
+            return self.prefetch_count
+        return sum(group.workers for group in self.groups
+                   if group.name == tracker) or 1
+
+    def on_consume_ready(self, connection, channel, consumers, **kwargs):
+        """
+        Kombu ConsumerMixin hook. Keep the consumers, to update their QoS later.
         """
-        Process messages to extract the task keywords and then
-        load them into a gevent Queue for each tracker.
+        self._consumers = consumers
+
+    def on_iteration(self):
+        """
+        Kombu ConsumerMixin hook, called by the consumer loop before it waits for
+        the next message. Acknowledge every message whose tasks were all exported
+        since the last iteration, in one batch, and stop consuming once all of
+        the work is done and acknowledged.
+        """
+        self.flush_acks()
+        if self.mgr_done and not self._outstanding:
+            self.should_stop = True
+
+    def update_qos(self, prefetch_count: int):
+        """
+        Change how many unacknowledged messages the broker may deliver to each
+        tracker queue, for example after changing the number of active workers.
+        """
+        self.prefetch_count = prefetch_count
+        for consumer in self._consumers:
+            consumer.qos(prefetch_count=prefetch_count)
+
+    def flush_acks(self):
+        """
+        Acknowledge the messages whose tasks are all finished. A message with a
+        failed task is rejected instead, and requeued if `requeue_failed` is set.
+        """
+        while self._ack_ready:
+            delivery = self._ack_ready.popleft()
+            self._outstanding -= 1
+            if delivery.failed:
+                logger.error(f'rejecting message with failed tasks: '
+                             f'{delivery.message.delivery_tag}')
+                delivery.message.reject(requeue=self.requeue_failed)
+            else:
+                delivery.message.ack()
+
+    def process_task(self, body, message, tracker=None):
+        """
+        Process messages to extract the task keywords, from either a batched
+        task envelope or the original {'keywords': ..., 'kwargs': ...} format,
+        and then
+        load them into the gevent Queue of the tracker, which is the name of the
+        queue the message was consumed from. If tracker is None, the keywords
+        are loaded into the Queue of every tracker.
 
         To customize how this Manger class works with the broker,
         this method should be a top consideration to override.
 
+        The message is not acknowledged here. Each keyword is wrapped in a Task
+        and the message is acknowledged by flush_acks() after the workers have
+        exported the results of all its tasks. The tracker queues are bounded, so
+        `put` blocks this consumer while they are full.
+
         Kwargs is not currently used. But it could be very useful
         to set logic flags for use in this method.
         """
-        keywords = body['keywords']
-        kwargs = body['kwargs']
-        logger.info(f'Got task: {reprcall(keywords)}')
         try:
-            if isinstance(keywords, str):
-                keywords = json.loads(keywords)
-            for key in self.qitems.keys():
-                for item in keywords:
-                    self.qitems[key].put(item)
-            if not self.mgr_should_stop:
-                if self.mgr_no_work:
-                    gevent.spawn(self.manage).join()
+            keywords, kwargs = unpack(body)
+            priority = get_priority(body)
         except Exception as exc:
             logger.error(f'task raised exception: {exc}')
-        message.ack()
+            return message.ack()
+        log.info('Got %d tasks for %s', len(keywords), tracker or 'all trackers')
+        if tracker is None:
+            qnames = list(self.qitems.keys())
+        else:
+            qnames = [tracker] if tracker in self.qitems else []
+        if not keywords:
+            return message.ack()
+        if not qnames:
+            logger.error(f'No tracker queue named {tracker} for '
+                         f'{len(keywords)} tasks.')
+            return message.ack()
+        self._wake_manager()
+        delivery = _Delivery(message, len(keywords) * len(qnames), self._ack_ready)
+        self._outstanding += 1
+        for key in qnames:
+            for item in keywords:
+                task = Task(item, tracker=key, kwargs=kwargs, priority=priority)
+                leased = self._lease(task)
+                task.on_done(delivery.task_done)
+                if leased:
+                    self.qitems[key].put(task)
+                else:
+                    # another live node is working on it, so it's done here
+                    task.done()
+
+    def _wake_manager(self):
+        """
+        Restart manage() for new tasks, if it ran out of work and should not stop.
+        """
+        if not self.mgr_should_stop and self.mgr_no_work:
+            self.mgr_no_work = False
+            self.mgr_done = False
+            gevent.spawn(self.manage)
+
+    def _lease_key(self, task):
+        return f'{self.job_id}:{task.tracker}:{task.keyword}'
+
+    def _lease(self, task) -> bool:
+        """
+        Lease the task to this node, if a LeaseBackend is used. Return False if
+        another node holds the lease.
+        """
+        if self.leases is None:
+            return True
+        payload = json.dumps({'t': task.tracker, 'k': task.keyword, 'a': task.kwargs,
+                              'p': task.priority})
+        if not self.leases.acquire(self._lease_key(task), self.node_id,
+                                   self.lease_ttl, payload):
+            log.info('Skipped task %s, it is leased by another node.', task)
+            return False
+        task.on_done(self._release_lease)
+        return True
+
+    def _release_lease(self, task, failed):
+        if not self.leases.release(self._lease_key(task), self.node_id):
+            log.warning('Lost the lease on task %s before it was done.', task)
+
+    def heartbeat(self):
+        """
+        Renew the leases held by this node, until killed.
+        """
+        while True:
+            gevent.sleep(self.lease_ttl / 3)
+            renewed = self.leases.renew(self.node_id, self.lease_ttl)
+            log.debug('Node %s renewed %d leases.', self.node_id, renewed)
+
+    def reap(self):
+        """
+        Re-queue the tasks with expired leases, until killed.
+        """
+        while True:
+            gevent.sleep(self.lease_ttl / 2)
+            self.requeue_expired()
+
+    def requeue_expired(self):
+        """
+        Take over the expired leases, which were held by a node that died, and
+        put their tasks in the tracker queues of this node.
+        """
+        if self.mgr_done:
+            return
+        for key, payload in self.leases.reclaim(self.node_id, self.lease_ttl):
+            data = json.loads(payload)
+            task = Task(data['k'], tracker=data['t'], kwargs=data.get('a', {}),
+                        priority=data.get('p', 0))
+            if task.tracker not in self.qitems:
+                self.leases.release(key, self.node_id)
+                continue
+            log.info('Node %s re-queued expired task %s.', self.node_id, task)
+            self._wake_manager()
+            self._outstanding += 1
+            task.on_done(self._release_lease)
+            task.on_done(self._reclaimed_task_done)
+            self.qitems[task.tracker].put(task)
+
+    def _reclaimed_task_done(self, task, failed):
+        self._outstanding -= 1
+
+    def feed(self):
+        """
+        Pull tasks from a TaskSource and put each task in every tracker queue.
+
+        Each tracker queue is filled by its own greenlet, from a backlog of up to
+        TaskSource.buffer tasks, so a tracker whose workers are behind doesn't
+        hold up the others. Reading from the source pauses while a backlog is
+        full, until that tracker's workers have caught up. A tracker without a
+        WorkGroup gets no tasks, since nothing would ever take them.
+
+        If the source raises, the tasks already read are still scraped, and
+        main() raises the exception at the end, so the job is not mistaken for
+        a complete one.
+        """
+        backlogs = {}
+        for name in self.qitems:
+            if name in self.workgroups:
+                backlogs[name] = Queue(maxsize=self.tasks.buffer)
+            else:
+                logger.warning(f'No WorkGroup named {name} for the tasks of '
+                               f'{self.tasks}.')
+        fillers = [gevent.spawn(self._fill, backlog, self.qitems[name])
+                   for name, backlog in backlogs.items()]
+        try:
+            for task in self.tasks:
+                for backlog in backlogs.values():
+                    backlog.put(task)
+        except Exception as exc:
+            logger.error(f'task source raised exception: {exc}')
+            self.feed_error = exc
+        finally:
+            for backlog in backlogs.values():
+                backlog.put(StopIteration)
+            gevent.joinall(fillers)
+            self.tasks.close()
+        if self.feed_error is None:
+            logger.info(f'Task source {self.tasks} is exhausted.')
+
+    @staticmethod
+    def _fill(backlog, q):
+        """
+        Move the tasks from a feed() backlog into a tracker queue, until the
+        StopIteration at the end of the backlog.
+        """
+        for task in backlog:
+            q.put(task)
+
+    def _feeding(self):
+        """
+        Return True while a TaskSource feeder is still producing tasks.
+        """
+        return self.feeder is not None and not self.feeder.dead
+
+    def _get_task(self, name, workgroup, q):
+        """
+        Get the next task from a tracker queue. An empty queue only means the
+        work is finished once the TaskSource feeder (if any) has finished, and
+        every broker message is acknowledged, since the broker holds back new
+        messages while the prefetch limit is reached.
+        """
+        while True:
+            try:
+                return q.get(timeout=self.mgr_qtimeout)
+            except Empty:
+                if not self._feeding() and not self._outstanding:
+                    raise
+                # a task left behind by workers which quit is never done
+                self._fail_stranded(name, workgroup)
+
+    def _live_workers(self, workgroup) -> list:
+        """
+        Return the workers of the workgroup whose greenlet has not quit.
+        """
+        return [worker for worker in workgroup
+                if worker not in self.worker_greenlets
+                or not self.worker_greenlets[worker].dead]
+
+    def _assign(self, name, workgroup, task, since=None):
+        """
+        Put a task in the task queue shared by the workers of the workgroup,
+        waiting while it is full. If every worker quit, the task fails instead
+        of waiting for ever.
+        """
+        while True:
+            workers = self._live_workers(workgroup)
+            if not workers:
+                self._fail_task(name, task)
+                self._fail_stranded(name, workgroup)
+                return
+            try:
+                return workers[0].assign(task, since=since,
+                                         timeout=self.mgr_qtimeout or 1)
+            except Full:
+                pass
+
+    def _fail_stranded(self, name, workgroup):
+        """
+        Fail the tasks left in the task queue of the workgroup, once every
+        worker quit.
+        """
+        if self._live_workers(workgroup):
+            return
+        q = self.worker_queues[name]
+        while not q.empty():
+            entry = q.get_nowait()
+            self._fail_task(name, getattr(entry, 'task', entry))
+
+    def _fail_task(self, name, task):
+        logger.error(f'No {name} worker is left for task {task}.')
+        if self.stats is not None:
+            self.stats.inc('tasks_failed', name)
+        if isinstance(task, Task):
+            task.done(failed=True)
 
     def spawn_list(self):
         """"
@@ -211,8 +644,11 @@ class BaseWorkGroupManager(ConsumerMixin):
 
         # here, workgroups is a list of Type[BaseGroup] objects
         workgroups = [val for val in self.workgroups.values()]
-        spawn_list = [self.pool.spawn(self.monitor, worker) for work_group in
-                      workgroups for worker in work_group]
+        spawn_list = []
+        for work_group in workgroups:
+            for worker in work_group:
+                self.worker_greenlets[worker] = self.pool.spawn(self.monitor, worker)
+                spawn_list.append(self.worker_greenlets[worker])
 
         # we get a blocking error if we spawn the manager first, so spawn it last
         spawn_list.append(self.pool.spawn(self.manage))
@@ -245,7 +681,7 @@ class BaseWorkGroupManager(ConsumerMixin):
             target.spawn_spider()
             # /start --> YOUR POST-SCRAPE HOOK IS HERE, ADD LOGIC AS REQUIRED.
             for event in target.events:
-                # .event is a simple list() as a class attribute, in the scraper object
+                # .events is a ring buffer of the worker's recent results
                 # we could apply some transformation to an object in event, now.
                 print(f'THIS IS A MONITOR EVENT - > {event}')
             # /end --> YOUR POST SCRAPE HOOK LOGIC. Finally, call gevent.sleep()
@@ -262,34 +698,144 @@ class BaseWorkGroupManager(ConsumerMixin):
         Manage will hand out work when the appropriate Worker is free.
         The manager timeout must be less than worker timeout, or else, the
         workers will be idled and shutdown.
+
+        Each workgroup gets its own dispatch greenlet, so a tracker queue which
+        is empty, or slow to fill, never holds up the other trackers.
+        """
+        while True:
+            dispatchers = [gevent.spawn(self.dispatch, name, workgroup,
+                                        self.qitems[name])
+                           for name, workgroup in self.workgroups.items()
+                           if name in self.qitems]
+            gevent.joinall(dispatchers)
+            # tasks put while the dispatchers were quitting did not wake the
+            # manager, since it was still running, so dispatch them here. Only
+            # the queues of a workgroup are dispatched, the others never empty
+            if all(self.qitems[name].empty() for name in self.workgroups
+                   if name in self.qitems):
+                break
+        self.mgr_no_work = True
+        if self.mgr_should_stop:
+            logger.info("Assigned all work. I've been told I should stop.")
+            # the consumer stops in on_iteration(), after the last ack
+            self.mgr_done = True
+        else:
+            logger.info("Assigned all work. Awaiting more tasks to assign.")
+
+    def dispatch(self, name, workgroup, q):
+        """
+        Assign the tasks from the tracker queue `q` to the workers of the
+        workgroup with the same `name`, until the queue runs empty. The workers
+        share one task queue, so the next free worker takes the next task.
         """
         try:
             while True:
-                for name, workgroup in self.workgroups.items():
-                    for qname, q in self.qitems.items():
-                        if name == qname: # workgroup name must match tracker name
-                            # a tracker with the same name as workgroup name, is...
-                            # ...effectively, the workgroup's task queue, so now...
-                            # assign a task to a worker from the workgroup's task queue
-                            for worker in workgroup:
-                                one_task = q.get(timeout=self.mgr_qtimeout)
-                                worker.tasks.put(one_task)
+                # a tracker with the same name as workgroup name, is...
+                # ...effectively, the workgroup's task queue, so now...
+                # assign a task to the workers from the workgroup's task queue
+                if self.memory is not None:
+                    self.memory.wait()
+                started = time.monotonic()
+                one_task = self._get_task(name, workgroup, q)
+                if self.stats is not None:
+                    self.stats.inc('tasks_dispatched', name)
+                self._assign(name, workgroup, one_task, since=started)
                 gevent.sleep(0)
         except Empty:
-            self.mgr_no_work = True
-            if self.mgr_should_stop:
-                logger.info(f"Assigned all {name} work. I've been told I should stop.")
-                self.should_stop = True
-            else:
-                logger.info(f"Assigned all {name} work. Awaiting more tasks to assign.")
+            logger.info(f"Assigned all {name} work.")
 
     def main(self):
+        if self.profiler is not None:
+            self.profiler.start()
+        if isinstance(self.tasks, TaskSource):
+            # not spawned in the pool, so it never takes a worker's slot
+            self.feeder = gevent.spawn(self.feed)
+        keepers = []
+        if self.kombu and self.leases is not None:
+            keepers = [gevent.spawn(self.heartbeat), gevent.spawn(self.reap)]
+        keepers.extend(gevent.spawn(controller.run)
+                       for controller in self.controllers.values())
+        if self.crawlera_pool is not None:
+            keepers.append(gevent.spawn(self.crawlera_pool.fill))
+        if self.stats is not None:
+            keepers.extend(self.stats.start())
+        if self.memory is not None:
+            keepers.extend(self.memory.start())
         spawny = self.spawn_list()
         if self.kombu:
-            gevent.spawn(self.run).join()
+            gevent.spawn(self.run, safety_interval=self.ack_interval).join()
         try:
             gevent.pool.joinall(spawny)
         except LoopExit:
             logger.error('No tasks. This operation would block forever.')
+        gevent.killall(keepers)
+        if self.stats is not None:
+            self.stats.stop()
+        if self.tracer is not None:
+            self.tracer.close()
+        if self.profiler is not None:
+            self.profiler.stop()
+        if self.memory is not None:
+            self.memory.stop(self.job_id)
         # print([worker.get() for worker in spawny])
         gevent.sleep(0)
+        if self.feed_error is not None:
+            raise self.feed_error
+
+    def iter_results(self, maxsize: int=None):
+        """
+        Run the job like main(), and yield each Item as soon as a worker has
+        exported it, so the caller can process the results while the job runs:
+
+            >>> for item in manager.iter_results():
+            ...     print(item['book_title'])
+
+        The items wait in a queue of `maxsize`, and a worker which finds it full
+        waits until the caller takes the next item, so a slow caller slows the
+        job down instead of the queue growing without bound.
+
+        If the caller stops iterating early, the generator returns right away,
+        while the job still runs to the end in the background, so every task is
+        exported and acknowledged.
+
+        :param maxsize: the most items waiting for the caller, default the
+        total number of workers.
+        :raises: the exception main() raised, if any, after the last item.
+        """
+        results = Queue(maxsize=maxsize or sum(g.workers for g in self.groups) or 1)
+        self._stream_results(results)
+
+        def run():
+            try:
+                self.main()
+            finally:
+                results.put(_DONE)
+
+        def drain():
+            # unblock the workers waiting to put an item, until the end
+            while results.get() is not _DONE:
+                pass
+
+        runner = gevent.spawn(run)
+        done = False
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    done = True
+                    break
+                yield item
+        finally:
+            self._stream_results(None)
+            if not done:
+                # never wait here, this may run in a finalizer
+                gevent.spawn(drain)
+        runner.get()
+
+    def _stream_results(self, results):
+        """
+        Give every worker the queue to put its exported items in, or None.
+        """
+        for workgroup in self.workgroups.values():
+            for worker in workgroup:
+                worker.results = results
@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.managers.concurrency
+~~~~~~~~~~~~
+This module implements AIMDController, which adapts the number of active
+workers in a WorkGroup at runtime with additive increase, multiplicative
+decrease (AIMD), the same scheme TCP uses for its congestion window.
+
+The WorkGroup `workers` count becomes the upper limit. Every `interval` seconds
+the controller looks at the requests finished since the last check. If too many
+of them were bans or timeouts (http 503/504, a 408 from a
+SplashBrowser.timeout_exception, or a failed task), or their mean latency is
+above `latency_target`, the limit is multiplied by `decrease`. Otherwise it grows
+by `increase`. So each group settles at its highest sustainable throughput.
+
+Enable it with the `aimd` key in the WorkGroup kwargs, either True or a dict
+with the AIMDController parameters:
+
+    >>> WorkGroup(name='mousekey.com', workers=20, ...,
+    >>>           kwargs={'aimd': {'start': 4, 'latency_target': 30.0}})
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import math
+import gevent
+from collections import deque
+from gevent.event import Event
+from transistor.utility.logging import logger
+
+__all__ = ['AIMDController']
+
+
+class AIMDController:
+    """
+    Limit the active workers of one WorkGroup and adjust the limit with AIMD.
+
+    A worker calls acquire() before it starts a task, release() when it is done
+    and record() with the outcome.
+    """
+
+    congestion_statuses = {408, 429, 503, 504}
+
+    def __init__(self, max_workers: int, min_workers: int=1, start: int=None,
+                 increase: int=1, decrease: float=0.5, interval: float=10.0,
+                 error_threshold: float=0.1, latency_target: float=None,
+                 name: str=None):
+        """
+        :param max_workers: the upper limit, usually the WorkGroup workers count.
+        :param min_workers: the lower limit.
+        :param start: the initial limit. Defaults to min_workers, like TCP slow
+        start, so a new group does not start with a burst of requests.
+        :param increase: workers added after an interval without congestion.
+        :param decrease: the factor the limit is multiplied by after an interval
+        with congestion.
+        :param interval: seconds between adjustments.
+        :param error_threshold: the fraction of congested requests in an interval
+        which triggers a decrease.
+        :param latency_target: if set, a mean latency in seconds above this
+        triggers a decrease.
+        :param name: the WorkGroup name, for logging.
+        """
+        self.max_workers = max(1, max_workers)
+        self.min_workers = max(1, min(min_workers, self.max_workers))
+        start = self.min_workers if start is None else start
+        self.limit = min(self.max_workers, max(self.min_workers, start))
+        self.increase = increase
+        self.decrease = decrease
+        self.interval = interval
+        self.error_threshold = error_threshold
+        self.latency_target = latency_target
+        self.name = name
+        self.active = 0
+        self._waiters = deque()
+        self._reset_window()
+
+    def __repr__(self):
+        return (f'<AIMDController(name={self.name!r}, limit={self.limit}, '
+                f'active={self.active})>')
+
+    def _reset_window(self):
+        self.requests = 0
+        self.congested = 0
+        self.latency = 0.0
+
+    def acquire(self):
+        """
+        Wait until fewer than `limit` workers are active, then count this one.
+        """
+        while self.active >= self.limit:
+            waiter = Event()
+            self._waiters.append(waiter)
+            waiter.wait()
+        self.active += 1
+
+    def release(self):
+        self.active -= 1
+        self._wake()
+
+    def _wake(self):
+        """
+        Wake as many waiting workers as there are free slots, oldest first.
+        """
+        for _ in range(self.limit - self.active):
+            if not self._waiters:
+                break
+            self._waiters.popleft().set()
+
+    def record(self, latency: float, status=None, timeout: bool=False,
+               failed: bool=False):
+        """
+        Record the outcome of one task.
+
+        :param latency: seconds the task took.
+        :param status: the http status code, if any.
+        :param timeout: True if the request timed out.
+        :param failed: True if the task raised an exception.
+        """
+        self.requests += 1
+        self.latency += latency
+        try:
+            status = int(status)
+        except (TypeError, ValueError):
+            status = None
+        if timeout or failed or status in self.congestion_statuses:
+            self.congested += 1
+
+    def adjust(self) -> int:
+        """
+        Apply additive increase or multiplicative decrease to the limit, based
+        on the requests recorded since the last call.
+
+        :returns the new limit.
+        """
+        if self.requests:
+            mean_latency = self.latency / self.requests
+            slow = (self.latency_target is not None
+                    and mean_latency > self.latency_target)
+            if slow or self.congested / self.requests > self.error_threshold:
+                limit = max(self.min_workers,
+                            int(math.floor(self.limit * self.decrease)))
+            else:
+                limit = min(self.max_workers, self.limit + self.increase)
+            if limit != self.limit:
+                logger.info(f'{self.name} concurrency {self.limit} -> {limit} '
+                            f'({self.congested}/{self.requests} congested, '
+                            f'{mean_latency:.2f}s mean latency)')
+                self.limit = limit
+                self._wake()
+        self._reset_window()
+        return self.limit
+
+    def run(self):
+        """
+        Adjust the limit every `interval` seconds, until killed.
+        """
+        while True:
+            gevent.sleep(self.interval)
+            self.adjust()
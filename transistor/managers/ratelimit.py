@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.managers.ratelimit
+~~~~~~~~~~~~
+This module implements TokenBucket and RateLimiter, a politeness limiter which
+the BaseWorkGroupManager shares with all of its workers, so the request rate to
+each target is limited across every worker and WorkGroup, instead of each
+spider guessing with hard-coded sleeps.
+
+Configure a bucket per WorkGroup with the `rate_limit` key in the WorkGroup
+kwargs, as requests per second, or as a dict:
+
+    >>> WorkGroup(name='mousekey.com', ..., kwargs={'rate_limit': 2.0})
+    >>> WorkGroup(name='mousekey.cn', ...,
+    >>>           kwargs={'rate_limit': {'rate': 2.0, 'burst': 4, 'key': 'mousekey'}})
+
+Groups which use the same `key` share one bucket. Without a `key`, the bucket
+key is the WorkGroup name. Buckets keyed by the target domain can be set up on
+a RateLimiter passed to the manager with the `rate_limiter` kwarg, and they apply
+to the WorkGroups without their own `rate_limit`.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import time
+import gevent
+from gevent.lock import Semaphore
+from urllib.parse import urlparse
+
+__all__ = ['TokenBucket', 'RateLimiter']
+
+
+class TokenBucket:
+    """
+    A token bucket which refills at `rate` tokens per second, up to `burst`
+    tokens. Greenlets waiting in acquire() are served first come, first served.
+    """
+
+    def __init__(self, rate: float, burst: float=None):
+        """
+        :param rate: tokens added per second, i.e. the sustained requests per second.
+        :param burst: the bucket size, i.e. how many requests may be sent at once
+        after a quiet period. Defaults to max(1, rate).
+        """
+        if rate <= 0:
+            raise ValueError(f'rate must be positive, got {rate}')
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.tokens = self.burst
+        self.stamp = time.monotonic()
+        self._lock = Semaphore()
+
+    def __repr__(self):
+        return f'<TokenBucket(rate={self.rate}, burst={self.burst})>'
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def try_acquire(self, tokens: float=1) -> bool:
+        """
+        Take `tokens` without waiting. Return False if there are not enough.
+        """
+        self._refill()
+        if self.tokens >= tokens and not self._lock.locked():
+            self.tokens -= tokens
+            return True
+        return False
+
+    def acquire(self, tokens: float=1) -> float:
+        """
+        Wait until `tokens` are available and take them.
+
+        :returns the seconds spent waiting.
+        """
+        start = time.monotonic()
+        with self._lock:
+            self._refill()
+            while self.tokens < tokens:
+                gevent.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+        return time.monotonic() - start
+
+
+class RateLimiter:
+    """
+    A registry of TokenBuckets by key, where a key is a tracker name, a shared
+    name for several WorkGroups, or a target domain like 'books.toscrape.com'.
+    """
+
+    def __init__(self, default_rate: float=None, default_burst: float=None):
+        """
+        :param default_rate: if set, each domain without a configured bucket gets
+        its own bucket with this rate. Otherwise those requests are not limited.
+        :param default_burst: the burst for the default buckets.
+        """
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.buckets = {}
+
+    def __repr__(self):
+        return f'<RateLimiter(buckets={list(self.buckets)})>'
+
+    def configure(self, key: str, rate: float, burst: float=None) -> TokenBucket:
+        """
+        Create or replace the bucket for `key`.
+        """
+        self.buckets[key] = TokenBucket(rate, burst)
+        return self.buckets[key]
+
+    def configure_group(self, name: str, rate_limit):
+        """
+        Set up the bucket for a WorkGroup from its `rate_limit` kwarg, which is a
+        number of requests per second or a dict with `rate` and optional `burst`
+        and `key`.
+
+        :returns the bucket key for the group, or None if the group should use
+        the buckets by domain.
+        """
+        if rate_limit is None:
+            return None
+        if not isinstance(rate_limit, dict):
+            rate_limit = {'rate': rate_limit}
+        key = rate_limit.get('key', name)
+        if key not in self.buckets:
+            self.configure(key, rate_limit['rate'], rate_limit.get('burst'))
+        return key
+
+    def bucket(self, key: str):
+        """
+        Return the bucket for `key`, or None if requests for `key` are not limited.
+        """
+        bucket = self.buckets.get(key)
+        if bucket is None and self.default_rate is not None and key:
+            bucket = self.configure(key, self.default_rate, self.default_burst)
+        return bucket
+
+    def acquire(self, key: str=None, url: str=None) -> float:
+        """
+        Wait for a token from the bucket of `key`, or else of the domain of `url`.
+
+        :returns the seconds spent waiting.
+        """
+        if key is None and url:
+            key = urlparse(url).netloc
+        bucket = self.bucket(key)
+        if bucket is None:
+            return 0.0
+        return bucket.acquire()
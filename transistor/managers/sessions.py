@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.managers.sessions
+~~~~~~~~~~~~
+This module implements CrawleraSessionPool, a pool of Crawlera sessions shared by
+all the workers of a BaseWorkGroupManager.
+
+Crawlera wants about 12 seconds between two requests on the same session. Instead
+of each spider creating a new session per task, and sleeping 12-20 seconds before
+a retry, the pool hands every request a session which is ready, prefers the
+session the worker used last (affinity, so cookies and IP stay consistent),
+retires banned sessions and creates new sessions ahead of demand.
+
+    >>> pool = CrawleraSessionPool(size=10, api_key=os.environ['CRAWLERA_USA'])
+    >>> manager = BaseWorkGroupManager('job', tasks, groups, crawlera_pool=pool)
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import time
+import gevent
+import requests
+from transistor.utility.logging import logger
+
+__all__ = ['CrawleraSession', 'CrawleraSessionPool', 'create_crawlera_session']
+
+CRAWLERA_SESSIONS_URL = 'http://proxy.crawlera.com:8010/sessions'
+
+
+def create_crawlera_session(api_key: str) -> str:
+    """
+    Create a new Crawlera session with the sessions API and return its id.
+    """
+    response = requests.post(CRAWLERA_SESSIONS_URL, auth=(api_key, ''), timeout=30)
+    response.raise_for_status()
+    return response.text.strip()
+
+
+class CrawleraSession:
+    """
+    A Crawlera session and its usage.
+
+    A session with id None has not been created yet. It is sent as 'create' and
+    the pool learns the id from the X-Crawlera-Session response header.
+    """
+
+    __slots__ = ('id', 'last_used', 'uses', 'in_use', 'retired')
+
+    def __init__(self, session_id: str=None):
+        self.id = session_id
+        self.last_used = None
+        self.uses = 0
+        self.in_use = False
+        self.retired = False
+
+    def __repr__(self):
+        return f'<CrawleraSession(id={self.id!r}, uses={self.uses})>'
+
+    @property
+    def header(self) -> str:
+        """
+        The X-Crawlera-Session header value to send.
+        """
+        return self.id or 'create'
+
+    def ready_in(self, spacing: float, now: float) -> float:
+        """
+        Seconds until this session may send its next request.
+        """
+        if self.last_used is None:
+            return 0.0
+        return max(0.0, self.last_used + spacing - now)
+
+
+class CrawleraSessionPool:
+    """
+    Hand out Crawlera sessions to requests, with a minimum spacing between the
+    requests on each session.
+    """
+
+    def __init__(self, size: int=10, spacing: float=12.0, max_size: int=None,
+                 api_key: str=None, create=None, prefill: int=None):
+        """
+        :param size: the number of sessions to keep in the pool.
+        :param spacing: the minimum seconds between two requests on one session.
+        :param max_size: when every session is cooling down, new sessions are
+        added up to this size instead of waiting. Defaults to 2 x size.
+        :param api_key: the Crawlera API key, used to create sessions ahead of
+        demand with the sessions API.
+        :param create: a callable returning a new session id, instead of
+        create_crawlera_session(api_key).
+        :param prefill: how many sessions to create ahead of demand in fill().
+        Defaults to `size` if sessions can be created, else 0.
+        """
+        self.size = size
+        self.spacing = spacing
+        self.max_size = max_size or 2 * size
+        if create is None and api_key:
+            def create():
+                return create_crawlera_session(api_key)
+        self.create = create
+        self.prefill = size if prefill is None and create else (prefill or 0)
+        self.sessions = []
+        self.affinity = {}
+        self.retired = 0
+
+    def __repr__(self):
+        return (f'<CrawleraSessionPool(sessions={len(self.sessions)}, '
+                f'retired={self.retired})>')
+
+    def fill(self):
+        """
+        Create sessions ahead of demand, until `prefill` sessions are ready.
+        """
+        while self.create and len(self.sessions) < self.prefill:
+            try:
+                session_id = self.create()
+            except Exception as exc:
+                logger.error(f'Could not create a Crawlera session: {exc}')
+                return
+            self.sessions.append(CrawleraSession(session_id))
+
+    def checkout(self, affinity=None) -> CrawleraSession:
+        """
+        Return a session which may send a request now. The session last used by
+        `affinity` is preferred, then any other ready session, then a new one.
+        If the pool is full and every session is cooling down, wait for the first
+        one to be ready.
+
+        :param affinity: a key like the worker name, for session affinity.
+        """
+        while True:
+            now = time.monotonic()
+            session = self.affinity.get(affinity)
+            if session is None or session.retired or session.in_use or \
+                    session.ready_in(self.spacing, now) > 0:
+                free = [s for s in self.sessions if not s.in_use]
+                ready = [s for s in free if s.ready_in(self.spacing, now) == 0]
+                if ready:
+                    # the least recently used, so the load spreads over sessions
+                    session = min(ready, key=lambda s: s.last_used or 0)
+                elif len(self.sessions) < self.max_size:
+                    session = CrawleraSession()
+                    self.sessions.append(session)
+                    # top up the pool in the background for the next request
+                    if self.create and len(self.sessions) < self.prefill:
+                        gevent.spawn(self.fill)
+                else:
+                    wait = min([s.ready_in(self.spacing, now) for s in free] or
+                               [self.spacing])
+                    gevent.sleep(max(wait, 0.01))
+                    continue
+            session.in_use = True
+            session.last_used = now
+            session.uses += 1
+            if affinity is not None:
+                self.affinity[affinity] = session
+            return session
+
+    def checkin(self, session: CrawleraSession, session_id: str=None,
+                banned: bool=False):
+        """
+        Return a session to the pool after its request.
+
+        :param session_id: the X-Crawlera-Session response header, so a session
+        sent as 'create' learns its id.
+        :param banned: True if Crawlera answered with a ban, then the session is
+        retired.
+        """
+        session.in_use = False
+        session.last_used = time.monotonic()
+        if session.id is None and session_id:
+            session.id = session_id
+        if banned or (session.id is None and not session_id):
+            self.retire(session)
+
+    def retire(self, session: CrawleraSession):
+        """
+        Remove a session from the pool.
+        """
+        if not session.retired:
+            session.retired = True
+            self.retired += 1
+            if session in self.sessions:
+                self.sessions.remove(session)
+            logger.info(f'Retired Crawlera session {session.id}.')
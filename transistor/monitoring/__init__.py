@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.monitoring
+~~~~~~~~~~~~
+This module implements instrumentation for scrape jobs, like the StatsCollector
+which is shared by a BaseWorkGroupManager, its workers and their browsers.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+from transistor.utility.lazy import lazy_exports
+
+__all__ = ['GreenletProfiler', 'Histogram', 'MemoryWatchdog', 'StatsCollector',
+           'Trace', 'Tracer']
+
+lazy_exports(globals(), {
+    'Histogram': '.stats',
+    'StatsCollector': '.stats',
+    'Trace': '.tracing',
+    'Tracer': '.tracing',
+    'GreenletProfiler': '.profiler',
+    'MemoryWatchdog': '.memory',
+})
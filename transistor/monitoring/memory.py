@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.monitoring.memory
+~~~~~~~~~~~~
+This module implements MemoryWatchdog, which watches the memory of a
+BaseWorkGroupManager job. Every `interval` seconds it takes a snapshot of the
+process RSS and the live instances of the classes tracked by
+transistor.utility.trackref, like Items. While the RSS is over `budget_mb`, the
+manager pauses dispatching tasks, and at the end of the job the watchdog writes a
+leak report, of the tracked instances which grew during the job, and with
+trace=True, of the allocations traced by tracemalloc which grew.
+
+A tracemalloc snapshot blocks the gevent hub for a while on a large heap, so
+they are only taken at the start and the end of the job.
+
+    >>> memory = MemoryWatchdog(budget_mb=2048, report='leaks.json')
+    >>> manager = BaseWorkGroupManager('job', tasks, groups, memory=memory)
+    >>> manager.main()
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import gc
+import os
+import sys
+import json
+import time
+import tracemalloc
+import gevent
+from collections import deque
+from gevent.event import Event
+from transistor.utility.logging import logger
+from transistor.utility.trackref import count_live_refs
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+__all__ = ['MemoryWatchdog', 'rss_kb']
+
+
+def rss_kb() -> int:
+    """
+    Return the resident set size of this process in KiB, or the peak resident
+    set size where the current one is not available, or None.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB on linux
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+class MemoryWatchdog:
+    """
+    Snapshot the memory of a job, pause dispatching while it is over budget, and
+    report what grew.
+    """
+
+    def __init__(self, budget_mb: float=None, interval: float=5.0,
+                 report: str=None, trace: bool=False, top: int=10,
+                 resume_ratio: float=0.9, max_pause: float=60.0,
+                 history: int=100):
+        """
+        :param budget_mb: the most RSS in MiB, above which the manager pauses
+        dispatching tasks, or None for no budget.
+        :param interval: seconds between two snapshots.
+        :param report: the JSON file the leak report is written to at the end of
+        the job, if any. It is logged either way.
+        :param trace: trace the allocations with tracemalloc, for the top
+        allocators and the allocations which grew in the leak report. It costs
+        time and memory for each allocation.
+        :param top: the number of top allocators in the report.
+        :param resume_ratio: dispatching resumes when the RSS is below
+        budget_mb * resume_ratio.
+        :param max_pause: the most seconds dispatching is paused at once. The
+        RSS of a process rarely shrinks much once it grew, so the job carries on
+        after max_pause, rather than stall.
+        :param history: the number of snapshots kept.
+        """
+        self.budget_kb = budget_mb * 1024 if budget_mb else None
+        self.interval = interval
+        self.report_path = report
+        self.trace = trace
+        self.top = top
+        self.resume_ratio = resume_ratio
+        self.max_pause = max_pause
+        self.snapshots = deque(maxlen=history)
+        self.peak_rss_kb = 0
+        self.pauses = 0
+        self.paused_seconds = 0.0
+        self._paused_at = None
+        # the dispatchers waiting in wait()
+        self._holding = 0
+        self._resumed = Event()
+        self._resumed.set()
+        self._baseline = None
+        self._baseline_refs = {}
+        self._started_tracing = False
+
+    def __repr__(self):
+        return (f'<MemoryWatchdog(budget_kb={self.budget_kb}, '
+                f'peak_rss_kb={self.peak_rss_kb}, pauses={self.pauses})>')
+
+    @property
+    def paused(self) -> bool:
+        return not self._resumed.is_set()
+
+    @property
+    def holding(self) -> bool:
+        """
+        True while the pause holds back a dispatcher, so the workers should
+        wait for their next task, rather than take the job for done.
+        """
+        return self._holding > 0
+
+    def wait(self, timeout: float=None) -> bool:
+        """
+        Wait while dispatching is paused. Called by the manager before each
+        task it dispatches.
+
+        :return: True unless `timeout` expired while still paused.
+        """
+        if self._resumed.is_set():
+            return True
+        self._holding += 1
+        try:
+            return self._resumed.wait(timeout)
+        finally:
+            self._holding -= 1
+
+    def _top_allocations(self, snapshot) -> list:
+        return [{'where': str(stat.traceback[0]), 'size_kb': stat.size // 1024,
+                 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:self.top]]
+
+    def snapshot(self) -> dict:
+        """
+        Take a snapshot of the RSS and the tracked live instances, and pause or
+        resume dispatching by the budget.
+        """
+        rss = rss_kb()
+        self.peak_rss_kb = max(self.peak_rss_kb, rss or 0)
+        snap = {'time': time.time(), 'rss_kb': rss,
+                'live_refs': {name: count for name, (count, _)
+                              in count_live_refs().items()}}
+        self.snapshots.append(snap)
+        self._enforce_budget(rss)
+        return snap
+
+    def _enforce_budget(self, rss):
+        if self.budget_kb is None or rss is None:
+            return
+        now = time.monotonic()
+        if not self.paused:
+            if rss > self.budget_kb:
+                self._pause(rss, now)
+            return
+        waited = now - self._paused_at
+        if rss < self.budget_kb * self.resume_ratio:
+            self._resume(now)
+            logger.info(f'RSS {rss // 1024} MiB is back under budget, resumed '
+                        f'dispatching after {waited:.1f}s.')
+        elif waited >= self.max_pause:
+            self._resume(now)
+            logger.warning(f'RSS {rss // 1024} MiB is still over the budget of '
+                           f'{self.budget_kb // 1024:.0f} MiB after '
+                           f'{waited:.1f}s, resumed dispatching.')
+
+    def _pause(self, rss, now):
+        self.pauses += 1
+        self._paused_at = now
+        self._resumed.clear()
+        logger.warning(f'RSS {rss // 1024} MiB is over the budget of '
+                       f'{self.budget_kb // 1024:.0f} MiB, paused dispatching.')
+        gc.collect()
+
+    def _resume(self, now):
+        self.paused_seconds += now - self._paused_at
+        self._paused_at = None
+        self._resumed.set()
+
+    def run(self):
+        """
+        Take a snapshot every `interval` seconds, until killed.
+        """
+        while True:
+            gevent.sleep(self.interval)
+            self.snapshot()
+
+    def start(self) -> list:
+        """
+        Start tracing allocations and take the baseline snapshot.
+
+        :returns a list of greenlets to kill when the job is done.
+        """
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        gc.collect()
+        self._baseline_refs = count_live_refs()
+        if self.trace:
+            self._baseline = tracemalloc.take_snapshot()
+        self.snapshot()
+        return [gevent.spawn(self.run)]
+
+    def leak_report(self, job_id=None) -> dict:
+        """
+        Return the growth since start() of the tracked live instances and of
+        the traced allocations, and the top allocators, after a garbage
+        collection.
+        """
+        gc.collect()
+        last = self.snapshot()
+        grown = {}
+        for name, (count, oldest) in count_live_refs().items():
+            before = self._baseline_refs.get(name, (0, 0.0))[0]
+            if count > before:
+                grown[name] = {'live': count, 'grown': count - before,
+                               'oldest_seconds': round(oldest, 1)}
+        report = {'job_id': job_id, 'time': last['time'],
+                  'rss_kb': last['rss_kb'], 'peak_rss_kb': self.peak_rss_kb,
+                  'budget_kb': self.budget_kb, 'pauses': self.pauses,
+                  'paused_seconds': round(self.paused_seconds, 3),
+                  'live_refs': grown, 'allocations': [], 'top_allocations': [],
+                  'snapshots': list(self.snapshots)}
+        if self._baseline is not None and tracemalloc.is_tracing():
+            current = tracemalloc.take_snapshot()
+            report['top_allocations'] = self._top_allocations(current)
+            stats = current.compare_to(self._baseline, 'lineno')
+            report['allocations'] = [
+                {'where': str(stat.traceback[0]),
+                 'size_kb': stat.size // 1024,
+                 'grown_kb': stat.size_diff // 1024,
+                 'grown_count': stat.count_diff}
+                for stat in stats[:self.top] if stat.size_diff > 0]
+        return report
+
+    def stop(self, job_id=None) -> dict:
+        """
+        Resume dispatching, write and log the leak report, and stop tracing
+        allocations if start() started it.
+
+        :return: the leak report.
+        """
+        report = self.leak_report(job_id)
+        if self.paused:
+            self._resume(time.monotonic())
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        self._baseline = None
+        for name, row in report['live_refs'].items():
+            logger.info(f'{row["grown"]} more live {name} at the end of job '
+                        f'{job_id}, {row["live"]} in all, the oldest from '
+                        f'{row["oldest_seconds"]}s ago.')
+        for row in report['allocations'][:3]:
+            logger.info(f'Allocations grew {row["grown_kb"]} KiB at {row["where"]}.')
+        if self.report_path:
+            with open(self.report_path, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+        return report
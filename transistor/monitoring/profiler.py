@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.monitoring.profiler
+~~~~~~~~~~~~
+This module implements GreenletProfiler, an opt-in profiling mode for gevent
+workloads, where all of the workers share one hub: a CPU-heavy call, like a bs4
+parse, a json.loads of a large HAR or an exporter encoding a big item, stalls
+every other worker.
+
+It does two things, both from native threads so they keep running while the hub
+is blocked:
+
+    - enables gevent's monitor thread, which reports each time a greenlet runs
+      longer than `max_blocking_time` without yielding to the hub, and charges
+      the blocked time to the stack which was running, so the code path
+      responsible is known.
+    - samples the stack of the running greenlet every `interval` seconds, into
+      a collapsed-stack file for flame graphs (flamegraph.pl, speedscope).
+
+Pass it to the manager, which starts it in main() and stops it at the end:
+
+    >>> profiler = GreenletProfiler('profile.folded', interval=0.01)
+    >>> manager = BaseWorkGroupManager('job', tasks, groups, profiler=profiler)
+
+The sampler only reads the frames of the hub's thread, so the overhead at the
+default 100 samples per second is small enough for production.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sys
+import warnings
+import gevent
+from collections import Counter
+from gevent import config
+from gevent.events import EventLoopBlocked, subscribers
+from gevent.monkey import get_original
+from transistor.utility.logging import logger
+
+__all__ = ['GreenletProfiler', 'collapse_stack']
+
+# the real thread functions, even if threading is monkey patched
+start_new_thread = get_original('_thread', 'start_new_thread')
+real_sleep = get_original('time', 'sleep')
+
+
+def collapse_stack(frame, limit: int=64) -> str:
+    """
+    Return the stack of `frame` in the collapsed format, from the outermost
+    call to `frame`, like 'module.function;module.function'.
+    """
+    names = []
+    while frame is not None and len(names) < limit:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}.{code.co_name}")
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def _is_idle(frame) -> bool:
+    """
+    True if the hub is waiting for events, not running a greenlet.
+    """
+    return (frame is not None and frame.f_code.co_name == 'run' and
+            frame.f_globals.get('__name__') == 'gevent.hub')
+
+
+class GreenletProfiler:
+    """
+    Report hub blocking by code path, and sample greenlet stacks for flame graphs.
+    """
+
+    def __init__(self, path: str=None, interval: float=0.01,
+                 max_blocking_time: float=0.1, include_idle: bool=False):
+        """
+        :param path: the collapsed-stack file written by stop(), if any.
+        :param interval: seconds between two stack samples, or None to only
+        report blocking.
+        :param max_blocking_time: seconds a greenlet may run without yielding
+        before it is reported as blocking the hub.
+        :param include_idle: also count the samples where the hub is idle.
+        """
+        self.path = path
+        self.interval = interval
+        self.max_blocking_time = max_blocking_time
+        self.include_idle = include_idle
+        self.samples = Counter()
+        self.blocked = Counter()
+        self.blocks = 0
+        self._hub = None
+        self._thread_ident = None
+        self._running = False
+        self._started_monitor = False
+
+    def __repr__(self):
+        return (f'<GreenletProfiler(samples={sum(self.samples.values())}, '
+                f'blocks={self.blocks})>')
+
+    def _hub_frame(self):
+        return sys._current_frames().get(self._thread_ident)
+
+    def on_event(self, event):
+        """
+        gevent event subscriber, called from the monitor thread when a greenlet
+        blocks the hub. Charge the blocked time to the running stack.
+        """
+        if not isinstance(event, EventLoopBlocked):
+            return
+        frame = self._hub_frame()
+        stack = collapse_stack(frame) if frame is not None else repr(event.greenlet)
+        self.blocked[stack] += event.blocking_time
+        self.blocks += 1
+        logger.warning(f'{event.greenlet} blocked the gevent hub for over '
+                       f'{event.blocking_time}s in {stack.rsplit(";", 3)[-3:]}')
+
+    def _sample(self):
+        while self._running:
+            real_sleep(self.interval)
+            frame = self._hub_frame()
+            if frame is None or (_is_idle(frame) and not self.include_idle):
+                continue
+            self.samples[collapse_stack(frame)] += 1
+
+    def start(self):
+        """
+        Start the gevent monitor thread and the stack sampler for the hub of the
+        calling thread.
+        """
+        if self._running:
+            return
+        self._hub = gevent.get_hub()
+        self._thread_ident = self._hub.thread_ident
+        self._running = True
+        config.max_blocking_time = self.max_blocking_time
+        if self._hub.periodic_monitoring_thread is None:
+            config.monitor_thread = True
+            with warnings.catch_warnings():
+                # the memory monitor wants psutil, which is not needed here
+                warnings.simplefilter('ignore')
+                self._hub.start_periodic_monitoring_thread()
+            self._started_monitor = True
+        subscribers.append(self.on_event)
+        if self.interval:
+            start_new_thread(self._sample, ())
+
+    def stop(self):
+        """
+        Stop sampling and the monitor thread, log the code paths which blocked
+        the hub the longest, and write the collapsed-stack file.
+        """
+        if not self._running:
+            return
+        self._running = False
+        if self.on_event in subscribers:
+            subscribers.remove(self.on_event)
+        if self._started_monitor and self._hub.periodic_monitoring_thread is not None:
+            self._hub.periodic_monitoring_thread.kill()
+            self._hub.periodic_monitoring_thread = None
+            config.monitor_thread = False
+            self._started_monitor = False
+        for stack, seconds in self.top_blocking():
+            logger.info(f'Blocked the hub for {seconds:.3f}s: {stack}')
+        if self.path:
+            self.write()
+
+    def top_blocking(self, n: int=10) -> list:
+        """
+        Return the `n` stacks which blocked the hub the longest, with the seconds.
+        """
+        return self.blocked.most_common(n)
+
+    def write(self, path: str=None):
+        """
+        Write the samples in the collapsed-stack format, one 'stack count' per
+        line. The blocking reports are added under a 'hub-blocked' root frame,
+        in milliseconds, so both show in one flame graph.
+        """
+        with open(path or self.path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f'{stack} {count}\n')
+            for stack, seconds in sorted(self.blocked.items()):
+                f.write(f'hub-blocked;{stack} {int(seconds * 1000)}\n')
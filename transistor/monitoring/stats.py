@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.monitoring.stats
+~~~~~~~~~~~~
+This module implements StatsCollector, which collects counters and latency
+histograms from the BaseWorkGroupManager, its workers and their SplashBrowsers,
+by tracker name, and reports them in the Prometheus text format from a gevent
+WSGI server, and as a JSON snapshot file written periodically.
+
+    >>> stats = StatsCollector(port=9100, snapshot='stats.json')
+    >>> manager = BaseWorkGroupManager('job', tasks, groups, stats=stats)
+    >>> manager.main()
+
+Counters:
+    - tasks_dispatched: tasks the manager handed to a worker.
+    - tasks_completed, tasks_failed: tasks a worker finished or which raised.
+    - requests: requests sent to Splash.
+    - requests_retried: requests sent again after a 503 or 504.
+    - bytes_received: bytes of Splash responses.
+
+Histograms, in seconds:
+    - queue_wait: from the manager dispatching a task until a worker takes it.
+    - render: the Splash request.
+    - parse: parsing a Splash response into soup.
+    - export: loading the items and running the exporters.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import os
+import json
+import time
+import tempfile
+import gevent
+from bisect import bisect_left
+from contextlib import contextmanager
+from gevent.pywsgi import WSGIServer
+from transistor.utility.logging import logger
+
+__all__ = ['Histogram', 'StatsCollector']
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+class Histogram:
+    """
+    Counts of observed values by upper bound, like a Prometheus histogram.
+    """
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # the last count is for the values above the largest bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self):
+        """
+        Yield (upper bound, count of values <= upper bound), ending with '+Inf'.
+        """
+        total = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            total += count
+            yield bound, total
+
+    def to_dict(self) -> dict:
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': {str(bound): count for bound, count in self.cumulative()}}
+
+
+class StatsCollector:
+    """
+    Collect counters and histograms by name and tracker.
+    """
+
+    def __init__(self, port: int=None, host: str='0.0.0.0', snapshot: str=None,
+                 interval: float=10.0, prefix: str='transistor',
+                 buckets=DEFAULT_BUCKETS):
+        """
+        :param port: if set, start() serves the metrics on http://host:port/metrics
+        :param host: the address to serve the metrics on.
+        :param snapshot: if set, start() writes a JSON snapshot to this file
+        every `interval` seconds, and stop() writes the last one.
+        :param interval: seconds between two snapshots.
+        :param prefix: the prefix of the Prometheus metric names.
+        :param buckets: the histogram upper bounds, in seconds.
+        """
+        self.port = port
+        self.host = host
+        self.snapshot_path = snapshot
+        self.interval = interval
+        self.prefix = prefix
+        self.buckets = buckets
+        self.counters = {}
+        self.histograms = {}
+        self.started = time.time()
+        self._server = None
+
+    def __repr__(self):
+        return (f'<StatsCollector(counters={len(self.counters)}, '
+                f'histograms={len(self.histograms)})>')
+
+    def inc(self, name: str, tracker: str=None, value: float=1):
+        """
+        Add `value` to the counter `name` of `tracker`.
+        """
+        key = (name, tracker)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, tracker: str=None):
+        """
+        Record `seconds` in the histogram `name` of `tracker`.
+        """
+        key = (name, tracker)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, tracker: str=None):
+        """
+        Record the time spent in the with block in the histogram `name`.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - start, tracker)
+
+    def get(self, name: str, tracker: str=None) -> float:
+        """
+        Return the value of a counter, 0 if it was never incremented.
+        """
+        return self.counters.get((name, tracker), 0)
+
+    def snapshot(self) -> dict:
+        """
+        Return the counters and histograms as a dict, like
+        {'counters': {'tasks_completed': {'books.toscrape.com': 10}}, ...}.
+        Values without a tracker are under the key ''.
+        """
+        counters, histograms = {}, {}
+        for (name, tracker), value in self.counters.items():
+            counters.setdefault(name, {})[tracker or ''] = value
+        for (name, tracker), histogram in self.histograms.items():
+            histograms.setdefault(name, {})[tracker or ''] = histogram.to_dict()
+        return {'time': time.time(), 'uptime': time.time() - self.started,
+                'counters': counters, 'histograms': histograms}
+
+    def write_snapshot(self, path: str=None):
+        """
+        Write the snapshot as JSON to a temporary file and rename it, so a reader
+        never sees a partly written file.
+        """
+        path = path or self.snapshot_path
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(prefix='.stats', dir=directory)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _labels(tracker, **extra) -> str:
+        labels = {'tracker': tracker} if tracker else {}
+        labels.update(extra)
+        if not labels:
+            return ''
+        pairs = ','.join(f'{key}="{value}"' for key, value in labels.items())
+        return '{' + pairs + '}'
+
+    def prometheus(self) -> str:
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            metric = f'{self.prefix}_{name}_total'
+            lines.append(f'# TYPE {metric} counter')
+            for (other, tracker), value in sorted(self.counters.items(),
+                                                  key=lambda kv: str(kv[0])):
+                if other == name:
+                    lines.append(f'{metric}{self._labels(tracker)} {value}')
+        for name in sorted({name for name, _ in self.histograms}):
+            metric = f'{self.prefix}_{name}_seconds'
+            lines.append(f'# TYPE {metric} histogram')
+            for (other, tracker), histogram in sorted(self.histograms.items(),
+                                                      key=lambda kv: str(kv[0])):
+                if other != name:
+                    continue
+                for bound, count in histogram.cumulative():
+                    labels = self._labels(tracker, le=bound)
+                    lines.append(f'{metric}_bucket{labels} {count}')
+                lines.append(f'{metric}_sum{self._labels(tracker)} {histogram.sum}')
+                lines.append(f'{metric}_count{self._labels(tracker)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def wsgi_app(self, environ, start_response):
+        """
+        Serve the Prometheus text format on /metrics and the JSON snapshot on
+        /stats.json.
+        """
+        path = environ.get('PATH_INFO', '/')
+        if path == '/metrics':
+            body = self.prometheus().encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        elif path == '/stats.json':
+            body = json.dumps(self.snapshot()).encode('utf-8')
+            content_type = 'application/json'
+        else:
+            start_response('404 Not Found', [('Content-Type', 'text/plain')])
+            return [b'Not Found']
+        start_response('200 OK', [('Content-Type', content_type),
+                                  ('Content-Length', str(len(body)))])
+        return [body]
+
+    def run(self):
+        """
+        Write a snapshot every `interval` seconds, until killed.
+        """
+        while True:
+            gevent.sleep(self.interval)
+            try:
+                self.write_snapshot()
+            except OSError as exc:
+                logger.error(f'Could not write the stats snapshot: {exc}')
+
+    def start(self) -> list:
+        """
+        Start serving the metrics if `port` is set.
+
+        :returns a list of greenlets to kill when the job is done, with the
+        snapshot writer if `snapshot` is set.
+        """
+        if self.port is not None and self._server is None:
+            self._server = WSGIServer((self.host, self.port), self.wsgi_app, log=None)
+            self._server.start()
+            logger.info(f'Serving metrics on http://{self.host}:'
+                        f'{self._server.server_port}/metrics')
+        if self.snapshot_path:
+            return [gevent.spawn(self.run)]
+        return []
+
+    def stop(self):
+        """
+        Stop serving the metrics and write the last snapshot.
+        """
+        if self._server is not None:
+            self._server.stop()
+            self._server = None
+        if self.snapshot_path:
+            self.write_snapshot()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.monitoring.tracing
+~~~~~~~~~~~~
+This module implements Tracer and Trace, a lightweight per-task span tracing,
+to see where the time of a slow job goes, from dispatch to export.
+
+A sampled task carries a Trace with monotonic timestamps for each phase:
+
+    - dispatch: the manager getting the task and handing it to a worker.
+    - queue: waiting in the worker's task queue.
+    - spider: getting a spider for the task, new or reset from the pool.
+    - scrape: the spider's start_http_session(), which includes:
+    - render: each Splash request.
+    - retry: the retries of _response_callback(), with their waits.
+    - parse: parsing each Splash response into soup.
+    - load: ItemLoader.write().
+    - export: the exporters.
+
+Finished traces are written to a JSON lines file. Pass a Tracer to the manager:
+
+    >>> tracer = Tracer('trace.jsonl', sample_rate=0.1)
+    >>> manager = BaseWorkGroupManager('job', tasks, groups, tracer=tracer)
+
+Then print the p50/p95/p99 per phase with:
+
+    python -m transistor.monitoring.tracing trace.jsonl
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sys
+import json
+import math
+import time
+import random
+from contextlib import contextmanager
+
+__all__ = ['span', 'Trace', 'Tracer', 'percentile', 'summarize']
+
+
+class Trace:
+    """
+    The spans of one task, as (phase, start, end) with time.monotonic() values.
+    """
+
+    __slots__ = ('task', 'tracker', 'start', 'spans')
+
+    def __init__(self, task, tracker: str=None, start: float=None):
+        self.task = str(task)
+        self.tracker = tracker
+        self.start = time.monotonic() if start is None else start
+        self.spans = []
+
+    def __repr__(self):
+        return f'<Trace(task={self.task!r}, spans={len(self.spans)})>'
+
+    def add(self, phase: str, start: float, end: float=None):
+        """
+        Add a span which started at `start` and ends at `end`, or now.
+        """
+        self.spans.append((phase, start, time.monotonic() if end is None else end))
+
+    @contextmanager
+    def span(self, phase: str):
+        """
+        Add a span for the time spent in the with block.
+        """
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(phase, start)
+
+    def to_dict(self, failed: bool=False) -> dict:
+        """
+        Return the trace as a dict with the total seconds of each phase, and the
+        spans as [phase, offset from the start, duration].
+        """
+        phases = {}
+        for phase, start, end in self.spans:
+            phases[phase] = phases.get(phase, 0.0) + end - start
+        return {'task': self.task, 'tracker': self.tracker, 'failed': failed,
+                'total': time.monotonic() - self.start, 'phases': phases,
+                'spans': [[phase, round(start - self.start, 6), round(end - start, 6)]
+                          for phase, start, end in self.spans]}
+
+
+class _NoSpan:
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(trace, phase: str):
+    """
+    Return trace.span(phase), or a context manager which does nothing if the
+    task is not traced, i.e. `trace` is None.
+    """
+    if trace is None:
+        return _NO_SPAN
+    return trace.span(phase)
+
+
+class Tracer:
+    """
+    Start a Trace for a sample of the tasks, and write the finished traces to a
+    JSON lines file.
+    """
+
+    def __init__(self, path: str, sample_rate: float=1.0):
+        """
+        :param path: the JSON lines file the traces are appended to.
+        :param sample_rate: the fraction of tasks which are traced, 0.0 to 1.0.
+        """
+        self.path = path
+        self.sample_rate = sample_rate
+        self.written = 0
+        self._file = None
+
+    def __repr__(self):
+        return f'<Tracer(path={self.path!r}, sample_rate={self.sample_rate})>'
+
+    def start(self, task, tracker: str=None, start: float=None):
+        """
+        Return a new Trace for the task, or None if the task is not sampled.
+        """
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        return Trace(task, tracker, start)
+
+    def finish(self, trace: Trace, failed: bool=False):
+        """
+        Write the trace to the trace file.
+        """
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(trace.to_dict(failed)) + '\n')
+        self._file.flush()
+        self.written += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def percentile(values: list, q: float) -> float:
+    """
+    Return the q-th percentile of sorted `values`, by the nearest rank.
+    """
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100.0 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def summarize(path: str) -> dict:
+    """
+    Read a trace file and return {phase: {'count', 'p50', 'p95', 'p99'}}, with
+    the seconds per task, including the 'total' of each task.
+    """
+    durations = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            trace = json.loads(line)
+            durations.setdefault('total', []).append(trace['total'])
+            for phase, seconds in trace['phases'].items():
+                durations.setdefault(phase, []).append(seconds)
+    summary = {}
+    for phase, values in durations.items():
+        values.sort()
+        summary[phase] = {'count': len(values),
+                          'p50': percentile(values, 50),
+                          'p95': percentile(values, 95),
+                          'p99': percentile(values, 99)}
+    return summary
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print('usage: python -m transistor.monitoring.tracing <trace.jsonl>')
+        return 2
+    summary = summarize(argv[0])
+    print(f'{"phase":<10} {"count":>7} {"p50":>10} {"p95":>10} {"p99":>10}')
+    for phase, row in sorted(summary.items(), key=lambda kv: -kv[1]['p50']):
+        print(f'{phase:<10} {row["count"]:>7} {row["p50"]:>10.4f} '
+              f'{row["p95"]:>10.4f} {row["p99"]:>10.4f}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -10,12 +10,22 @@ database, spreadsheet export, write to file.
 ~~~~~~~~~~~~
 """
 
-from .exporters import (PprintItemExporter, PickleItemExporter, PythonItemExporter,
-                        CsvItemExporter, MarshalItemExporter, BaseItemExporter)
-from .containers import SplashScraperItems
-from .item import Item, Field
-from .newt_db.newt_crud import get_job_results, delete_job
+from transistor.utility.lazy import lazy_exports
 
 __all__ = ['delete_job', 'Field', 'get_job_results', 'Item', 'PprintItemExporter',
            'PickleItemExporter', 'PythonItemExporter', 'CsvItemExporter',
            'MarshalItemExporter', 'BaseItemExporter', 'SplashScraperItems']
+
+lazy_exports(globals(), {
+    'PprintItemExporter': '.exporters.exporters',
+    'PickleItemExporter': '.exporters.exporters',
+    'PythonItemExporter': '.exporters.exporters',
+    'CsvItemExporter': '.exporters.exporters',
+    'MarshalItemExporter': '.exporters.exporters',
+    'BaseItemExporter': '.exporters.base',
+    'SplashScraperItems': '.containers',
+    'Item': '.item',
+    'Field': '.item',
+    'get_job_results': '.newt_db.newt_crud',
+    'delete_job': '.newt_db.newt_crud',
+})
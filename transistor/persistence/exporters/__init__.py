@@ -5,7 +5,8 @@ transistor.persistence.exporters
 This module implements classes that extract (serialize) the data inside
 a BaseWorker from a SplashScraper for persistence in newt.db,
 export to JSON, CSV, XML, Pickle, or customized export accomplished by
-subclassing BaseItemExporter and overriding it as needed.
+subclassing BaseItemExporter and overriding it as needed. The
+XlsxMatrixItemExporter writes a keyword x tracker result matrix to excel.
 
 Most of this module is heavily inspired or else copied from Scrapy. It has
 been modified to fit Transistor's API in requiring a scraper and items
@@ -22,13 +23,24 @@ License, see LICENSE for more details.
 ~~~~~~~~~~~~
 """
 
-from .base import BaseItemExporter
-from .json import JsonItemExporter, JsonLinesItemExporter
-from .xml import XmlItemExporter
-from .exporters import (CsvItemExporter, MarshalItemExporter, PickleItemExporter,
-                        PprintItemExporter, PythonItemExporter)
+from transistor.utility.lazy import lazy_exports
 
 
 __all__ = ['BaseItemExporter', 'CsvItemExporter', 'JsonItemExporter',
            'JsonLinesItemExporter', 'PickleItemExporter', 'PprintItemExporter',
-            'MarshalItemExporter', 'PythonItemExporter', 'XmlItemExporter']
\ No newline at end of file
+            'MarshalItemExporter', 'PythonItemExporter', 'XmlItemExporter',
+           'XlsxMatrixItemExporter']
+
+# imported on first use, the XlsxMatrixItemExporter needs openpyxl
+lazy_exports(globals(), {
+    'BaseItemExporter': '.base',
+    'JsonItemExporter': '.json',
+    'JsonLinesItemExporter': '.json',
+    'XmlItemExporter': '.xml',
+    'XlsxMatrixItemExporter': '.xlsx',
+    'CsvItemExporter': '.exporters',
+    'MarshalItemExporter': '.exporters',
+    'PickleItemExporter': '.exporters',
+    'PprintItemExporter': '.exporters',
+    'PythonItemExporter': '.exporters',
+})
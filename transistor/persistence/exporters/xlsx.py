@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.persistence.exporters.xlsx
+~~~~~~~~~~~~
+This module implements an exporter which writes scrape results into an excel
+workbook as a keyword x tracker matrix, one row per keyword search term and a
+group of columns for each tracker (website), like below:
+
+    item      | mousekey.com price | mousekey.com stock | mousekey.com status | ...
+    TPA2012D2 | 1.05               | 2,000              | 200                 | ...
+
+The workbook is written with openpyxl in write-only mode. A row is held in memory
+only until every tracker has reported a result for its keyword, then it is
+streamed out, so memory use does not grow with the number of rows.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import datetime
+from collections import OrderedDict
+from pathlib import Path
+from typing import List
+from openpyxl import Workbook
+from .base import BaseItemExporter
+
+__all__ = ['XlsxMatrixItemExporter']
+
+
+class XlsxMatrixItemExporter(BaseItemExporter):
+    """
+    Exports Items from several trackers into one keyword x tracker result
+    matrix in an xlsx workbook.
+
+    >>> exporter = XlsxMatrixItemExporter.from_book(
+    >>>     book, keyword_field='book_title', fields=['price', 'stock'])
+
+    Call finish_exporting() after the job is done to write the remaining rows
+    and save the workbook.
+    """
+
+    _cell_types = (str, int, float, bool, datetime.datetime, datetime.date,
+                   datetime.time, type(None))
+
+    def __init__(self, file, trackers: List[str], keyword_field: str='keyword',
+                 tracker_field: str='name', fields=('price', 'stock', 'status'),
+                 keyword_heading: str=None, sheet_title: str='results',
+                 **kwargs):
+        """
+        :param file: a file path, or a file-like object opened in binary mode,
+        where the workbook is saved by finish_exporting().
+        :param trackers: the tracker names, which become the column groups. A
+        row is written as soon as all of these trackers reported its keyword.
+        :param keyword_field: the Item field holding the keyword search term.
+        :param tracker_field: the Item field holding the tracker name. Default is
+        'name', which the BaseWorker sets to the WorkGroup name.
+        :param fields: the Item fields exported for each tracker.
+        :param keyword_heading: the heading of the keyword column. Defaults to
+        `keyword_field`.
+        :param sheet_title: the title of the worksheet.
+        """
+        super().__init__()
+        self._configure(kwargs, dont_fail=True)
+        self.file = file
+        self.trackers = list(trackers)
+        self.keyword_field = keyword_field
+        self.tracker_field = tracker_field
+        self.fields = list(fields)
+        self.keyword_heading = keyword_heading or keyword_field
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(title=sheet_title)
+        self._pending = OrderedDict()
+        self._headers_not_written = True
+
+    @classmethod
+    def from_book(cls, book, file=None, **kwargs):
+        """
+        Create an exporter for the trackers and keyword column of a StatefulBook.
+
+        openpyxl can not stream rows into an existing workbook, so by default the
+        results are saved next to the source workbook, for example
+        `book_titles.xlsx` gets `book_titles_results.xlsx`.
+
+        :param book: a StatefulBook instance.
+        :param file: where to save the results workbook.
+        """
+        if file is None:
+            source = Path(book.SOURCE)
+            file = str(source.with_name(f'{source.stem}_results.xlsx'))
+        kwargs.setdefault('keyword_heading', book.keywords)
+        return cls(file, book.trackers, **kwargs)
+
+    def start_exporting(self):
+        self._write_headers()
+
+    def export_item(self, item):
+        """
+        Add the item to the row of its keyword and write the row out once all
+        the trackers have reported.
+        """
+        self._write_headers()
+        keyword = item.get(self.keyword_field)
+        tracker = item.get(self.tracker_field)
+        row = self._pending.setdefault(keyword, {})
+        row[tracker] = [self._cell(item, field) for field in self.fields]
+        if all(name in row for name in self.trackers):
+            self._write_row(keyword, self._pending.pop(keyword))
+
+    def finish_exporting(self):
+        """
+        Write the rows still missing some tracker results and save the workbook.
+        """
+        self._write_headers()
+        while self._pending:
+            self._write_row(*self._pending.popitem(last=False))
+        self.workbook.save(self.file)
+
+    def _write_headers(self):
+        if self._headers_not_written:
+            self._headers_not_written = False
+            self.sheet.append([self.keyword_heading] + [
+                f'{tracker} {field}' for tracker in self.trackers
+                for field in self.fields])
+
+    def _write_row(self, keyword, row):
+        cells = [keyword]
+        empty = [None] * len(self.fields)
+        for tracker in self.trackers:
+            cells.extend(row.get(tracker, empty))
+        self.sheet.append(cells)
+
+    def _cell(self, item, name):
+        """
+        Return the serialized field as a value an excel cell can hold.
+        """
+        if name not in item:
+            return None
+        field = {} if isinstance(item, dict) else item.fields.get(name, {})
+        value = self.serialize_field(field, name, item[name])
+        if isinstance(value, bytes):
+            value = value.decode(self.encoding or 'utf-8', errors='replace')
+        if not isinstance(value, self._cell_types):
+            value = str(value)
+        return value
@@ -18,9 +18,19 @@ class ItemLoader:
         already finished a scrape/crawl job.
     :attr items: a class in which the attributes to be persisted
     from the spider will be written.
+    :attr data: one record yielded by the spider's yield_items() generator, like
+    a dict for one product of a listing page, or None for a spider which gives a
+    single item. Each record gets its own loader, so write() can read both
+    self.data and the spider:
+
+    >>> def write(self):
+    >>>     self.items['title'] = self.data['title']
+    >>>     self.items['page'] = self.spider.browser.get_current_url()
+    >>>     return self.items
     """
     spider = None
     items = None
+    data = None
 
 
     _write_attrs = [
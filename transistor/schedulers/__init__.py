@@ -12,4 +12,19 @@ to be later assigned in the course of gevent based asynchronous I/O execution.
 """
 
 
-from .books.bookstate import StatefulBook
\ No newline at end of file
+from transistor.utility.lazy import lazy_exports
+
+__all__ = ['CsvTaskSource', 'IterTaskSource', 'JsonLinesTaskSource',
+           'PriorityTaskQueue', 'SqlTaskSource', 'StatefulBook',
+           'StdinTaskSource', 'TaskSource']
+
+lazy_exports(globals(), {
+    'StatefulBook': '.books.bookstate',
+    'TaskSource': '.sources.tasksource',
+    'CsvTaskSource': '.sources.tasksource',
+    'JsonLinesTaskSource': '.sources.tasksource',
+    'StdinTaskSource': '.sources.tasksource',
+    'IterTaskSource': '.sources.tasksource',
+    'SqlTaskSource': '.sources.tasksource',
+    'PriorityTaskQueue': '.priority',
+})
@@ -10,7 +10,7 @@ Finally, it creates work queues full of tasks, with each task being a search ter
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
 """
-import pyexcel as pe
+# pyexcel is imported when a book is opened, it is slow to import
 from collections import deque
 from pathlib import Path
 from os.path import dirname as d
@@ -57,13 +57,24 @@ class _BookState:
         self.failed = failed
 
 
+def _to_priority(value) -> int:
+    """
+    Return a priority cell as an int, 0 for an empty or invalid cell.
+    """
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return 0
+
+
 class StatefulBook:
     """
     Read an excel sheet to ingest the items.
 
     Then track the item states as the scrape progresses.
 
-    Finally, prepare the the data for export to an excel workbook.
+    Finally, prepare the the data for export to an excel workbook, with
+    results_exporter().
 
     When you fire this up in repl:
         from transistor.ingest import StatefulBook
@@ -77,7 +88,7 @@ class StatefulBook:
     """
 
     __attrs__ = [
-        'file_name', 'keywords', 'source', 'trackers'
+        'file_name', 'keywords', 'priority', 'source', 'trackers'
     ]
 
     def __init__(self, file_name: str=None, trackers: list=None, autorun=True,  **kwargs):
@@ -89,12 +100,18 @@ class StatefulBook:
         :param keywords: the spreadsheet column heading name from which to load
          the tasks.  It should be set like 'keywords'='<column heading>', for example
          'keywords'='part_numbers'.  Default is 'item'.
+        :param priority: the spreadsheet column heading name from which to load
+         the priority of each task, higher is dispatched first. Default is None,
+         for no priority column, where every task has priority 0.
         """
         self.file_name = file_name
         self.__state = _BookState()
         self.SOURCE = get_file_path(self.file_name)
         self.trackers = trackers
         self.keywords = kwargs.get('keywords', 'item')
+        self.priority = kwargs.get('priority', None)
+        # {keyword: priority} from the priority column
+        self.priorities = {}
         if autorun:
             self.open_book()
 
@@ -103,6 +120,7 @@ class StatefulBook:
         Read the sheet.
         :return:
         """
+        import pyexcel as pe
         records = self._get_records()
         sheet = self._get_sheet(records)
         to_do, in_proc, done, failed = self._build_queues(records)
@@ -121,6 +139,7 @@ class StatefulBook:
 
         :return:
         """
+        import pyexcel as pe
         records = pe.get_records(file_name=self.SOURCE)
         return records
 
@@ -141,6 +160,7 @@ class StatefulBook:
             items.append(str(pn))
         item_col['items'] = items
 
+        import pyexcel as pe
         return pe.get_sheet(adict=item_col)
 
     def _build_queues(self, records):
@@ -161,7 +181,10 @@ class StatefulBook:
         tracker_list = []
 
         for record in records:
-            init_to_do.append(str(record[self.keywords]))
+            keyword = str(record[self.keywords])
+            init_to_do.append(keyword)
+            if self.priority is not None:
+                self.priorities[keyword] = _to_priority(record.get(self.priority))
 
         for name in self.trackers:
             tracker_list.append(TaskTracker(name=name, to_do=init_to_do))
@@ -177,6 +200,25 @@ class StatefulBook:
 
         return todo_tasks, inproc_tasks, done_tasks, failed_tasks
 
+    def results_exporter(self, file=None, **kwargs):
+        """
+        Return an XlsxMatrixItemExporter which writes the scrape results as a
+        keyword x tracker matrix, with one column group per tracker in this book.
+
+        :param file: where to save the results. Default is the source workbook
+        file name, with a `_results` suffix.
+        :param kwargs: passed to XlsxMatrixItemExporter, for example
+        keyword_field='book_title' and fields=['price', 'stock'].
+        """
+        from transistor.persistence.exporters.xlsx import XlsxMatrixItemExporter
+        return XlsxMatrixItemExporter.from_book(self, file=file, **kwargs)
+
+    def priority_of(self, task) -> int:
+        """
+        Return the priority of a task from the priority column, 0 if none.
+        """
+        return self.priorities.get(str(task), 0)
+
     def to_do(self):
         """
         Return the to_do queue
@@ -14,4 +14,6 @@ https://www.rabbitmq.com/tutorials/tutorial-one-python.html
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
 """
+from .envelope import get_priority, pack, unpack
+from .producer import TaskProducer
 from .queues import ExchangeQueue
\ No newline at end of file
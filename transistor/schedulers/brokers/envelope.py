@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.brokers.envelope
+~~~~~~~~~~~~
+This module implements the task envelope, the message body format used to send
+a batch of keyword tasks through a broker, and registers lz4 as a kombu
+compression method next to the built-in zlib (`compression='zlib'`).
+
+An envelope is a small dict with short keys, so the per-message overhead stays
+low when many keywords are packed into each message:
+
+    {'v': 1, 'k': ['Soumission', 'Black Dust', ...], 'a': {'china': True}, 'p': 10}
+
+where `k` is the list of keywords, `a` the task kwargs and `p` the priority of
+the tasks, if not 0. The original `{'keywords': ..., 'kwargs': ...}` message
+format, where `keywords` may also be a JSON-encoded list, is still accepted by
+unpack(), and its priority is read from a `priority` field by get_priority().
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import json
+import lz4.frame
+from kombu import compression
+
+__all__ = ['ENVELOPE_VERSION', 'LZ4', 'get_priority', 'pack', 'unpack']
+
+ENVELOPE_VERSION = 1
+LZ4 = 'application/x-lz4'
+
+compression.register(lz4.frame.compress, lz4.frame.decompress, LZ4,
+                     aliases=['lz4'])
+
+
+def pack(keywords, kwargs: dict=None, priority: int=0) -> dict:
+    """
+    Return the envelope for a batch of keywords.
+
+    :param keywords: an iterable of keyword search terms.
+    :param kwargs: the kwargs for the tasks, passed to the manager's process_task.
+    :param priority: the priority of the tasks, higher is dispatched first.
+    """
+    envelope = {'v': ENVELOPE_VERSION, 'k': list(keywords)}
+    if kwargs:
+        envelope['a'] = kwargs
+    if priority:
+        envelope['p'] = priority
+    return envelope
+
+
+def unpack(body: dict):
+    """
+    Return a tuple (keywords, kwargs) from a message body, which is either an
+    envelope or the original {'keywords': ..., 'kwargs': ...} format.
+    """
+    if 'v' in body:
+        if body['v'] != ENVELOPE_VERSION:
+            raise ValueError(f'unsupported task envelope version: {body["v"]}')
+        return body['k'], body.get('a', {})
+    keywords = body['keywords']
+    if isinstance(keywords, str):
+        keywords = json.loads(keywords)
+    return keywords, body.get('kwargs', {})
+
+
+def get_priority(body: dict) -> int:
+    """
+    Return the priority of the tasks of a message body, 0 if it has none.
+    """
+    try:
+        return int(body.get('p', body.get('priority', 0)) or 0)
+    except (TypeError, ValueError):
+        return 0
@@ -20,6 +20,11 @@ class ExchangeQueue:
     declare the queues when using this. It would probably look like:
     >>> for queue in tasks.task_queues:
     >>>     queue(broker_connection).declare()
+
+    With the default 'direct' exchange, a task published with
+    routing_key='mousekey.com' is only delivered to the 'mousekey.com' queue
+    and scraped by the 'mousekey.com' WorkGroup. Use exchange_type='fanout' to
+    deliver every task to all of the tracker queues instead.
     """
     def __init__(self, trackers: List[str], exchange_name: str='transistor',
                  exchange_type: str='direct'):
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.leases
+~~~~~~~~~~~~
+This module implements task leases with heartbeats, so several
+BaseWorkGroupManager nodes can safely consume from the same task stream.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+from .base import LeaseBackend, make_node_id
+from .sqlite_backend import SqliteLeaseBackend
+from .redis_backend import RedisLeaseBackend
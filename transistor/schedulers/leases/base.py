@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.leases.base
+~~~~~~~~~~~~
+This module implements LeaseBackend, the abstract base class for the shared
+store which coordinates several BaseWorkGroupManager nodes consuming from the
+same ExchangeQueue.
+
+A node leases each task before scraping it. A lease has an owner (the node id)
+and a deadline. The owner renews the deadline of all its leases with a heartbeat,
+and releases a lease when the task is finished. When a node dies, its heartbeat
+stops, the deadlines pass, and any live node can reclaim the expired leases and
+re-queue their tasks.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import os
+import socket
+import uuid
+from abc import ABC, abstractmethod
+from typing import List, Tuple
+
+
+def make_node_id() -> str:
+    """
+    Return a unique id for this manager node, like 'hostname-1234-3f2a9c'.
+    """
+    return f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+
+
+class LeaseBackend(ABC):
+    """
+    The store of task leases shared by all the manager nodes.
+
+    Each lease is identified by a `key`, which is unique for a task, and stores a
+    `payload` string with everything needed to re-queue the task on another node.
+    Time is wall clock time from time.time(), since it is compared across nodes.
+    """
+
+    @abstractmethod
+    def acquire(self, key: str, owner: str, ttl: float, payload: str='') -> bool:
+        """
+        Lease the task `key` to `owner` for `ttl` seconds. Return False if the
+        task is already leased by another owner whose lease has not expired.
+        An expired lease is taken over.
+        """
+
+    @abstractmethod
+    def renew(self, owner: str, ttl: float) -> int:
+        """
+        Extend every lease held by `owner` to expire `ttl` seconds from now.
+        Return the number of leases renewed.
+        """
+
+    @abstractmethod
+    def release(self, key: str, owner: str) -> bool:
+        """
+        Remove the lease on `key` if it is held by `owner`. Return False if the
+        lease was lost, for example after it expired and another node reclaimed it.
+        """
+
+    @abstractmethod
+    def reclaim(self, owner: str, ttl: float, limit: int=100) -> List[Tuple[str, str]]:
+        """
+        Take over at most `limit` expired leases for `owner`, for `ttl` seconds.
+        Return a list of (key, payload) tuples for the tasks to re-queue.
+        """
+
+    def close(self):
+        """
+        Release any resources held by the backend.
+        """
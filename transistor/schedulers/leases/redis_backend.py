@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.leases.redis_backend
+~~~~~~~~~~~~
+This module implements RedisLeaseBackend, a LeaseBackend stored in Redis, to
+coordinate manager nodes running on different hosts.
+
+It takes a client instance from the `redis` package, which is not a requirement
+of transistor, so install it separately with `pip install redis`.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import time
+from typing import List, Tuple
+from .base import LeaseBackend
+
+# KEYS[1] deadlines zset, KEYS[2] owners hash, KEYS[3] payloads hash
+# ARGV: key, owner, now, deadline, payload
+_ACQUIRE = """
+local deadline = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if deadline and tonumber(deadline) > tonumber(ARGV[3]) and
+        redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[4], ARGV[1])
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[2])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[5])
+return 1
+"""
+
+# ARGV: owner, deadline
+_RENEW = """
+local renewed = 0
+local owners = redis.call('HGETALL', KEYS[2])
+for i = 1, #owners, 2 do
+    if owners[i + 1] == ARGV[1] then
+        redis.call('ZADD', KEYS[1], ARGV[2], owners[i])
+        renewed = renewed + 1
+    end
+end
+return renewed
+"""
+
+# ARGV: key, owner
+_RELEASE = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+    return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+return 1
+"""
+
+# ARGV: owner, now, deadline, limit
+_RECLAIM = """
+local keys = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[2],
+                        'LIMIT', 0, ARGV[4])
+local result = {}
+for _, key in ipairs(keys) do
+    redis.call('ZADD', KEYS[1], ARGV[3], key)
+    redis.call('HSET', KEYS[2], key, ARGV[1])
+    table.insert(result, key)
+    table.insert(result, redis.call('HGET', KEYS[3], key) or '')
+end
+return result
+"""
+
+
+class RedisLeaseBackend(LeaseBackend):
+    """
+    Store the leases in three Redis keys, a sorted set of deadlines and hashes
+    of owners and payloads. Each operation is a Lua script, so it runs atomically.
+
+    >>> from redis import Redis
+    >>> leases = RedisLeaseBackend(Redis('localhost', 6379))
+    >>> manager = BaseWorkGroupManager('job', tasks, groups, leases=leases, ...)
+    """
+
+    def __init__(self, client, prefix: str='transistor:leases'):
+        """
+        :param client: a `redis.Redis` client instance.
+        :param prefix: the prefix of the Redis key names.
+        """
+        self.client = client
+        self.prefix = prefix
+        self.keys = [f'{prefix}:deadlines', f'{prefix}:owners',
+                     f'{prefix}:payloads']
+        self._acquire = client.register_script(_ACQUIRE)
+        self._renew = client.register_script(_RENEW)
+        self._release = client.register_script(_RELEASE)
+        self._reclaim = client.register_script(_RECLAIM)
+
+    def __repr__(self):
+        return f'<RedisLeaseBackend(prefix={self.prefix!r})>'
+
+    def acquire(self, key, owner, ttl, payload=''):
+        now = time.time()
+        return bool(self._acquire(keys=self.keys,
+                                  args=[key, owner, now, now + ttl, payload]))
+
+    def renew(self, owner, ttl):
+        return int(self._renew(keys=self.keys, args=[owner, time.time() + ttl]))
+
+    def release(self, key, owner):
+        return bool(self._release(keys=self.keys, args=[key, owner]))
+
+    def reclaim(self, owner, ttl, limit=100) -> List[Tuple[str, str]]:
+        now = time.time()
+        flat = self._reclaim(keys=self.keys, args=[owner, now, now + ttl, limit])
+        flat = [value.decode() if isinstance(value, bytes) else value
+                for value in flat]
+        return list(zip(flat[0::2], flat[1::2]))
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.leases.sqlite_backend
+~~~~~~~~~~~~
+This module implements SqliteLeaseBackend, a LeaseBackend stored in a SQLite
+database file. It coordinates manager nodes which run on the same host, or share
+a file system with working locks, without running any other service.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sqlite3
+import time
+import gevent
+from gevent.lock import Semaphore
+from typing import List, Tuple
+from .base import LeaseBackend
+
+
+class SqliteLeaseBackend(LeaseBackend):
+    """
+    Store the leases in a SQLite table.
+
+    >>> leases = SqliteLeaseBackend('leases.sqlite')
+    >>> manager = BaseWorkGroupManager('job', tasks, groups, leases=leases, ...)
+
+    Every change runs in a `BEGIN IMMEDIATE` transaction, so only one node at a
+    time can acquire or reclaim a given lease. While another node holds the lock
+    on the database, it polls with gevent.sleep(), instead of letting SQLite wait,
+    which would block every greenlet of this node. The greenlets of a node share
+    its connection, so they take turns to run a transaction.
+    """
+
+    def __init__(self, path: str, table: str='transistor_leases',
+                 timeout: float=30.0, poll_interval: float=0.01):
+        """
+        :param path: the SQLite database file, shared by the nodes.
+        :param table: the name of the leases table, created if it doesn't exist.
+        :param timeout: seconds to wait for another node's lock on the database.
+        :param poll_interval: seconds between two tries to take the lock.
+        """
+        self.path = path
+        self.table = table
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        # never wait inside sqlite, _execute() waits with gevent instead
+        self.conn = sqlite3.connect(path, timeout=0, isolation_level=None,
+                                    check_same_thread=False)
+        # held from BEGIN to COMMIT, since _execute() yields to other greenlets
+        self._lock = Semaphore()
+        self._execute(f'CREATE TABLE IF NOT EXISTS {table} ('
+                      f'key TEXT PRIMARY KEY, owner TEXT NOT NULL, '
+                      f'deadline REAL NOT NULL, payload TEXT)')
+        self._execute(f'CREATE INDEX IF NOT EXISTS {table}_deadline '
+                      f'ON {table} (deadline)')
+
+    def __repr__(self):
+        return f'<SqliteLeaseBackend(path={self.path!r})>'
+
+    def _execute(self, sql):
+        """
+        Execute a statement which takes a lock on the database, and retry it
+        every `poll_interval` seconds while another node holds the lock.
+
+        :raises sqlite3.OperationalError: if the database is still locked after
+        `timeout` seconds.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                return self.conn.execute(sql)
+            except sqlite3.OperationalError as exc:
+                if 'locked' not in str(exc) or time.monotonic() >= deadline:
+                    raise
+            gevent.sleep(self.poll_interval)
+
+    def _transaction(self, work):
+        with self._lock:
+            self._execute('BEGIN IMMEDIATE')
+            try:
+                result = work(time.time())
+                self._execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            return result
+
+    def acquire(self, key, owner, ttl, payload=''):
+        def work(now):
+            row = self.conn.execute(
+                f'SELECT owner, deadline FROM {self.table} WHERE key = ?',
+                (key,)).fetchone()
+            if row is not None and row[0] != owner and row[1] > now:
+                return False
+            self.conn.execute(
+                f'INSERT OR REPLACE INTO {self.table} (key, owner, deadline, payload) '
+                f'VALUES (?, ?, ?, ?)', (key, owner, now + ttl, payload))
+            return True
+        return self._transaction(work)
+
+    def renew(self, owner, ttl):
+        def work(now):
+            return self.conn.execute(
+                f'UPDATE {self.table} SET deadline = ? WHERE owner = ?',
+                (now + ttl, owner)).rowcount
+        return self._transaction(work)
+
+    def release(self, key, owner):
+        def work(now):
+            return self.conn.execute(
+                f'DELETE FROM {self.table} WHERE key = ? AND owner = ?',
+                (key, owner)).rowcount > 0
+        return self._transaction(work)
+
+    def reclaim(self, owner, ttl, limit=100) -> List[Tuple[str, str]]:
+        def work(now):
+            rows = self.conn.execute(
+                f'SELECT key, payload FROM {self.table} WHERE deadline <= ? '
+                f'ORDER BY deadline LIMIT ?', (now, limit)).fetchall()
+            self.conn.executemany(
+                f'UPDATE {self.table} SET owner = ?, deadline = ? WHERE key = ?',
+                [(owner, now + ttl, key) for key, _ in rows])
+            return rows
+        return self._transaction(work)
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.priority
+~~~~~~~~~~~~
+This module implements PriorityTaskQueue, the tracker queue of the
+BaseWorkGroupManager, which hands out the task with the highest priority
+first, and the oldest first among tasks of the same priority.
+
+So low priority tasks do not starve while higher priority tasks keep arriving,
+the priority of a task grows by one for every `aging` seconds it waits. With
+aging=30, a bulk refresh of priority 0 which waited five minutes is handed out
+before an urgent request of priority 10 which just arrived.
+
+The priority of a task is its `priority` attribute, like Task.priority, which
+the manager sets from the `p` field of a broker task envelope, or from the
+StatefulBook `priority` column. Plain keyword tasks have priority 0.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import time
+from heapq import heapify, heappop, heappush
+from itertools import count
+from gevent.queue import Queue
+
+__all__ = ['PriorityTaskQueue', 'task_priority']
+
+
+def task_priority(task) -> float:
+    """
+    Return the priority of a task, 0 for a plain keyword.
+    """
+    return getattr(task, 'priority', 0) or 0
+
+
+class PriorityTaskQueue(Queue):
+    """
+    A gevent Queue of tasks, which get() returns by priority, highest first,
+    where waiting raises the priority of a task by one every `aging` seconds.
+    """
+
+    def __init__(self, maxsize: int=None, items=(), aging: float=30.0,
+                 priority=task_priority):
+        """
+        :param maxsize: the most tasks in the queue, None for no limit.
+        :param items: the initial tasks.
+        :param aging: the seconds a task waits to gain one priority level, or
+        None for strict priority order, where low priority tasks wait while
+        there are higher priority tasks.
+        :param priority: a callable which returns the priority of a task.
+        """
+        # set before Queue.__init__, which calls _create_queue(items)
+        self.aging = aging
+        self.priority = priority
+        self._order = count()
+        super().__init__(maxsize, items)
+
+    def _entry(self, task):
+        # an age raises the priority as much as an earlier enqueue time lowers
+        # the sort key, so the order of the waiting tasks never changes, and a
+        # heap keeps it
+        key = -self.priority(task)
+        if self.aging:
+            key += time.monotonic() / self.aging
+        return key, next(self._order), task
+
+    def _create_queue(self, items=()):
+        queue = [self._entry(task) for task in items]
+        heapify(queue)
+        return queue
+
+    def _put(self, item):
+        heappush(self.queue, self._entry(item))
+
+    def _get(self):
+        return heappop(self.queue)[2]
+
+    def _peek(self):
+        return self.queue[0][2]
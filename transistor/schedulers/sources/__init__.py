@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.sources
+~~~~~~~~~~~~
+This module implements TaskSource classes which stream tasks into a
+BaseWorkGroupManager from csv files, json lines files, stdin, python iterators
+and SQL query cursors, without first loading the whole task list into memory.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+
+from .tasksource import (TaskSource, CsvTaskSource, JsonLinesTaskSource,
+                         StdinTaskSource, IterTaskSource, SqlTaskSource)
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.sources.tasksource
+~~~~~~~~~~~~
+This module implements the TaskSource base class and a few streaming
+implementations of it.
+
+A TaskSource is an alternative to StatefulBook and ExchangeQueue for the
+`tasks` parameter of BaseWorkGroupManager. Instead of reading every task up
+front, the manager pulls tasks from the source one at a time in a feeder
+greenlet and puts them into bounded per-tracker queues. When a tracker queue and
+its backlog are full, the feeder waits for the workers to catch up, so task
+production and scraping overlap while memory use stays bounded by the `buffer`
+size.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import io
+import csv
+import sys
+import json
+import gevent
+from abc import ABC, abstractmethod
+from typing import List
+from transistor.exceptions import KeywordError
+
+
+class TaskSource(ABC):
+    """
+    Base class for a stream of keyword tasks.
+
+    Subclass it and implement __iter__ to yield one task at a time. Each task is
+    given to every tracker named in `trackers`, the same as StatefulBook does.
+
+    >>> class ListTaskSource(TaskSource):
+    >>>     def __iter__(self):
+    >>>         yield from ['Soumission', 'Black Dust']
+    """
+
+    __attrs__ = [
+        'buffer', 'keywords', 'trackers'
+    ]
+
+    def __init__(self, trackers: List[str], buffer: int=1000, **kwargs):
+        """
+        :param trackers: a list of strings for names assigned to each tracker.
+        Each name should match the name of a WorkGroup.
+        :param buffer: the maximum number of tasks held in each tracker queue
+        before the manager stops pulling from this source.
+        :param kwargs: keywords: the column heading, json key, or SQL column to
+        read the task from. Default is 'item'.
+        """
+        self.trackers = trackers
+        self.buffer = buffer
+        self.keywords = kwargs.get('keywords', 'item')
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}(trackers={self.trackers})>'
+
+    @abstractmethod
+    def __iter__(self):
+        """
+        Yield the tasks, one at a time.
+        """
+        pass
+
+    def close(self):
+        """
+        Release any resources held by the source. Called by the manager after
+        the source is exhausted.
+        """
+        pass
+
+    def _get_keyword(self, record):
+        """
+        Return the task keyword from a mapping-like record, or None for an
+        empty cell, like the missing cells of a short csv row, or a NULL column.
+        """
+        try:
+            keyword = record[self.keywords]
+        except (KeyError, IndexError):
+            raise KeywordError(KeywordError.msg)
+        if keyword is None:
+            return None
+        return str(keyword)
+
+
+class _FileTaskSource(TaskSource):
+    """
+    Shared handling for sources that read a file path or file-like object.
+    """
+
+    def __init__(self, file, trackers: List[str], buffer: int=1000,
+                 encoding: str='utf-8', **kwargs):
+        """
+        :param file: a file path, or else an already opened text file-like object.
+        :param encoding: the encoding used to open a file path.
+        """
+        super().__init__(trackers, buffer=buffer, **kwargs)
+        self.file = file
+        self.encoding = encoding
+        self._opened = None
+
+    def _open(self):
+        if isinstance(self.file, io.IOBase) or hasattr(self.file, 'read'):
+            return self.file
+        self._opened = open(self.file, newline='', encoding=self.encoding)
+        return self._opened
+
+    def close(self):
+        if self._opened is not None:
+            self._opened.close()
+            self._opened = None
+
+
+class CsvTaskSource(_FileTaskSource):
+    """
+    Stream tasks from one column of a csv file.
+
+    >>> tasks = CsvTaskSource('book_titles.csv', ['books.toscrape.com'],
+    >>>                       keywords='titles')
+    """
+
+    def __init__(self, file, trackers: List[str], buffer: int=1000,
+                 encoding: str='utf-8-sig', **kwargs):
+        """
+        :param kwargs: any leftover kwargs are passed to csv.DictReader, for
+        example delimiter=';'.
+        """
+        keywords = kwargs.pop('keywords', 'item')
+        super().__init__(file, trackers, buffer=buffer, encoding=encoding,
+                         keywords=keywords)
+        self.reader_kwargs = kwargs
+
+    def __iter__(self):
+        for record in csv.DictReader(self._open(), **self.reader_kwargs):
+            keyword = self._get_keyword(record)
+            if keyword:
+                yield keyword
+
+
+class JsonLinesTaskSource(_FileTaskSource):
+    """
+    Stream tasks from a json lines file. Each line is either a json string,
+    which is the task itself, or a json object holding the task in the
+    `keywords` key.
+    """
+
+    def __iter__(self):
+        for line in self._open():
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict):
+                keyword = self._get_keyword(record)
+                if keyword:
+                    yield keyword
+            elif record is not None:
+                yield str(record)
+
+
+class StdinTaskSource(TaskSource):
+    """
+    Stream line-delimited tasks from stdin, for example:
+
+    $ cat part_numbers.txt | python main.py
+
+    When reading the real stdin, it is wrapped in a gevent FileObject so that
+    waiting for the next line does not block the other greenlets.
+    """
+
+    def __init__(self, trackers: List[str], buffer: int=1000, stream=None,
+                 **kwargs):
+        """
+        :param stream: a text file-like object to read from instead of stdin.
+        """
+        super().__init__(trackers, buffer=buffer, **kwargs)
+        self.stream = stream
+
+    def _open(self):
+        if self.stream is not None:
+            return self.stream
+        from gevent.fileobject import FileObject
+        return FileObject(sys.stdin.fileno(), 'r', close=False)
+
+    def __iter__(self):
+        for line in self._open():
+            line = line.strip()
+            if line:
+                yield line
+
+
+class IterTaskSource(TaskSource):
+    """
+    Stream tasks from any python iterable, like a generator.
+
+    >>> def part_numbers():
+    >>>     for page in api.paginate('/parts'):
+    >>>         yield from (part['mpn'] for part in page)
+    >>> tasks = IterTaskSource(part_numbers(), ['mousekey.com'])
+    """
+
+    def __init__(self, iterable, trackers: List[str], buffer: int=1000, **kwargs):
+        """
+        :param iterable: any iterable of tasks.
+        """
+        super().__init__(trackers, buffer=buffer, **kwargs)
+        self.iterable = iterable
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+
+class SqlTaskSource(TaskSource):
+    """
+    Stream tasks from a DB-API 2.0 cursor, fetching `arraysize` rows at a time.
+    Rows with a NULL or empty task are skipped.
+
+    A DB-API driver blocks the gevent hub while it waits for the database, unless
+    it is patched for gevent, like psycopg2 with psycogreen. Otherwise, pass
+    threadpool=True to run the query and each fetch in gevent's threadpool.
+
+    >>> cursor = connection.cursor()
+    >>> tasks = SqlTaskSource(cursor, ['mousekey.com'],
+    >>>                       query='select mpn from parts where active = %s',
+    >>>                       params=(True,))
+    """
+
+    def __init__(self, cursor, trackers: List[str], query: str=None,
+                 params=None, arraysize: int=500, buffer: int=1000,
+                 threadpool: bool=False, **kwargs):
+        """
+        :param cursor: an open DB-API cursor. If `query` is None the cursor
+        should already be executed.
+        :param query: an optional SQL query to execute on the cursor.
+        :param params: optional query parameters.
+        :param arraysize: number of rows to fetch per round trip.
+        :param threadpool: if True, execute the query and fetch the rows in
+        gevent's threadpool, so the other greenlets run meanwhile. The cursor
+        must then allow calls from another thread, for example a sqlite3
+        connection made with check_same_thread=False.
+        :param kwargs: keywords: the column index or, for cursors returning
+        mapping rows, the column name to read the task from. Default is 0.
+        """
+        kwargs.setdefault('keywords', 0)
+        super().__init__(trackers, buffer=buffer, **kwargs)
+        self.cursor = cursor
+        self.query = query
+        self.params = params
+        self.arraysize = arraysize
+        self.threadpool = threadpool
+
+    def _call(self, method, *args):
+        if self.threadpool:
+            return gevent.get_hub().threadpool.apply(method, args)
+        return method(*args)
+
+    def __iter__(self):
+        if self.query is not None:
+            if self.params is None:
+                self._call(self.cursor.execute, self.query)
+            else:
+                self._call(self.cursor.execute, self.query, self.params)
+        while True:
+            rows = self._call(self.cursor.fetchmany, self.arraysize)
+            if not rows:
+                break
+            for row in rows:
+                keyword = self._get_keyword(row)
+                if keyword:
+                    yield keyword
+                # the feeder doesn't yield while the tracker queues have room
+                gevent.sleep(0)
+
+    def close(self):
+        self.cursor.close()
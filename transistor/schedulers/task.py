@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.schedulers.task
+~~~~~~~~~~~~
+This module implements Task, a small wrapper around a keyword task which
+carries bookkeeping from the manager to the worker, like the tracker name, the
+broker message kwargs, the priority, and callbacks to run once the worker has exported the
+result of the task.
+
+A worker passes only the plain keyword to the spider, so the spider and its
+Items never hold a reference to a Task.
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+
+
+class Task:
+    """
+    A keyword task plus its bookkeeping.
+
+    >>> task = Task('Soumission', tracker='books.toscrape.com')
+    >>> task.on_done(lambda task, failed: print(f'{task} failed? {failed}'))
+    >>> task.done()
+    Soumission failed? False
+    """
+
+    __slots__ = ('keyword', 'tracker', 'kwargs', 'priority', '_callbacks')
+
+    def __init__(self, keyword, tracker: str=None, kwargs: dict=None,
+                 priority: int=0):
+        """
+        :param keyword: the keyword search term, which is passed to the spider.
+        :param tracker: the name of the tracker (and WorkGroup) for this task.
+        :param kwargs: the kwargs dict which came along with the task, if any.
+        :param priority: tasks with a higher priority are dispatched first, see
+        transistor.schedulers.priority.
+        """
+        self.keyword = keyword
+        self.tracker = tracker
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.priority = priority
+        self._callbacks = []
+
+    def __str__(self):
+        return str(self.keyword)
+
+    def __repr__(self):
+        return f'<Task(keyword={self.keyword!r}, tracker={self.tracker!r})>'
+
+    def on_done(self, callback):
+        """
+        Register a callable like callback(task, failed) to call once the worker
+        is finished with this task.
+        """
+        self._callbacks.append(callback)
+
+    def done(self, failed: bool=False):
+        """
+        Mark the task as finished and call each registered callback once.
+
+        :param failed: True if the worker raised an exception for this task.
+        """
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self, failed)
+
+
+def get_keyword(task):
+    """
+    Return the keyword of a task, which is either a Task or the keyword itself.
+    """
+    if isinstance(task, Task):
+        return task.keyword
+    return task
@@ -8,6 +8,10 @@
 -- ~~~~~~~~~~~~
 
 function main(splash)
+    -- cookies from an adopted session, see SplashScraper.adopt_session()
+    if splash.args.cookies and #splash.args.cookies > 0 then
+        splash:init_cookies(splash.args.cookies)
+    end
     splash:set_custom_headers({
       ["Accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,image/apng,*/*;q=0.8",
       ["Accept-Encoding"] = "identity",
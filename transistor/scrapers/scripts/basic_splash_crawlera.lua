@@ -15,7 +15,8 @@ function use_crawlera(splash)
     local host = 'proxy.crawlera.com'
     local port = 8010
     local session_header = 'X-Crawlera-Session'
-    local session_id = 'create'
+    -- a session id from the CrawleraSessionPool, else create a new session
+    local session_id = splash.args.session_id or 'create'
 
     splash:on_request(function (request)
         -- The commented code below can be used to speed up the crawling
@@ -72,6 +72,10 @@ end
 
 function main(splash)
     use_crawlera(splash)
+    -- cookies from an adopted session, see SplashScraper.adopt_session()
+    if splash.args.cookies and #splash.args.cookies > 0 then
+        splash:init_cookies(splash.args.cookies)
+    end
     assert(splash:go{
         splash.args.url,
         -- https://splash.readthedocs.io/en/stable/scripting-ref.html#splash-set-user-agent
@@ -14,6 +14,8 @@ Notes:
     - self.browser provides a class based from mechanicalsoup with similar API
     - self.browser.session provides direct access to the python-requests object
     - beautifulsoup4 methods can be used on the self.page attribute
+    - define a yield_items() generator to give any number of items per task,
+      like one per product of a listing page, see BaseWorker.iter_items()
 
 :copyright: Copyright (C) 2018 by BOM Quote Limited
 :license: The MIT License, see LICENSE for more details.
@@ -21,8 +23,8 @@ Notes:
 """
 
 import os
-import ssl
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from w3lib.http import basic_auth_header
 from requests.utils import dict_from_cookiejar
 from requests.adapters import HTTPAdapter
@@ -30,6 +32,23 @@ from pkgutil import get_data
 from transistor.browsers.splash_browser import SplashBrowser
 
 
+@lru_cache(maxsize=None)
+def get_resource(resource: str) -> str:
+    """
+    Return the text of a transistor package resource, like the default lua
+    script, read only once per process.
+    """
+    return get_data('transistor', resource).decode('utf-8')
+
+
+@lru_cache(maxsize=16)
+def splash_auth_header(username: str, password: str):
+    """
+    Return the Splash basic authorization header, computed once per credentials.
+    """
+    return basic_auth_header(username=username, password=password)
+
+
 class SplashScraper(ABC):
     """
     Base class to help implement any kind of Splash or Splash + Crawlera scraper.
@@ -41,8 +60,8 @@ class SplashScraper(ABC):
     __attrs__ = [
         'auth', 'baseurl', 'browser', 'cookies', 'crawlera_user',
         'http_session_timeout', 'http_session_valid', 'LUA_SOURCE', 'max_retries',
-        'name', 'number', 'referrer', 'searchurl', 'splash_args', 'splash_wait'
-        'user_agent',
+        'name', 'number', 'referrer', 'searchurl', 'splash_args', 'splash_url',
+        'splash_wait', 'user_agent',
     ]
 
     # class attrs used for concurrency
@@ -100,6 +119,15 @@ class SplashScraper(ABC):
         :param kwargs: splash_wait:float() controls the time in seconds Splash will
         wait after opening a web page, before taking actions. Default 3.0 sec.
 
+        :param kwargs: splash_url:str() the address of the Splash service, like
+        'http://splash.internal:8050'. Default is the SPLASH_URL environment
+        variable, else 'http://localhost:8050'.
+
+        :param kwargs: page_cache: a PageCache or DiskCache for the browser, for
+        example DiskCache('.splash_cache') to run a scraper again over cached
+        pages while developing its parsing logic. A manager sets its own
+        `page_cache` on the browser instead.
+
         :param kwargs: splash_args:dict(): a python dict which will be sent in a post
         request to the Splash service. This dict will serve to set the splash.args
         attributes so they are available for use in the LUA script simply by
@@ -111,7 +139,7 @@ class SplashScraper(ABC):
                 # sets Splash to cache the lua script, avoids sending it every request
                 'cache_args': 'lua_source',
                 'timeout': timeout[1],  # timeout (in seconds) for the render, 3600 max
-                'session_id': 'create',
+                'session_id': self.crawlera_session_id or 'create',
                 'referrer': self.referrer if not None else "https://www.google.com",
                 'searchurl': self.searchurl,
                 'keyword': keyword,  # can be used in the LUA script to submit a form
@@ -127,9 +155,7 @@ class SplashScraper(ABC):
         if script:
             self.LUA_SOURCE = script
         else:
-            self.LUA_SOURCE = get_data(
-                'transistor',
-                'scrapers/scripts/basic_splash.lua').decode('utf-8')
+            self.LUA_SOURCE = get_resource('scrapers/scripts/basic_splash.lua')
 
         # after calling super().__init__(), call self.start_http_session()
 
@@ -147,8 +173,11 @@ class SplashScraper(ABC):
         self.max_retries = kwargs.pop('max_retries', 5)
         self.http_session_timeout = kwargs.pop('http_session_timeout', (3.05, 10.05))
         self.splash_args = kwargs.pop('splash_args', None)
+        self._init_splash_args = self.splash_args
         self.splash_wait = kwargs.pop('splash_wait', 3.0)
         self.js_source = kwargs.pop('js_source', None)
+        self.splash_url = kwargs.pop(
+            'splash_url', os.environ.get('SPLASH_URL', 'http://localhost:8050'))
 
         # ----- kwargs only used for testing setup ----- #
         self._test_true = kwargs.get('_test_true', False)
@@ -167,28 +196,55 @@ class SplashScraper(ABC):
 
         # Whether we already have a valid HTTP session with the remote server
         self.http_session_valid = False
+        # the crawlera session id of a session adopted with adopt_session()
+        self.crawlera_session_id = None
+        # whether this spider adopted the http session of an earlier spider
+        self.session_adopted = False
 
-        # ssl._create_default_https_context = ssl._create_unverified_context
-        self._crawlera_ca = get_data('transistor',
-                            'scrapers/certs/crawlera-ca.crt').decode('utf-8')
-
-        ssl.create_default_context(cadata=self._crawlera_ca)
+        self._crawlera_ca = get_resource('scrapers/certs/crawlera-ca.crt')
 
         self.browser = SplashBrowser(
             soup_config={'features': 'lxml'},
             requests_adapters={'http://': HTTPAdapter(max_retries=self.max_retries)})
+        self.browser.page_cache = kwargs.pop('page_cache', None)
 
         self.cookies = dict_from_cookiejar(self.browser.session.cookies)
 
         # set the splash basic authorization
-        self.auth = basic_auth_header(
-            username=os.environ.get('SPLASH_USERNAME', 'user'),
-            password=os.environ.get('SPLASH_PASSWORD', 'userpass'))
+        self.auth = splash_auth_header(
+            os.environ.get('SPLASH_USERNAME', 'user'),
+            os.environ.get('SPLASH_PASSWORD', 'userpass'))
         self.browser.session.headers.update({'Authorization': self.auth})
 
     def __repr__(self):
         return f'<SplashScraper({self.name})>'
 
+    def reset(self, task, **kwargs):
+        """
+        Prepare this spider for a new task, so a worker with the `spider_pool`
+        kwarg can reuse it instead of constructing a new spider for every task.
+        The browser, its requests session and connection pool, the lua script
+        and the headers are kept, while the page, cookies and http session state
+        of the last task are cleared.
+
+        A subclass which sets attributes per task must override this, set them
+        for `task` and call super().reset(task, **kwargs). For example:
+
+        >>> def reset(self, book_title, **kwargs):
+        >>>     super().reset(book_title, **kwargs)
+        >>>     self.book_title = book_title
+        >>>     self.price = None
+
+        :param task: the keyword of the new task.
+        """
+        self.browser.reset()
+        self.cookies = dict_from_cookiejar(self.browser.session.cookies)
+        self.splash_args = self._init_splash_args
+        self.http_session_valid = False
+        self.crawlera_session_id = None
+        self.session_adopted = False
+        self._result = True
+
     @abstractmethod
     def start_http_session(self, url=None, **kwargs):
         """
@@ -299,7 +355,7 @@ class SplashScraper(ABC):
                 # set Splash to cache the lua script, to avoid sending it every request
                 'cache_args': 'lua_source',
                 'timeout': timeout[1],  # timeout (in seconds) for the render, 3600 max
-                'session_id': 'create',
+                'session_id': self.crawlera_session_id or 'create',
                 'referrer': self.referrer if not None else "https://www.google.com",
                 'searchurl': self.searchurl,
                 'keyword': keyword,  # can be used in the LUA script to submit a form
@@ -312,8 +368,8 @@ class SplashScraper(ABC):
         else:
             self.splash_args = splash_args
         response = self.browser.stateful_post(
-            # 'http://localhost:8050/render.json'if self.js_source else
-            'http://localhost:8050/execute',
+            # f'{self.splash_url}/render.json' if self.js_source else
+            f'{self.splash_url.rstrip("/")}/execute',
             json=self.splash_args,
             timeout=timeout,
             verify=self._crawlera_ca,
@@ -321,6 +377,41 @@ class SplashScraper(ABC):
         self.http_session_valid = True
         return response
 
+    def export_session(self) -> dict:
+        """
+        Return the state of the validated http session, after
+        start_http_session(), so a worker can hand it to the next spider with
+        adopt_session() instead of loading the landing page again.
+
+        The cookies are the ones Splash returned with the landing page, if the
+        lua script returns them, else the cookies of this scraper.
+        """
+        cookies = self.cookies
+        try:
+            cookies = self.browser.resp_content.get('cookies', None) or cookies
+            crawlera_session = self.session_id
+        except (ValueError, AttributeError):
+            # the response content is not the json from the lua script
+            crawlera_session = None
+        return {'cookies': cookies,
+                'crawlera_session': crawlera_session or self.crawlera_session_id,
+                'headers': dict(self.browser.session.headers)}
+
+    def adopt_session(self, state: dict):
+        """
+        Take over a http session exported from another spider with
+        export_session(). The requests of this spider, starting with the page
+        opened by start_http_session(), send the session's cookies and crawlera
+        session id, instead of creating a new session.
+
+        A subclass which loads a landing page before it opens the page of its
+        task can skip the landing page while self.session_adopted is True.
+        """
+        self.cookies = state.get('cookies', self.cookies)
+        self.crawlera_session_id = state.get('crawlera_session', None)
+        self.browser.session.headers.update(state.get('headers', {}))
+        self.session_adopted = True
+
     @property
     def session_id(self):
         """
@@ -57,6 +57,7 @@ import lz4.block
 import keyring
 from Crypto.Protocol.KDF import PBKDF2
 from Crypto.Cipher import AES
+from transistor.utility.logging import logger
 
 
 class BrowserCookieError(Exception):
@@ -290,17 +291,17 @@ class Firefox(BrowserCookieLoader):
                                 json_data = json.loads(
                                     lz4.block.decompress(session_file.read()).decode())
                             except IOError as e:
-                                print('Could not read file:', str(e))
+                                logger.warning('Could not read file: %s', e)
                             except ValueError as e:
-                                print('Error parsing Firefox session file:', str(e))
+                                logger.warning('Error parsing Firefox session file: %s', e)
                         else:
                             try:
                                 json_data = json.loads(
                                     open(file_path, 'rb').read().decode('utf-8'))
                             except IOError as e:
-                                print('Could not read file:', str(e))
+                                logger.warning('Could not read file: %s', e)
                             except ValueError as e:
-                                print('Error parsing firefox session JSON:', str(e))
+                                logger.warning('Error parsing firefox session JSON: %s', e)
 
                 if 'json_data' in locals():
                     expires = str(int(time.time()) + 3600 * 24 * 7)
@@ -311,7 +312,7 @@ class Firefox(BrowserCookieLoader):
                                                 cookie.get('name', ''),
                                                 cookie.get('value', ''))
                 else:
-                    print('Could not find any Firefox session files')
+                    logger.warning('Could not find any Firefox session files')
 
 
 def create_cookie(host, path, secure, expires, name, value):
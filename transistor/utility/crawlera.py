@@ -5,13 +5,16 @@ transistor.utility.crawlera
 This module implements various helper functions for working with the
 scrapinghub.com Crawlera 'smart proxy' service.
 
+Importing this module has no side effects. To delete the sessions of a region
+concurrently, call gevent.monkey.patch_all() first in your program, like the
+examples do.
+
 :copyright: Copyright (C) 2018 by BOM Quote Limited
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
 """
-import gevent.monkey
-gevent.monkey.patch_all()
 import os
+import sys
 import json
 import requests
 import gevent
@@ -22,7 +25,26 @@ from transistor.exceptions import Unauthorized
 # The environment variable should be formatted similar to below:
 # CRAWLERA_REGIONS = CRAWLERA_ALL,CRAWLERA_USA,CRAWLERA_CN
 
-CRAWLERA_REGIONS = os.environ.get('CRAWLERA_REGIONS').split(',')
+
+def crawlera_regions() -> list:
+    """
+    Return the regions in the CRAWLERA_REGIONS environment variable, read when
+    called, so the module can be imported without it.
+    """
+    regions = os.environ.get('CRAWLERA_REGIONS', '')
+    return [region.strip() for region in regions.split(',') if region.strip()]
+
+
+def __getattr__(name):
+    # CRAWLERA_REGIONS used to be read from the environment on import
+    if name == 'CRAWLERA_REGIONS':
+        return crawlera_regions()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+if sys.version_info < (3, 7):
+    # Python 3.6 has no module __getattr__, so read it on import, as before
+    CRAWLERA_REGIONS = crawlera_regions()
 
 
 def get_crawlera_sessions(region:str):
@@ -37,7 +59,7 @@ def get_crawlera_sessions(region:str):
 
     """
     auth = None
-    if region in CRAWLERA_REGIONS:
+    if region in crawlera_regions():
         auth = os.environ.get(region, None)
 
     response = requests.get(
@@ -55,7 +77,7 @@ def delete_crawlera_sessions(region:str):
     """
     import requests
     auth = None
-    if region in CRAWLERA_REGIONS:
+    if region in crawlera_regions():
         auth = os.environ.get(region, None)
 
     sessions = get_crawlera_sessions(region)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.utility.lazy
+~~~~~~~~~~~~
+This module implements lazy_exports(), which lets a package export names from
+its submodules without importing them until first used, with a module
+__getattr__ (PEP 562). So `import transistor` does not import pyexcel, kombu,
+mechanicalsoup, bs4 or openpyxl until a class which needs them is used.
+
+In a package __init__.py:
+
+    >>> from transistor.utility.lazy import lazy_exports
+    >>> __all__ = ['StatefulBook']
+    >>> lazy_exports(globals(), {'StatefulBook': '.books.bookstate'})
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import sys
+from importlib import import_module
+
+__all__ = ['lazy_exports']
+
+
+def lazy_exports(namespace: dict, exports: dict):
+    """
+    Add a __getattr__ and __dir__ to the module `namespace`, which import each
+    exported name from its submodule on first access, and then keep it in the
+    module, so later lookups are plain attribute lookups.
+
+    Python 3.6 has no module __getattr__, so there the names are imported now.
+
+    :param namespace: the globals() of the package.
+    :param exports: {name: module}, where module may be relative to the package,
+    like {'SplashBrowser': '.splash_browser'}.
+    """
+    package = namespace['__name__']
+
+    def __getattr__(name):
+        try:
+            module = exports[name]
+        except KeyError:
+            raise AttributeError(
+                f'module {package!r} has no attribute {name!r}') from None
+        value = getattr(import_module(module, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(exports))
+
+    namespace['__getattr__'] = __getattr__
+    namespace['__dir__'] = __dir__
+    if sys.version_info < (3, 7):
+        for name in exports:
+            __getattr__(name)
@@ -4,13 +4,226 @@ transistor.utility.logging
 ~~~~~~~~~~~~
 This module implements various helper functions for logging.
 
+The per-request code paths log to a logger for their category, from
+category_logger(), like 'transistor.browser', 'transistor.worker' and
+'transistor.manager', with %-style arguments, so nothing is formatted unless a
+record is emitted. Wrap an argument which is expensive to compute, like decoded
+response content, in lazy(). Check logger.isEnabledFor() before work which
+would be done only to log.
+
+To log to a JSON lines file, with 1% of the browser debug records:
+
+    >>> configure_logging(logging.DEBUG, path='transistor.jsonl',
+    ...                   sampling={'transistor.browser': 0.01})
+
 :copyright: Copyright (C) 2018 by BOM Quote Limited
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
 """
-
+import json
+import random
+import logging
+from collections import deque
+from gevent.monkey import get_original
 from kombu.log import get_logger
 
+__all__ = ['category_logger', 'configure_logging', 'JsonLinesHandler', 'lazy',
+           'logger', 'SamplingFilter']
 
 logger = get_logger(__name__)
-debug, info, warn, error = logger.debug, logger.info, logger.warn, logger.error
\ No newline at end of file
+debug, info, warn, error = logger.debug, logger.info, logger.warn, logger.error
+
+# the real thread functions, even if threading is monkey patched
+start_new_thread = get_original('_thread', 'start_new_thread')
+allocate_lock = get_original('_thread', 'allocate_lock')
+real_sleep = get_original('time', 'sleep')
+
+# the attributes of every LogRecord, the others were passed in `extra`
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord(
+    '', logging.INFO, '', 0, '', (), None))) | {'message', 'asctime'}
+
+# the handlers installed by the last configure_logging() call
+_configured = []
+
+
+def category_logger(category: str) -> logging.Logger:
+    """
+    Return the logger of a category of the transistor code paths, like
+    category_logger('browser') for 'transistor.browser'.
+    """
+    return get_logger(f'transistor.{category}')
+
+
+class lazy:
+    """
+    A log argument which is computed only if the record is formatted:
+
+        >>> log.debug('content %s', lazy(lambda: raw_content[:1000].decode()))
+    """
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+    def __repr__(self):
+        return repr(self.func(*self.args))
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a fraction of the records below WARNING for each category, matched by
+    the longest logger name prefix. Warnings and errors are always kept.
+    """
+
+    def __init__(self, rates: dict, seed: int=None):
+        """
+        :param rates: {logger name: fraction of the records kept}, like
+        {'transistor.browser': 0.01, 'transistor.worker': 0.1}.
+        :param seed: the seed of the sampling, for repeatable tests.
+        """
+        super().__init__()
+        self.rates = dict(rates)
+        self.random = random.Random(seed)
+        self._cache = {}
+
+    def rate(self, name: str) -> float:
+        try:
+            return self._cache[name]
+        except KeyError:
+            pass
+        rate, length = 1.0, -1
+        for prefix, fraction in self.rates.items():
+            if (name == prefix or name.startswith(prefix + '.')) \
+                    and len(prefix) > length:
+                rate, length = fraction, len(prefix)
+        self._cache[name] = rate
+        return rate
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or self.random.random() < rate
+
+
+class JsonLinesHandler(logging.Handler):
+    """
+    Write each record as a line of JSON to a file. emit() only formats the
+    message and queues the record, a real thread encodes and writes the queued
+    records every `flush_interval` seconds, so the gevent hub never waits for
+    the disk. When more than `capacity` records are queued the oldest are
+    dropped, and counted in `dropped`.
+    """
+
+    def __init__(self, path: str, level=logging.NOTSET, flush_interval: float=0.5,
+                 capacity: int=100000):
+        """
+        :param path: the file the records are appended to.
+        :param flush_interval: the seconds between writes of the queued records.
+        :param capacity: the most records queued between two writes.
+        """
+        super().__init__(level)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.queue = deque(maxlen=capacity)
+        self.queued = 0
+        self.written = 0
+        self._file = open(path, 'a', encoding='utf-8')
+        self._write_lock = allocate_lock()
+        self._running = True
+        start_new_thread(self._writer, ())
+
+    @property
+    def dropped(self) -> int:
+        return self.queued - self.written - len(self.queue)
+
+    def record_dict(self, record) -> dict:
+        line = {'time': record.created, 'level': record.levelname,
+                'logger': record.name, 'message': record.getMessage()}
+        if record.exc_info:
+            line['exc_info'] = logging.Formatter().formatException(record.exc_info)
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                line[key] = value
+        return line
+
+    def emit(self, record):
+        try:
+            self.queue.append(self.record_dict(record))
+            self.queued += 1
+        except Exception:
+            self.handleError(record)
+
+    def _writer(self):
+        while self._running:
+            real_sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """
+        Write the queued records now.
+        """
+        with self._write_lock:
+            if self._file is None:
+                return
+            lines = []
+            while True:
+                try:
+                    lines.append(json.dumps(self.queue.popleft(), default=str))
+                except IndexError:
+                    break
+            if lines:
+                self._file.write('\n'.join(lines) + '\n')
+                self._file.flush()
+                self.written += len(lines)
+
+    def close(self):
+        self._running = False
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        super().close()
+
+
+def configure_logging(level=logging.INFO, path: str=None, sampling: dict=None,
+                      stream=None) -> logging.Logger:
+    """
+    Configure the 'transistor' logger, which all the transistor loggers
+    propagate to. The handlers of an earlier call are removed and closed, so
+    calling it again reconfigures the logging, instead of logging every record
+    twice.
+
+    :param level: the lowest level logged.
+    :param path: if given, write the records to this JSON lines file with a
+    JsonLinesHandler.
+    :param sampling: {logger name: fraction of the records kept} for a
+    SamplingFilter, like {'transistor.browser': 0.01}.
+    :param stream: if given, also log to this stream, like sys.stderr.
+    :return: the 'transistor' logger.
+    """
+    root = get_logger('transistor')
+    root.setLevel(level)
+    while _configured:
+        handler = _configured.pop()
+        root.removeHandler(handler)
+        handler.close()
+    handlers = []
+    if path is not None:
+        handlers.append(JsonLinesHandler(path))
+    if stream is not None:
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s %(levelname)s %(name)s: %(message)s'))
+        handlers.append(handler)
+    for handler in handlers:
+        if sampling:
+            handler.addFilter(SamplingFilter(sampling))
+        root.addHandler(handler)
+        _configured.append(handler)
+    return root
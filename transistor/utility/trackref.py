@@ -59,13 +59,27 @@ def format_live_refs(ignore=NoneType):
             continue
         if issubclass(cls, ignore):
             continue
-        oldest = min(wdict.items())
+        oldest = min(wdict.values())
         s += "%-30s %6d   oldest: %ds ago\n" % (
             cls.__name__, len(wdict), now - oldest
         )
     return s
 
 
+def count_live_refs(ignore=NoneType):
+    """Return {class name: (live instances, seconds since the oldest was
+    created)} of the tracked classes with live instances"""
+    counts = {}
+    now = time()
+    for cls, wdict in list(live_refs.items()):
+        if issubclass(cls, ignore):
+            continue
+        created = list(wdict.values())
+        if created:
+            counts[cls.__name__] = (len(created), now - min(created))
+    return counts
+
+
 def print_live_refs(*a, **kw):
     """Print tracked objects"""
     print(format_live_refs(*a, **kw))
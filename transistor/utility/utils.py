@@ -15,6 +15,7 @@ import json
 import os
 import base64
 from pathlib import Path
+from transistor.utility.logging import logger
 from transistor._internal import _Missing
 from . import browsercookie
 
@@ -164,8 +165,9 @@ def png_to_file(self, filename):
         png_data = self.png.encode('utf-8')
         with open(str(filepath), 'wb') as fh:
             fh.write(base64.decodebytes(png_data))
-            print(f'Saved to {filepath}')
-    print(f'self.png is None')
+            logger.info('Saved to %s', filepath)
+        return None
+    logger.warning('self.png is None')
     return None
 
 
@@ -177,5 +179,5 @@ def measure(func):
             return func(*args, **kwargs)
         finally:
             end_ = int(round(time() * 1000)) - start
-            print(f"Total execution time: {end_ if end_ > 0 else 0} ms")
+            logger.info('%s execution time: %d ms', func.__qualname__, max(end_, 0))
     return _time_it
\ No newline at end of file
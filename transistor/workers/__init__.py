@@ -15,6 +15,9 @@ The BaseWorker wraps a spider object.  The BaseGroup wraps the BaseWorker object
 and provides methods to scale the BaseWorker to an arbitrary number of Workers
 which can then perform scrape jobs as a coordinated Group.
 
+CrawlWorker is a BaseWorker which runs one shared crawl for all of its tasks,
+instead of one spider per task, see transistor.crawlers.shared.
+
 This module also implements WorkGroup, a namedtuple used mainly for organization
 and in composing a list of BaseGroups to pass as a parameter into a manager class.
 
@@ -24,6 +27,13 @@ and in composing a list of BaseGroups to pass as a parameter into a manager clas
 ~~~~~~~~~~~~
 """
 
-from .workgroup import WorkGroup
-from .baseworker import BaseWorker
-from .basegroup import BaseGroup
+from transistor.utility.lazy import lazy_exports
+
+__all__ = ['BaseGroup', 'BaseWorker', 'CrawlWorker', 'WorkGroup']
+
+lazy_exports(globals(), {
+    'WorkGroup': '.workgroup',
+    'BaseWorker': '.baseworker',
+    'BaseGroup': '.basegroup',
+    'CrawlWorker': '.crawlworker',
+})
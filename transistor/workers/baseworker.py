@@ -9,9 +9,32 @@ for more notes on this module.
 :license: The MIT License, see LICENSE for more details.
 ~~~~~~~~~~~~
 """
+import time
 import gevent
+from collections import deque
 from gevent.queue import Queue, Empty
-from transistor.utility.logging import logger
+from transistor.monitoring.tracing import span
+from transistor.persistence.item import Item
+from transistor.schedulers.priority import task_priority
+from transistor.schedulers.task import Task, get_keyword
+from transistor.utility.logging import category_logger, logger
+
+# the per-task messages, with lazy %-style formatting
+log = category_logger('worker')
+
+
+class _Assigned:
+    """
+    A task in a worker's task queue, with the time.monotonic() when the manager
+    started to dispatch it, and when it was assigned.
+    """
+    __slots__ = ('task', 'dispatched', 'assigned')
+
+    def __init__(self, task, dispatched: float):
+        self.task = task
+        self.dispatched = dispatched
+        self.assigned = None
+
 
 class BaseWorker:
     """
@@ -19,9 +42,9 @@ class BaseWorker:
     and can itself be scaled up to an arbitrary number of instances in a BaseGroup.
     """
 
-    tasks = Queue(maxsize=1)
     number = None
-    events = []
+    # the most tasks waiting in the task queue for each worker, None for no limit
+    queue_size = 1
 
     def __init__(self, job_id:str, spider, http_session=None, **kwargs):
         """
@@ -42,6 +65,26 @@ class BaseWorker:
         scraped, instead of just the .com domain. Use kwargs as needed here, to
         execute based on your customized spider logic.
 
+        :param kwargs: session_ttl: if set, the landing page http session is
+        established once and handed to each new spider with adopt_session(), for
+        up to session_ttl seconds, before start_http_session() opens the page of
+        the spider's task with it. It is established again after it expires, or
+        after a task fails or times out. Useful for search-driven targets, where
+        the spider searches after landing, since a spider with an adopted session
+        can skip the landing page render.
+
+        :param kwargs: spider_pool: if True, a spider is reused for the next task
+        after calling its reset(task) method, instead of constructing a new spider
+        for every task. A spider which raised an exception is not reused. Hooks
+        like post_process_exports() must then keep the exported Items, not the
+        spider, see release_spider().
+
+        :param kwargs: max_events: the most recent `events` kept, default 100.
+
+        :param kwargs: task_queue: the task queue shared by the workers of a
+        WorkGroup, given by the manager, so a worker which is busy, or quit, never
+        holds up a task which another worker could take.
+
         :param kwargs: qtimeout: to adjust the queue timeout like {"qtimeout":5} which
         you should probably never adjust this. But, if you do adjust this, ensure that
         the worker's qtimeout is less than the manager's qtimeout.
@@ -49,6 +92,11 @@ class BaseWorker:
         """
         self.job_id = job_id
         self.spider = spider
+        # the queue shared by the workers of the group, so the manager can only
+        # hand a worker a task from the worker's own tracker
+        self.tasks = kwargs.get('task_queue', None)
+        if self.tasks is None:
+            self.tasks = Queue(maxsize=self.queue_size)
         self.http_session = http_session
         if http_session is None:
             self.http_session = {}
@@ -61,6 +109,37 @@ class BaseWorker:
         # this worker qtimeout must be longer than manager's qtimeout or else
         # the worker will quit early as it runs out of work waiting for the manager
         self.qtimeout = kwargs.get('qtimeout', 1)
+        # the manager's RateLimiter and this worker's bucket key, None means
+        # the bucket is chosen by the target domain
+        self.rate_limiter = kwargs.get('rate_limiter', None)
+        self.rate_limit_key = kwargs.get('rate_limit_key', None)
+        # an AIMDController which limits the active workers of the group, if any
+        self.concurrency = kwargs.get('concurrency', None)
+        # the manager's CrawleraSessionPool, if any
+        self.crawlera_pool = kwargs.get('crawlera_pool', None)
+        # the manager's PageCache, if any
+        self.page_cache = kwargs.get('page_cache', None)
+        # the manager's StatsCollector, if any
+        self.stats = kwargs.get('stats', None)
+        # the manager's Tracer and the Trace of the current task, if any
+        self.tracer = kwargs.get('tracer', None)
+        self.trace = None
+        # the manager's MemoryWatchdog, if any, while it holds back dispatching
+        # the worker keeps waiting for its next task
+        self.memory = kwargs.get('memory', None)
+        # the recent results for the manager's monitor(), a ring buffer, so
+        # a long job does not keep every spider alive
+        self.events = deque(maxlen=kwargs.get('max_events', 100))
+        # the queue of the manager's iter_results(), while it runs
+        self.results = None
+        # when the manager started to dispatch, assigned, and this worker took
+        # its current task, for the queue_wait stats and the traces
+        self._waits = None
+        self.session_ttl = kwargs.get('session_ttl', None)
+        self.spider_pool = kwargs.get('spider_pool', False)
+        self._idle_spiders = []
+        self._session_state = None
+        self._session_expires = 0.0
 
     def __repr__(self):
         return f"<Worker(job_id='{self.job_id}', name='{self.name}-{self.number}')>"
@@ -71,15 +150,110 @@ class BaseWorker:
         """
         try:
             while True:
-                task = self.tasks.get(timeout=self.qtimeout)  # decrements queue by 1
-                logger.info(f'Worker {self.name}-{self.number} got task {task}')
-                spider = self.get_spider(task, **kwargs)
-                spider.start_http_session(**self.http_session)
-                # OK, right here is where we wait for the spider to return a result.
-                self.result(spider, task)
+                # take a slot first, so while the group is throttled, the next
+                # task waits in the shared queue for the next worker with a slot
+                if self.concurrency is not None:
+                    self.concurrency.acquire()
+                try:
+                    task = self.next_task(timeout=self.qtimeout)  # decrements queue by 1
+                except Empty:
+                    if self.concurrency is not None:
+                        self.concurrency.release()
+                    raise
+                log.debug('Worker %s-%s got task %s', self.name, self.number, task)
+                self.start_trace(task)
+                started = time.monotonic()
+                spider = None
+                try:
+                    with span(self.trace, 'spider'):
+                        spider = self.acquire_spider(get_keyword(task), **kwargs)
+                    self.prepare_spider(spider)
+                    if getattr(spider, 'browser', None) is not None:
+                        spider.browser.priority = task_priority(task)
+                    with span(self.trace, 'scrape'):
+                        self.start_session(spider)
+                    # OK, right here is where we wait for the spider to return a result.
+                    self.result(spider, task)
+                    self.check_session(spider)
+                except Exception:
+                    # the task failed, the worker carries on with the next one
+                    log.exception('Worker %s-%s failed task %s.', self.name,
+                                  self.number, task)
+                    self._session_state = None
+                    self.report(spider, started, failed=True)
+                    self.task_done(task, failed=True)
+                    self.finish_trace(failed=True)
+                    continue
+                self.report(spider, started)
+                self.release_spider(spider)
+                self.task_done(task)
+                self.finish_trace()
         except Empty:
             logger.info(f'Quitting time for worker {self.name}-{self.number}!')
 
+    def assign(self, task, since: float=None, timeout: float=None):
+        """
+        Put a task in this worker's task queue, which the workers of its group
+        share. Called by the manager, it waits while the queue is full.
+
+        :param since: the time.monotonic() when the manager started to dispatch
+        the task, for the trace.
+        :param timeout: the most seconds to wait while the queue is full.
+        :raises gevent.queue.Full: if the queue is still full after `timeout`.
+        """
+        entry = _Assigned(task, since or time.monotonic())
+        self.tasks.put(entry, timeout=timeout)
+        entry.assigned = time.monotonic()
+
+    def next_task(self, block=True, timeout=None):
+        """
+        Take the next task from this worker's task queue, and record how long it
+        waited since it was assigned. A task put in the queue directly, instead
+        of with assign(), waited since it was taken.
+
+        :raises gevent.queue.Empty: if there is no task within `timeout`, unless
+        the manager's MemoryWatchdog holds back dispatching, then it waits on.
+        """
+        while True:
+            try:
+                entry = self.tasks.get(block=block, timeout=timeout)
+                break
+            except Empty:
+                if not block or self.memory is None or not self.memory.holding:
+                    raise
+        now = time.monotonic()
+        if isinstance(entry, _Assigned):
+            task, assigned = entry.task, entry.assigned or now
+            dispatched = entry.dispatched
+        else:
+            task, dispatched, assigned = entry, now, now
+        self._waits = (dispatched, assigned, now)
+        if self.stats is not None:
+            self.stats.observe('queue_wait', now - assigned, self.name)
+        return task
+
+    def start_trace(self, task):
+        """
+        Start the Trace of the task taken by next_task(), if the tracer samples it,
+        with its dispatch and queue spans.
+        """
+        self.trace = None
+        if self.tracer is None:
+            return
+        dispatched, assigned, taken = self._waits
+        self.trace = self.tracer.start(task, self.name, start=dispatched)
+        if self.trace is not None:
+            self.trace.add('dispatch', dispatched, assigned)
+            self.trace.add('queue', assigned, taken)
+
+    def finish_trace(self, failed: bool=False):
+        """
+        Write the Trace of the current task, if any.
+        """
+        if self.trace is not None:
+            self.tracer.finish(self.trace, failed=failed)
+            self.trace = None
+
     def result(self, spider, task):
         """
         At this point, we finally received a result from the spider, and this
@@ -92,11 +266,132 @@ class BaseWorker:
         :param task: passing through the task from spawn_spider method.
         """
 
+        started = time.monotonic()
         self.pre_process_exports(spider, task)
         self.process_exports(spider, task)
         self.post_process_exports(spider, task)
+        if self.stats is not None:
+            self.stats.observe('export', time.monotonic() - started, self.name)
         gevent.sleep(0)
 
+    def acquire_spider(self, task, **kwargs):
+        """
+        Return a spider for the task, an idle one after calling its reset(task)
+        if `spider_pool` is set, else a new one from get_spider().
+        """
+        if self._idle_spiders:
+            spider = self._idle_spiders.pop()
+            spider.reset(task, **kwargs)
+            return spider
+        return self.get_spider(task, **kwargs)
+
+    def release_spider(self, spider):
+        """
+        Keep the spider for the next task, if `spider_pool` is set. It must have
+        been exported by now, since it is reset for the next task.
+
+        The hooks must not keep a reference to a pooled spider, for example in
+        `events`, since the next reset() overwrites its results. Keep an Item
+        from load_items(spider) instead.
+        """
+        if self.spider_pool and hasattr(spider, 'reset'):
+            self._idle_spiders.append(spider)
+
+    def prepare_spider(self, spider):
+        """
+        A hook point called after get_spider() and before the spider starts its
+        http session. It attaches the services shared by all the workers, like
+        the rate limiter, to the spider's browser.
+        """
+        browser = getattr(spider, 'browser', None)
+        if browser is None:
+            return
+        if self.rate_limiter is not None:
+            browser.rate_limiter = self.rate_limiter
+            browser.rate_limit_key = self.rate_limit_key
+        if self.crawlera_pool is not None:
+            browser.crawlera_pool = self.crawlera_pool
+            browser.crawlera_affinity = f'{self.name}-{self.number}'
+        if self.page_cache is not None:
+            browser.page_cache = self.page_cache
+        if self.stats is not None:
+            browser.stats = self.stats
+            browser.stats_key = self.name
+        if self.tracer is not None:
+            browser.trace = self.trace
+
+    def start_session(self, spider):
+        """
+        Start the spider's http session, which scrapes the page of its task. If
+        `session_ttl` is set, first hand the spider the session exported from an
+        earlier spider while it has not expired, else export the new session of
+        this spider for the next spiders.
+        """
+        if self.session_ttl is None or not hasattr(spider, 'adopt_session'):
+            spider.start_http_session(**self.http_session)
+            return
+        if self._session_state is not None and \
+                time.monotonic() < self._session_expires:
+            spider.adopt_session(self._session_state)
+            spider.start_http_session(**self.http_session)
+            return
+        spider.start_http_session(**self.http_session)
+        if getattr(spider, 'http_session_valid', False):
+            self._session_state = spider.export_session()
+            self._session_expires = time.monotonic() + self.session_ttl
+
+    def check_session(self, spider):
+        """
+        Drop the shared http session if the spider's last request timed out or
+        did not return http 200, so the next task establishes a new one.
+        """
+        browser = getattr(spider, 'browser', None)
+        if self._session_state is None or browser is None:
+            return
+        status = str(getattr(browser, 'status', '') or '')
+        if getattr(browser, 'timeout_exception', False) or \
+                status not in ('', '200'):
+            logger.info(f'Worker {self.name}-{self.number} drops its http session.')
+            self._session_state = None
+
+    def report(self, spider, started, failed=False):
+        """
+        Report the latency and outcome of a task to the group's concurrency
+        controller, if any, and free the worker's slot.
+
+        :param spider: the spider, or None if it could not be created.
+        :param started: the time.monotonic() when the task started.
+        :param failed: True if processing the task raised an exception.
+        """
+        if self.concurrency is None:
+            return
+        browser = getattr(spider, 'browser', None)
+        status = getattr(browser, 'status', None)
+        raw_content = getattr(browser, 'raw_content', b'') or b''
+        if b'http503' in raw_content:
+            status = 503
+        elif b'http504' in raw_content:
+            status = 504
+        self.concurrency.record(time.monotonic() - started, status=status,
+                                timeout=getattr(browser, 'timeout_exception', False),
+                                failed=failed)
+        self.concurrency.release()
+
+    def task_done(self, task, failed=False):
+        """
+        Called after the exports for a task are complete, or after the task
+        raised an exception. If the task came from a broker, this lets the manager
+        acknowledge the message only once the result is safely exported.
+
+        :param task: the task, either a keyword or a Task instance.
+        :param failed: True if processing the task raised an exception.
+        """
+        if self.stats is not None:
+            self.stats.inc('tasks_failed' if failed else 'tasks_completed',
+                           self.name)
+        if isinstance(task, Task):
+            task.done(failed=failed)
+
     def pre_process_exports(self, spider, task):
         """
         A hook point which executes just before process_exports in
@@ -116,9 +411,13 @@ class BaseWorker:
         :param task: just passing through the item.
         :return: commit to newt db and return a print statement.
         """
-        items = self.load_items(spider)
-        for exporter in self.get_spider_exporters():
-            exporter.export_item(items)
+        for items in self.iter_items(spider):
+            with span(self.trace, 'export'):
+                for exporter in self.get_spider_exporters():
+                    exporter.export_item(items)
+            if self.results is not None:
+                # waits while the caller of iter_results() is behind
+                self.results.put(items)
 
     def post_process_exports(self, spider, task):
         """
@@ -140,6 +439,8 @@ class BaseWorker:
         parameter. The book titles are read from the excel spreadsheet, and each
         title is then loaded into a work queue, where it becomes a task to be
         assigned by the manager for completion.  Here, is where task is passed in.
+        If the manager wrapped the task in a Task object, only its keyword is
+        passed here.
 
         :return: self.spider(task, name=self.name, number=self.number, **kwargs)
         """
@@ -147,6 +448,27 @@ class BaseWorker:
                              **kwargs)
         return spider
 
+    def iter_items(self, spider):
+        """
+        Yield the Items of a finished spider. A spider with a yield_items()
+        generator, like a spider which scrapes a listing page, can produce any
+        number of items. Each one it yields is either an Item, exported as-is,
+        or a record like a dict, which gets its own loader with load_items(). The
+        items are exported as they are yielded, so the spider can follow the next
+        page while the first results are already written.
+
+        A spider without yield_items() gives one Item, from load_items(spider).
+        """
+        if not hasattr(spider, 'yield_items'):
+            yield self.load_items(spider)
+            return
+        for record in spider.yield_items():
+            if isinstance(record, Item):
+                yield record
+            else:
+                yield self.load_items(spider, data=record)
+            gevent.sleep(0)
+
     def get_spider_items(self):
         """
         Return a class that subclasses from Item. For example,
@@ -155,18 +477,23 @@ class BaseWorker:
         """
         return self.items
 
-    def load_items(self, spider):
+    def load_items(self, spider, data=None):
         """
         Start with ItemLoader instance subclassed from the
         transistor.persistence.loader ItemLoader class. But, return
         a data loaded Item class object.
+
+        :param data: one record yielded by the spider's yield_items(), set as
+        the loader's `data` attribute, if any.
         :return: Type[Item]
         """
         # make a new instance of self.loader()
         self._loader_items = self.loader()
         self._loader_items.items = self.get_spider_items()()
         self._loader_items.spider = spider
-        self._loader_items = self._loader_items.write()  # .write returns Type[Item]
+        self._loader_items.data = data
+        with span(self.trace, 'load'):
+            self._loader_items = self._loader_items.write()  # .write returns Type[Item]
         return self._loader_items  # careful, this is Type[Item] not Type[ItemLoader]
 
     def get_spider_exporters(self) -> list:
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+transistor.workers.crawlworker
+~~~~~~~~~~~~
+This module implements CrawlWorker, a worker for a shared crawl. Instead of
+starting a spider for each task, it collects all of its outstanding tasks in a
+TaskIndex and runs one SharedCrawler over the pages of the website, exporting a
+result for every task matched on each page. See transistor.crawlers.shared.
+
+Use it in a WorkGroup with one worker and a SharedCrawler spider:
+
+    >>> WorkGroup(name='books.toscrape.com', url='http://books.toscrape.com/',
+    >>>           spider=BooksToScrapeCrawler, worker=CrawlWorker, workers=1, ...)
+
+:copyright: Copyright (C) 2018 by BOM Quote Limited
+:license: The MIT License, see LICENSE for more details.
+~~~~~~~~~~~~
+"""
+import time
+import gevent
+from gevent.queue import Empty
+from transistor.crawlers.shared import TaskIndex
+from transistor.schedulers.task import get_keyword
+from transistor.workers.baseworker import BaseWorker
+from transistor.utility.logging import logger
+
+
+class CrawlWorker(BaseWorker):
+    """
+    A worker which crawls once for all of its tasks.
+
+    A task which arrives while a crawl is running is matched against the
+    remaining pages of that crawl. If it is not found there, it is kept for the
+    next crawl, which only starts once the current one is finished. A task which
+    was outstanding for a whole crawl, and not found, is exported with
+    select(keyword, None).
+    """
+    # unbounded, so the manager hands over every outstanding task at once
+    queue_size = None
+
+    def __init__(self, job_id: str, spider, http_session=None, **kwargs):
+        """
+        :param kwargs: normalize: a callable which returns the index key of a
+        task keyword, see TaskIndex.
+
+        See BaseWorker for the other parameters.
+        """
+        super().__init__(job_id, spider, http_session=http_session, **kwargs)
+        self.index = TaskIndex(normalize=kwargs.get('normalize', None))
+        self.pages = 0
+
+    def spawn_spider(self, **kwargs):
+        """
+        Crawl while there are tasks, until no task arrived for `qtimeout` seconds.
+        """
+        try:
+            while True:
+                if not self.index:
+                    self.index.add(self.next_task(timeout=self.qtimeout))
+                self.collect()
+                self.crawl(**kwargs)
+        except Empty:
+            logger.info(f'Quitting time for worker {self.name}-{self.number}!')
+
+    def collect(self) -> int:
+        """
+        Move the tasks waiting in the task queue into the index, with
+        next_task(). Yield to the manager, which may hand over more tasks, and
+        repeat until no more tasks arrive, without waiting for new ones.
+
+        :returns the number of new tasks.
+        """
+        count = 0
+        while True:
+            try:
+                while True:
+                    self.index.add(self.next_task(block=False))
+                    count += 1
+            except Empty:
+                pass
+            gevent.sleep(0)
+            if self.tasks.empty():
+                return count
+
+    def crawl(self, **kwargs):
+        """
+        Run one crawl over the website for the tasks in the index.
+        """
+        logger.info(f'Worker {self.name}-{self.number} crawls for '
+                    f'{len(self.index)} tasks')
+        # these tasks are checked against every page of this crawl
+        searched = list(self.index)
+        if self.concurrency is not None:
+            self.concurrency.acquire()
+        started = time.monotonic()
+        spider = None
+        pages = 0
+        try:
+            spider = self.acquire_spider(self.index, **kwargs)
+            self.prepare_spider(spider)
+            spider.start_http_session(**self.http_session)
+            while True:
+                pages += 1
+                self.match_page(spider)
+                self.collect()
+                if not self.index or not spider.next_page():
+                    break
+            for task in searched:
+                if self.index.discard(task):
+                    self.export_task(spider, task, None)
+        except Exception:
+            # the tasks of this crawl failed, the worker carries on with the next
+            logger.exception(f'Worker {self.name}-{self.number} failed to crawl '
+                             f'for {len(self.index)} tasks.')
+            self.report(spider, started, failed=True)
+            for task in self.index.clear():
+                self.task_done(task, failed=True)
+            return
+        finally:
+            self.pages += pages
+        self.report(spider, started)
+        self.release_spider(spider)
+        logger.info(f'Worker {self.name}-{self.number} crawled {pages} pages, '
+                    f'{len(self.index)} tasks left for the next crawl')
+
+    def match_page(self, spider):
+        """
+        Export a result for each outstanding task which matches an item on the
+        spider's current page, and remove the task from the index.
+        """
+        for key, match in spider.candidates():
+            for task in self.index.pop(key):
+                self.export_task(spider, task, match)
+
+    def export_task(self, spider, task, match):
+        """
+        Select the match of a task, which is already out of the index, and
+        export its result. If this raises, the task fails on its own, since the
+        crawl only fails the tasks still in the index.
+        """
+        try:
+            spider.select(get_keyword(task), match)
+            self.result(spider, task)
+        except Exception:
+            logger.exception(f'Worker {self.name}-{self.number} failed task '
+                             f'{task}.')
+            self.task_done(task, failed=True)
+            return
+        self.task_done(task)